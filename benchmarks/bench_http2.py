@@ -0,0 +1,62 @@
+"""
+Benchmarks concurrent requests through the shared session over HTTP/1.1 and
+over HTTP/2, like the parts of a chunked upload.
+
+Needs the h2 package and an https server that supports HTTP/2, for example
+a local hypercorn serving any app:
+
+    hypercorn --certfile cert.pem --keyfile key.pem --bind localhost:8443 app:app
+
+With a self-signed certificate, point both SSL_CERT_FILE (httpx) and
+REQUESTS_CA_BUNDLE (requests) at cert.pem.
+
+Usage: python benchmarks/bench_http2.py --url https://localhost:8443/ [--requests N] [--concurrency N]
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from codecov_cli.helpers import request
+from codecov_cli.helpers.http2 import is_http2_available
+
+
+def _run(url: str, number_of_requests: int, concurrency: int, http2: bool):
+    request.configure_session(pool_size=concurrency, http2=http2)
+    session = request.get_session()
+    latencies = []
+
+    def send(_):
+        start = time.perf_counter()
+        response = session.get(url, timeout=(10, 60))
+        latencies.append(time.perf_counter() - start)
+        return getattr(response, "http_version", "HTTP/1.1")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        versions = set(executor.map(send, range(number_of_requests)))
+    total = time.perf_counter() - start
+    latencies.sort()
+    print(
+        f"{'/'.join(sorted(versions)):>8}  total={total:.3f}s"
+        f"  p50={latencies[len(latencies) // 2] * 1000:.1f}ms"
+        f"  p95={latencies[int(len(latencies) * 0.95)] * 1000:.1f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", required=True)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    options = parser.parse_args()
+    if not is_http2_available():
+        parser.error("HTTP/2 needs the h2 package: pip install httpx[http2]")
+
+    print(f"{options.requests} requests, {options.concurrency} at a time")
+    for http2 in (False, True):
+        _run(options.url, options.requests, options.concurrency, http2)
+
+
+if __name__ == "__main__":
+    main()
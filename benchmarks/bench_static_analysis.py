@@ -0,0 +1,66 @@
+"""
+Benchmarks the static analyzers on copies of samples/inputs, loading the
+tree-sitter languages and compiling the queries for every file (as before
+they were shared) and once per process.
+
+Usage: python benchmarks/bench_static_analysis.py [--copies N] [--processes N]
+"""
+
+import argparse
+import asyncio
+import pathlib
+import shutil
+import tempfile
+import time
+
+from codecov_cli.services.staticanalysis import analyze_file, process_files
+from codecov_cli.services.staticanalysis.analyzers import general
+from codecov_cli.services.staticanalysis.types import FileAnalysisRequest
+
+SAMPLES_FOLDER = pathlib.Path(__file__).parent.parent / "samples" / "inputs"
+
+
+def _copy_samples(folder: pathlib.Path, copies: int):
+    files = []
+    for index in range(copies):
+        for sample in sorted(SAMPLES_FOLDER.iterdir()):
+            path = folder / f"{sample.stem}_{index}{sample.suffix}"
+            shutil.copyfile(sample, path)
+            files.append(FileAnalysisRequest(path.name, path))
+    return files
+
+
+def _analyze_serially(files, share_context: bool):
+    general._language_contexts.clear()
+    start = time.perf_counter()
+    results = []
+    for file in files:
+        if not share_context:
+            general._language_contexts.clear()
+        results.append(analyze_file({}, file).result)
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--copies", type=int, default=200)
+    parser.add_argument("--processes", type=int, default=None)
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        files = _copy_samples(pathlib.Path(folder), options.copies)
+        print(f"{len(files)} files")
+
+        per_file, expected = _analyze_serially(files, share_context=False)
+        print(f"one process, context per file     {per_file:.3f}s")
+        shared, results = _analyze_serially(files, share_context=True)
+        assert results == expected, "output differs with a shared context"
+        print(f"one process, context per process  {shared:.3f}s")
+
+        start = time.perf_counter()
+        asyncio.run(process_files(files, options.processes, {}))
+        print(f"worker pool                       {time.perf_counter() - start:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmarks analyzing growing numbers of copies of samples/inputs in the main
+process, on a thread pool and on a process pool, to find where a pool starts
+paying for itself. The thresholds "auto" uses are in
+codecov_cli/services/staticanalysis/scheduling.py.
+
+Usage: python benchmarks/bench_static_analysis_executors.py [--processes N] [--repeat N]
+"""
+
+import argparse
+import asyncio
+import logging
+import pathlib
+import shutil
+import tempfile
+import time
+
+from codecov_cli.services.staticanalysis import process_files
+from codecov_cli.services.staticanalysis.scheduling import (
+    get_file_size,
+    select_executor,
+)
+from codecov_cli.services.staticanalysis.types import FileAnalysisRequest
+
+SAMPLES_FOLDER = pathlib.Path(__file__).parent.parent / "samples" / "inputs"
+NUMBER_OF_FILES = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000]
+EXECUTORS = ["inline", "thread", "process"]
+
+
+def _copy_samples(folder: pathlib.Path, number_of_files: int):
+    samples = sorted(SAMPLES_FOLDER.iterdir())
+    files = []
+    for index in range(number_of_files):
+        sample = samples[index % len(samples)]
+        path = folder / f"{sample.stem}_{index}{sample.suffix}"
+        shutil.copyfile(sample, path)
+        files.append(FileAnalysisRequest(path.name, path))
+    return files
+
+
+def _time_executor(files, executor: str, processes, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        asyncio.run(process_files(files, processes, {}, executor=executor))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--repeat", type=int, default=3)
+    options = parser.parse_args()
+    # The progress and info logs would drown the table
+    logging.getLogger("codecovcli").setLevel(logging.WARNING)
+
+    print(f"{'files':>6} {'bytes':>9} " + " ".join(f"{e:>9}" for e in EXECUTORS))
+    for number_of_files in NUMBER_OF_FILES:
+        with tempfile.TemporaryDirectory() as folder:
+            files = _copy_samples(pathlib.Path(folder), number_of_files)
+            total_size = sum(get_file_size(f) for f in files)
+            timings = {
+                executor: _time_executor(
+                    files, executor, options.processes, options.repeat
+                )
+                for executor in EXECUTORS
+            }
+        fastest = min(timings, key=timings.get)
+        auto = select_executor("auto", len(files), total_size, options.processes)
+        print(
+            f"{number_of_files:>6} {total_size:>9} "
+            + " ".join(f"{timings[e]:>8.3f}s" for e in EXECUTORS)
+            + f"  fastest: {fastest}, auto: {auto}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Benchmarks compression of report files in the upload path with different
+numbers of compression workers.
+
+Usage: python benchmarks/bench_upload_compression.py [--files N] [--size-kb N]
+"""
+
+import argparse
+import pathlib
+import random
+import tempfile
+import time
+
+from codecov_cli.services.upload.upload_sender import UploadSender
+from codecov_cli.types import UploadCollectionResult, UploadCollectionResultFile
+
+WORKER_COUNTS = [1, 4, 16]
+
+
+def _write_reports(folder: pathlib.Path, number_of_files: int, size_kb: int):
+    rng = random.Random(0)
+    files = []
+    for index in range(number_of_files):
+        lines, written = [], 0
+        while written < size_kb * 1024:
+            lines.append(f"DA:{rng.randint(1, 5000)},{rng.randint(0, 3)}\n")
+            written += len(lines[-1])
+        path = folder / f"report_{index}.lcov"
+        path.write_text(f"SF:src/file_{index}.c\n" + "".join(lines) + "end_of_record\n")
+        files.append(UploadCollectionResultFile(path))
+    return files
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=64)
+    parser.add_argument("--size-kb", type=int, default=2048)
+    parser.add_argument("--repeat", type=int, default=3)
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        files = _write_reports(pathlib.Path(folder), options.files, options.size_kb)
+        upload_data = UploadCollectionResult([], files, [])
+        print(f"{options.files} files of {options.size_kb} KB")
+
+        serial_payload = None
+        for workers in WORKER_COUNTS:
+            sender = UploadSender(compression_workers=workers)
+            timings = []
+            for _ in range(options.repeat):
+                start = time.perf_counter()
+                payload = sender._generate_payload(upload_data, {})
+                timings.append(time.perf_counter() - start)
+            serial_payload = serial_payload or payload
+            assert payload == serial_payload, "payload differs from serial path"
+            print(f"workers={workers:>2}  best={min(timings):.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import logging
+import pathlib
+import typing
+
+import click
+import sentry_sdk
+
+from codecov_cli.helpers.args import get_cli_args
+from codecov_cli.services.upload.upload_spool import (
+    DEFAULT_FLUSH_BATCH_SIZE,
+    DEFAULT_FLUSH_CONCURRENCY,
+    DEFAULT_SPOOL_PATH,
+    flush_spool_logic,
+)
+from codecov_cli.types import CommandContext
+
+logger = logging.getLogger("codecovcli")
+
+
+@click.command()
+@click.option(
+    "--spool-dir",
+    help="Folder with the uploads saved by an upload command's --spool-dir",
+    type=click.Path(file_okay=False, path_type=pathlib.Path),
+    default=DEFAULT_SPOOL_PATH,
+    show_default=True,
+)
+@click.option(
+    "--concurrency",
+    help="Number of uploads sent at the same time",
+    type=click.IntRange(min=1),
+    default=DEFAULT_FLUSH_CONCURRENCY,
+    show_default=True,
+)
+@click.option(
+    "--batch-size",
+    help="Number of uploads sent before checking whether Codecov is available",
+    type=click.IntRange(min=1),
+    default=DEFAULT_FLUSH_BATCH_SIZE,
+    show_default=True,
+)
+@click.option(
+    "-t",
+    "--token",
+    help="Codecov upload token",
+    envvar="CODECOV_TOKEN",
+)
+@click.option(
+    "-Z",
+    "--fail-on-error",
+    "fail_on_error",
+    is_flag=True,
+    help="Exit with non-zero code in case of error",
+)
+@click.pass_context
+def flush_spool(
+    ctx: CommandContext,
+    spool_dir: pathlib.Path,
+    concurrency: int,
+    batch_size: int,
+    token: typing.Optional[str],
+    fail_on_error: bool,
+):
+    with sentry_sdk.start_transaction(op="task", name="Flush Spool"):
+        with sentry_sdk.start_span(name="flush_spool"):
+            args = get_cli_args(ctx)
+            logger.debug(
+                "Starting to send spooled uploads",
+                extra=dict(
+                    extra_log_attributes=args,
+                ),
+            )
+            return flush_spool_logic(
+                spool_dir,
+                token,
+                concurrency=concurrency,
+                batch_size=batch_size,
+                fail_on_error=fail_on_error,
+            )
@@ -10,6 +10,8 @@ from codecov_cli.fallbacks import CodecovOption, FallbackFieldEnum
 from codecov_cli.helpers.args import get_cli_args
 from codecov_cli.helpers.validators import validate_commit_sha
 from codecov_cli.services.staticanalysis import run_analysis_entrypoint
+from codecov_cli.services.staticanalysis.cache import get_default_cache_path
+from codecov_cli.services.staticanalysis.scheduling import EXECUTORS
 from codecov_cli.types import CommandContext
 
 logger = logging.getLogger("codecovcli")
@@ -25,6 +27,13 @@ logger = logging.getLogger("codecovcli")
 @click.option(
     "--numberprocesses", type=click.INT, default=None, help="number of processes to use"
 )
+@click.option(
+    "--executor",
+    help="Where files are analyzed: in the main process, on a thread pool or on a process pool. 'auto' analyzes few, small files in the main process",
+    type=click.Choice(EXECUTORS),
+    default="auto",
+    show_default=True,
+)
 @click.option("--pattern", default="*", help="file pattern to search for")
 @click.option("--force/--no-force", default=False)
 @click.option(
@@ -43,6 +52,34 @@ logger = logging.getLogger("codecovcli")
     multiple=True,
     default=[],
 )
+@click.option(
+    "--cache-dir",
+    help="Folder where analysis results are cached, so unchanged files aren't analyzed again. Defaults to a folder in the user cache directory. Results not used in 30 days are deleted, and the least recently used ones past 256 MB",
+    type=click.Path(file_okay=False, path_type=pathlib.Path),
+)
+@click.option(
+    "--no-cache",
+    help="Analyze all files, without using or updating the cache",
+    is_flag=True,
+)
+@click.option(
+    "--pipelined",
+    help="Send fingerprints and upload results while files are still being analyzed, keeping results on disk instead of in memory",
+    is_flag=True,
+)
+@click.option(
+    "--file-finder",
+    help="How to find the files to analyze: walking the folder, or listing the files in the git index (skips files ignored by git)",
+    type=click.Choice(["walk", "git"]),
+    default="walk",
+    show_default=True,
+)
+@click.option(
+    "--changed-since",
+    "base_commit",
+    help="Only analyze the files changed between this commit and HEAD, according to git",
+    default=None,
+)
 @click.option(
     "--token",
     required=True,
@@ -54,11 +91,17 @@ def static_analysis(
     ctx: CommandContext,
     foldertosearch,
     numberprocesses,
+    executor: str,
     pattern,
     commit,
     token,
     force,
     folders_to_exclude: typing.List[pathlib.Path],
+    cache_dir: typing.Optional[pathlib.Path],
+    no_cache: bool,
+    pipelined: bool,
+    file_finder: str,
+    base_commit: typing.Optional[str],
 ):
     with sentry_sdk.start_transaction(op="task", name="Static Analysis"):
         with sentry_sdk.start_span(name="static_analysis"):
@@ -70,6 +113,9 @@ def static_analysis(
                     extra_log_attributes=args,
                 ),
             )
+            cache_path = None
+            if not no_cache:
+                cache_path = cache_dir or get_default_cache_path()
             return asyncio.run(
                 run_analysis_entrypoint(
                     ctx.obj["codecov_yaml"],
@@ -82,5 +128,10 @@ def static_analysis(
                     list(folders_to_exclude),
                     enterprise_url,
                     args,
+                    cache_path=cache_path,
+                    pipelined=pipelined,
+                    file_finder=file_finder,
+                    base_commit=base_commit,
+                    executor=executor,
                 )
             )
@@ -1,3 +1,4 @@
+import functools
 import logging
 import os
 import pathlib
@@ -8,8 +9,12 @@ import sentry_sdk
 from codecov_cli.fallbacks import CodecovOption, FallbackFieldEnum
 from codecov_cli.helpers.args import get_cli_args
 from codecov_cli.helpers.options import global_options
-from codecov_cli.services.upload import do_upload_logic
-from codecov_cli.types import CommandContext
+from codecov_cli.services.upload import do_multi_upload_logic, do_upload_logic
+from codecov_cli.services.upload.upload_sender import (
+    DEFAULT_PAYLOAD_FORMAT,
+    PAYLOAD_FORMATS,
+)
+from codecov_cli.types import CommandContext, UploadSpec
 from codecov_cli.helpers.upload_type import report_type_from_str, ReportType
 
 logger = logging.getLogger("codecovcli")
@@ -19,6 +24,41 @@ def _turn_env_vars_into_dict(ctx, params, value):
     return dict((v, os.getenv(v, None)) for v in value)
 
 
+def _turn_upload_specs_into_list(ctx, params, value) -> typing.List[UploadSpec]:
+    upload_specs = []
+    for spec in value:
+        name, flags, files = None, [], []
+        for part in spec.split(";"):
+            if not part.strip():
+                continue
+            key, separator, spec_value = part.partition("=")
+            key = key.strip()
+            items = [item.strip() for item in spec_value.split(",") if item.strip()]
+            if not separator:
+                raise click.BadParameter(
+                    f"'{spec}' should be key=value pairs separated by ';'"
+                )
+            if key == "name":
+                name = spec_value.strip()
+            elif key in ("flag", "flags"):
+                flags.extend(items)
+            elif key in ("file", "files"):
+                files.extend(pathlib.Path(item) for item in items)
+            else:
+                raise click.BadParameter(f"Unknown key '{key}' in '{spec}'")
+        upload_specs.append(UploadSpec(name=name, flags=flags, files=files))
+    return upload_specs
+
+
+upload_spec_option = click.option(
+    "--upload-spec",
+    "upload_specs",
+    multiple=True,
+    callback=_turn_upload_specs_into_list,
+    help="Make one upload per spec, concurrently, instead of a single upload. A spec looks like 'name=unit;flags=unit,py;files=a.xml,b.xml'. A spec's flags and name replace --flag and --name. A spec with files only uploads those files. Multiple specs allowed.",
+)
+
+
 _global_upload_options = [
     click.option(
         "--code",
@@ -158,6 +198,11 @@ _global_upload_options = [
         is_flag=True,
         help="Don't upload files to Codecov",
     ),
+    click.option(
+        "--dry-run-report",
+        help="With --dry-run, write a JSON report with the time spent in each stage and the size of each part of the payload to this file",
+        type=click.Path(dir_okay=False, path_type=pathlib.Path),
+    ),
     click.option(
         "--legacy",
         "--use-legacy-uploader",
@@ -206,6 +251,57 @@ _global_upload_options = [
         "--swift-project",
         help="Specify the swift project",
     ),
+    click.option(
+        "--compression-workers",
+        help="Number of threads used to compress report files before uploading",
+        type=click.IntRange(min=1),
+        default=1,
+        show_default=True,
+    ),
+    click.option(
+        "--compression-level",
+        help="zlib compression level (0-9) used for report files. Defaults to zlib's default level",
+        type=click.IntRange(0, 9),
+    ),
+    click.option(
+        "--payload-format",
+        help="Format of the payload sent to storage. gzip and zstd compress the whole payload as a single stream, and are only used if Codecov accepts them",
+        type=click.Choice(PAYLOAD_FORMATS),
+        default=DEFAULT_PAYLOAD_FORMAT,
+        show_default=True,
+    ),
+    click.option(
+        "--force",
+        help="Upload report files even if the upload manifest lists files with identical content as already uploaded",
+        is_flag=True,
+        default=False,
+    ),
+    click.option(
+        "--max-payload-size",
+        help="Split the upload into several uploads of at most this many MB (of compressed report files) each",
+        type=click.IntRange(min=1),
+    ),
+    click.option(
+        "--spool-dir",
+        help="If the upload can't be sent because Codecov is unavailable, save it in this folder instead of failing. Send saved uploads later with the flush-spool command",
+        type=click.Path(file_okay=False, path_type=pathlib.Path),
+    ),
+    click.option(
+        "--upload-manifest",
+        help="Record the content hashes of the uploaded report files in this file, and skip report files with identical content already uploaded for the same commit and report code",
+        type=click.Path(dir_okay=False, path_type=pathlib.Path),
+    ),
+    click.option(
+        "--upload-chunk-size",
+        help="Send the upload to storage in parts of this many MB, concurrently and resumable, if Codecov accepts it",
+        type=click.IntRange(min=5),
+    ),
+    click.option(
+        "--chunked-transfer",
+        help="Stream the upload to storage with chunked transfer encoding instead of sending its size first. Uses less memory and disk, but some storage services reject it",
+        is_flag=True,
+        default=False,
+    ),
 ]
 
 
@@ -217,6 +313,7 @@ def global_upload_options(func):
 
 @click.command()
 @global_upload_options
+@upload_spec_option
 @global_options
 @click.pass_context
 def do_upload(
@@ -226,15 +323,20 @@ def do_upload(
     branch: typing.Optional[str],
     build_code: typing.Optional[str],
     build_url: typing.Optional[str],
+    chunked_transfer: bool,
+    compression_level: typing.Optional[int],
+    compression_workers: int,
     disable_file_fixes: bool,
     disable_search: bool,
     dry_run: bool,
+    dry_run_report: typing.Optional[pathlib.Path],
     env_vars: typing.Dict[str, str],
     fail_on_error: bool,
     files_search_exclude_folders: typing.List[pathlib.Path],
     files_search_explicitly_listed_files: typing.List[pathlib.Path],
     files_search_root_folder: pathlib.Path,
     flags: typing.List[str],
+    force: bool,
     gcov_args: typing.Optional[str],
     gcov_executable: typing.Optional[str],
     gcov_ignore: typing.Optional[str],
@@ -242,17 +344,23 @@ def do_upload(
     git_service: typing.Optional[str],
     handle_no_reports_found: bool,
     job_code: typing.Optional[str],
+    max_payload_size: typing.Optional[int],
     name: typing.Optional[str],
     network_filter: typing.Optional[str],
     network_prefix: typing.Optional[str],
     network_root_folder: pathlib.Path,
+    payload_format: str,
     plugin_names: typing.List[str],
     pull_request_number: typing.Optional[str],
     recurse_submodules: bool,
     report_type_str: str,
     slug: typing.Optional[str],
+    spool_dir: typing.Optional[pathlib.Path],
     swift_project: typing.Optional[str],
     token: typing.Optional[str],
+    upload_chunk_size: typing.Optional[int],
+    upload_manifest: typing.Optional[pathlib.Path],
+    upload_specs: typing.List[UploadSpec],
     use_legacy_uploader: bool,
 ):
     with sentry_sdk.start_transaction(op="task", name="Do Upload"):
@@ -271,17 +379,26 @@ def do_upload(
             )
 
             report_type: ReportType = report_type_from_str(report_type_str)
-            do_upload_logic(
+            upload_logic = do_upload_logic
+            if upload_specs:
+                upload_logic = functools.partial(
+                    do_multi_upload_logic, upload_specs=upload_specs
+                )
+            upload_logic(
                 cli_config,
                 versioning_system,
                 ci_adapter,
                 branch=branch,
                 build_code=build_code,
                 build_url=build_url,
+                chunked_transfer=chunked_transfer,
                 commit_sha=commit_sha,
+                compression_level=compression_level,
+                compression_workers=compression_workers,
                 disable_file_fixes=disable_file_fixes,
                 disable_search=disable_search,
                 dry_run=dry_run,
+                dry_run_report=dry_run_report,
                 enterprise_url=enterprise_url,
                 env_vars=env_vars,
                 fail_on_error=fail_on_error,
@@ -291,6 +408,7 @@ def do_upload(
                 ),
                 files_search_root_folder=files_search_root_folder,
                 flags=flags,
+                force=force,
                 gcov_args=gcov_args,
                 gcov_executable=gcov_executable,
                 gcov_ignore=gcov_ignore,
@@ -298,18 +416,24 @@ def do_upload(
                 git_service=git_service,
                 handle_no_reports_found=handle_no_reports_found,
                 job_code=job_code,
+                max_payload_size=max_payload_size,
                 name=name,
                 network_filter=network_filter,
                 network_prefix=network_prefix,
                 network_root_folder=network_root_folder,
+                payload_format=payload_format,
                 plugin_names=plugin_names,
                 pull_request_number=pull_request_number,
                 recurse_submodules=recurse_submodules,
                 report_code=report_code,
                 slug=slug,
+                spool_dir=spool_dir,
                 swift_project=swift_project,
                 token=token,
                 report_type=report_type,
+                upload_chunk_size=upload_chunk_size,
+                upload_manifest=upload_manifest,
                 use_legacy_uploader=use_legacy_uploader,
                 args=args,
+                before_send=ctx.obj.get("before_upload_send"),
             )
@@ -32,16 +32,21 @@ def upload_coverage(
     branch: typing.Optional[str],
     build_code: typing.Optional[str],
     build_url: typing.Optional[str],
+    chunked_transfer: bool,
     commit_sha: str,
+    compression_level: typing.Optional[int],
+    compression_workers: int,
     disable_file_fixes: bool,
     disable_search: bool,
     dry_run: bool,
+    dry_run_report: typing.Optional[pathlib.Path],
     env_vars: typing.Dict[str, str],
     fail_on_error: bool,
     files_search_exclude_folders: typing.List[pathlib.Path],
     files_search_explicitly_listed_files: typing.List[pathlib.Path],
     files_search_root_folder: pathlib.Path,
     flags: typing.List[str],
+    force: bool,
     gcov_args: typing.Optional[str],
     gcov_executable: typing.Optional[str],
     gcov_ignore: typing.Optional[str],
@@ -49,19 +54,24 @@ def upload_coverage(
     git_service: typing.Optional[str],
     handle_no_reports_found: bool,
     job_code: typing.Optional[str],
+    max_payload_size: typing.Optional[int],
     name: typing.Optional[str],
     network_filter: typing.Optional[str],
     network_prefix: typing.Optional[str],
     network_root_folder: pathlib.Path,
     parent_sha: typing.Optional[str],
+    payload_format: str,
     plugin_names: typing.List[str],
     pull_request_number: typing.Optional[str],
     recurse_submodules: bool,
     report_code: str,
     report_type_str: str,
     slug: typing.Optional[str],
+    spool_dir: typing.Optional[pathlib.Path],
     swift_project: typing.Optional[str],
     token: typing.Optional[str],
+    upload_chunk_size: typing.Optional[int],
+    upload_manifest: typing.Optional[pathlib.Path],
     use_legacy_uploader: bool,
 ):
     with sentry_sdk.start_transaction(op="task", name="Upload Coverage"):
@@ -91,10 +101,14 @@ def upload_coverage(
                     branch=branch,
                     build_code=build_code,
                     build_url=build_url,
+                    chunked_transfer=chunked_transfer,
                     commit_sha=commit_sha,
+                    compression_level=compression_level,
+                    compression_workers=compression_workers,
                     disable_file_fixes=disable_file_fixes,
                     disable_search=disable_search,
                     dry_run=dry_run,
+                    dry_run_report=dry_run_report,
                     enterprise_url=enterprise_url,
                     env_vars=env_vars,
                     fail_on_error=fail_on_error,
@@ -102,6 +116,7 @@ def upload_coverage(
                     files_search_explicitly_listed_files=files_search_explicitly_listed_files,
                     files_search_root_folder=files_search_root_folder,
                     flags=flags,
+                    force=force,
                     gcov_args=gcov_args,
                     gcov_executable=gcov_executable,
                     gcov_ignore=gcov_ignore,
@@ -109,19 +124,24 @@ def upload_coverage(
                     git_service=git_service,
                     handle_no_reports_found=handle_no_reports_found,
                     job_code=job_code,
+                    max_payload_size=max_payload_size,
                     name=name,
                     network_filter=network_filter,
                     network_prefix=network_prefix,
                     network_root_folder=network_root_folder,
                     parent_sha=parent_sha,
+                    payload_format=payload_format,
                     plugin_names=plugin_names,
                     pull_request_number=pull_request_number,
                     recurse_submodules=recurse_submodules,
                     report_code=report_code,
                     slug=slug,
+                    spool_dir=spool_dir,
                     swift_project=swift_project,
                     token=token,
                     report_type=report_type,
+                    upload_chunk_size=upload_chunk_size,
+                    upload_manifest=upload_manifest,
                     use_legacy_uploader=use_legacy_uploader,
                     args=args,
                 )
@@ -152,16 +172,21 @@ def upload_coverage(
                     branch=branch,
                     build_code=build_code,
                     build_url=build_url,
+                    chunked_transfer=chunked_transfer,
                     commit_sha=commit_sha,
+                    compression_level=compression_level,
+                    compression_workers=compression_workers,
                     disable_file_fixes=disable_file_fixes,
                     disable_search=disable_search,
                     dry_run=dry_run,
+                    dry_run_report=dry_run_report,
                     env_vars=env_vars,
                     fail_on_error=fail_on_error,
                     files_search_exclude_folders=files_search_exclude_folders,
                     files_search_explicitly_listed_files=files_search_explicitly_listed_files,
                     files_search_root_folder=files_search_root_folder,
                     flags=flags,
+                    force=force,
                     gcov_args=gcov_args,
                     gcov_executable=gcov_executable,
                     gcov_ignore=gcov_ignore,
@@ -169,18 +194,23 @@ def upload_coverage(
                     git_service=git_service,
                     handle_no_reports_found=handle_no_reports_found,
                     job_code=job_code,
+                    max_payload_size=max_payload_size,
                     name=name,
                     network_filter=network_filter,
                     network_prefix=network_prefix,
                     network_root_folder=network_root_folder,
+                    payload_format=payload_format,
                     plugin_names=plugin_names,
                     pull_request_number=pull_request_number,
                     recurse_submodules=recurse_submodules,
                     report_code=report_code,
                     report_type_str=report_type_str,
                     slug=slug,
+                    spool_dir=spool_dir,
                     swift_project=swift_project,
                     token=token,
+                    upload_chunk_size=upload_chunk_size,
+                    upload_manifest=upload_manifest,
                     use_legacy_uploader=use_legacy_uploader,
                 )
     close_telem()
@@ -1,17 +1,22 @@
 import logging
 import pathlib
 import typing
+from concurrent.futures import ThreadPoolExecutor
 
 import click
 import sentry_sdk
 
 from codecov_cli.commands.commit import create_commit
 from codecov_cli.commands.report import create_report
-from codecov_cli.commands.upload import do_upload, global_upload_options
+from codecov_cli.commands.upload import (
+    do_upload,
+    global_upload_options,
+    upload_spec_option,
+)
 from codecov_cli.helpers.args import get_cli_args
 from codecov_cli.helpers.options import global_options
 from codecov_cli.helpers.upload_type import report_type_from_str, ReportType
-from codecov_cli.types import CommandContext
+from codecov_cli.types import CommandContext, UploadSpec
 
 logger = logging.getLogger("codecovcli")
 
@@ -20,6 +25,7 @@ logger = logging.getLogger("codecovcli")
 @click.command()
 @global_options
 @global_upload_options
+@upload_spec_option
 @click.option(
     "--parent-sha",
     help="SHA (with 40 chars) of what should be the parent of this commit",
@@ -30,16 +36,21 @@ def upload_process(
     branch: typing.Optional[str],
     build_code: typing.Optional[str],
     build_url: typing.Optional[str],
+    chunked_transfer: bool,
     commit_sha: str,
+    compression_level: typing.Optional[int],
+    compression_workers: int,
     disable_file_fixes: bool,
     disable_search: bool,
     dry_run: bool,
+    dry_run_report: typing.Optional[pathlib.Path],
     env_vars: typing.Dict[str, str],
     fail_on_error: bool,
     files_search_exclude_folders: typing.List[pathlib.Path],
     files_search_explicitly_listed_files: typing.List[pathlib.Path],
     files_search_root_folder: pathlib.Path,
     flags: typing.List[str],
+    force: bool,
     gcov_args: typing.Optional[str],
     gcov_executable: typing.Optional[str],
     gcov_ignore: typing.Optional[str],
@@ -47,19 +58,25 @@ def upload_process(
     git_service: typing.Optional[str],
     handle_no_reports_found: bool,
     job_code: typing.Optional[str],
+    max_payload_size: typing.Optional[int],
     name: typing.Optional[str],
     network_filter: typing.Optional[str],
     network_prefix: typing.Optional[str],
     network_root_folder: pathlib.Path,
     parent_sha: typing.Optional[str],
+    payload_format: str,
     plugin_names: typing.List[str],
     pull_request_number: typing.Optional[str],
     recurse_submodules: bool,
     report_code: str,
     report_type_str: str,
     slug: typing.Optional[str],
+    spool_dir: typing.Optional[pathlib.Path],
     swift_project: typing.Optional[str],
     token: typing.Optional[str],
+    upload_chunk_size: typing.Optional[int],
+    upload_manifest: typing.Optional[pathlib.Path],
+    upload_specs: typing.List[UploadSpec],
     use_legacy_uploader: bool,
 ):
     with sentry_sdk.start_transaction(op="task", name="Upload Process"):
@@ -72,62 +89,86 @@ def upload_process(
                 ),
             )
 
-            ctx.invoke(
-                create_commit,
-                commit_sha=commit_sha,
-                parent_sha=parent_sha,
-                pull_request_number=pull_request_number,
-                branch=branch,
-                slug=slug,
-                token=token,
-                git_service=git_service,
-                fail_on_error=True,
-            )
-
             report_type = report_type_from_str(report_type_str)
-            if report_type == ReportType.COVERAGE:
+
+            def create_commit_and_report():
                 ctx.invoke(
-                    create_report,
-                    token=token,
-                    code=report_code,
-                    fail_on_error=True,
+                    create_commit,
                     commit_sha=commit_sha,
+                    parent_sha=parent_sha,
+                    pull_request_number=pull_request_number,
+                    branch=branch,
                     slug=slug,
+                    token=token,
                     git_service=git_service,
+                    fail_on_error=True,
                 )
-            ctx.invoke(
-                do_upload,
-                branch=branch,
-                build_code=build_code,
-                build_url=build_url,
-                commit_sha=commit_sha,
-                disable_file_fixes=disable_file_fixes,
-                disable_search=disable_search,
-                dry_run=dry_run,
-                env_vars=env_vars,
-                fail_on_error=fail_on_error,
-                files_search_exclude_folders=files_search_exclude_folders,
-                files_search_explicitly_listed_files=files_search_explicitly_listed_files,
-                files_search_root_folder=files_search_root_folder,
-                flags=flags,
-                gcov_args=gcov_args,
-                gcov_executable=gcov_executable,
-                gcov_ignore=gcov_ignore,
-                gcov_include=gcov_include,
-                git_service=git_service,
-                handle_no_reports_found=handle_no_reports_found,
-                job_code=job_code,
-                name=name,
-                network_filter=network_filter,
-                network_prefix=network_prefix,
-                network_root_folder=network_root_folder,
-                plugin_names=plugin_names,
-                pull_request_number=pull_request_number,
-                recurse_submodules=recurse_submodules,
-                report_code=report_code,
-                report_type_str=report_type_str,
-                slug=slug,
-                swift_project=swift_project,
-                token=token,
-                use_legacy_uploader=use_legacy_uploader,
-            )
+                if report_type == ReportType.COVERAGE:
+                    ctx.invoke(
+                        create_report,
+                        token=token,
+                        code=report_code,
+                        fail_on_error=True,
+                        commit_sha=commit_sha,
+                        slug=slug,
+                        git_service=git_service,
+                    )
+
+            # The commit and report are created while reports are collected,
+            # the upload only waits for them before sending anything
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                commit_and_report = executor.submit(create_commit_and_report)
+                ctx.obj["before_upload_send"] = commit_and_report.result
+                try:
+                    ctx.invoke(
+                        do_upload,
+                        branch=branch,
+                        build_code=build_code,
+                        build_url=build_url,
+                        chunked_transfer=chunked_transfer,
+                        commit_sha=commit_sha,
+                        compression_level=compression_level,
+                        compression_workers=compression_workers,
+                        disable_file_fixes=disable_file_fixes,
+                        disable_search=disable_search,
+                        dry_run=dry_run,
+                        dry_run_report=dry_run_report,
+                        env_vars=env_vars,
+                        fail_on_error=fail_on_error,
+                        files_search_exclude_folders=files_search_exclude_folders,
+                        files_search_explicitly_listed_files=files_search_explicitly_listed_files,
+                        files_search_root_folder=files_search_root_folder,
+                        flags=flags,
+                        force=force,
+                        gcov_args=gcov_args,
+                        gcov_executable=gcov_executable,
+                        gcov_ignore=gcov_ignore,
+                        gcov_include=gcov_include,
+                        git_service=git_service,
+                        handle_no_reports_found=handle_no_reports_found,
+                        job_code=job_code,
+                        max_payload_size=max_payload_size,
+                        name=name,
+                        network_filter=network_filter,
+                        network_prefix=network_prefix,
+                        network_root_folder=network_root_folder,
+                        payload_format=payload_format,
+                        plugin_names=plugin_names,
+                        pull_request_number=pull_request_number,
+                        recurse_submodules=recurse_submodules,
+                        report_code=report_code,
+                        report_type_str=report_type_str,
+                        slug=slug,
+                        spool_dir=spool_dir,
+                        swift_project=swift_project,
+                        token=token,
+                        upload_specs=upload_specs,
+                        upload_chunk_size=upload_chunk_size,
+                        upload_manifest=upload_manifest,
+                        use_legacy_uploader=use_legacy_uploader,
+                    )
+                finally:
+                    # Failing to create the commit or report exits 1, whatever
+                    # --fail-on-error says, and takes precedence over errors
+                    # from the upload
+                    commit_and_report.result()
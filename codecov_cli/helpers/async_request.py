@@ -0,0 +1,126 @@
+import asyncio
+import contextlib
+import logging
+import typing
+from time import perf_counter
+
+import httpx
+
+from codecov_cli.helpers import request_metrics
+from codecov_cli.helpers.request import (
+    USER_AGENT,
+    get_pool_size,
+    get_retry_policy,
+    is_http2_enabled,
+)
+from codecov_cli.helpers.retry import RetryPolicy, parse_retry_after
+from codecov_cli.helpers.timeouts import DeadlineExceeded, get_timeouts
+
+logger = logging.getLogger("codecovcli")
+
+# Errors raised before any part of the request reached the server
+_NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+@contextlib.asynccontextmanager
+async def async_client(**kwargs) -> typing.AsyncIterator[httpx.AsyncClient]:
+    """
+    Client for sending requests concurrently from a single event loop, with
+    the same timeouts, connection pool size and HTTP version as the
+    synchronous requests.
+    Keyword arguments are passed to `httpx.AsyncClient`.
+    """
+    kwargs.setdefault("timeout", get_timeouts().for_httpx())
+    kwargs.setdefault("limits", httpx.Limits(max_keepalive_connections=get_pool_size()))
+    kwargs.setdefault("headers", {"User-Agent": USER_AGENT})
+    kwargs.setdefault("http2", is_http2_enabled())
+    async with httpx.AsyncClient(**kwargs) as client:
+        yield client
+
+
+async def send_with_retries(
+    client: httpx.AsyncClient,
+    method: str,
+    url: str,
+    policy: typing.Optional[RetryPolicy] = None,
+    **kwargs,
+) -> httpx.Response:
+    """
+    Sends a request, retrying it according to `policy` (the configured policy
+    by default). Once the retries run out the last response is returned, or
+    the last error raised.
+    """
+    retry_state = (policy or get_retry_policy()).start()
+    metrics = request_metrics.get_request_metrics()
+    while True:
+        try:
+            response = await _send_measured(metrics, client, method, url, **kwargs)
+            if not retry_state.policy.should_retry_status(response.status_code):
+                return response
+            logger.warning(
+                f"Response status code was {response.status_code}.",
+                extra=dict(extra_log_attributes=dict(retry=retry_state.retry)),
+            )
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        except httpx.TransportError as exp:
+            request_sent = not isinstance(exp, _NOT_SENT_ERRORS)
+            if not retry_state.policy.should_retry_error(method, request_sent):
+                raise
+            logger.warning(
+                "Request failed. Retrying",
+                extra=dict(extra_log_attributes=dict(retry=retry_state.retry)),
+            )
+            delay = retry_state.next_delay()
+            if delay is None:
+                raise
+        else:
+            delay = retry_state.next_delay(retry_after)
+            if delay is None:
+                return response
+        remaining = get_timeouts().remaining()
+        if remaining is not None and delay >= remaining:
+            raise DeadlineExceeded(
+                "The command would run out of time before the request is retried"
+            )
+        if metrics is not None:
+            metrics.record_retry(method, url)
+        await asyncio.sleep(delay)
+
+
+async def _send_measured(
+    metrics: typing.Optional[request_metrics.RequestMetrics],
+    client: httpx.AsyncClient,
+    method: str,
+    url: str,
+    **kwargs,
+) -> httpx.Response:
+    send = getattr(client, method.lower())
+    if metrics is None:
+        return await send(url, **kwargs)
+    start = perf_counter()
+    try:
+        response = await send(url, **kwargs)
+    except httpx.TransportError as exp:
+        metrics.record(method, url, total=perf_counter() - start, error=exp)
+        raise
+    # httpx doesn't expose connection or time to first byte timings
+    metrics.record(
+        method,
+        url,
+        total=perf_counter() - start,
+        status_code=response.status_code,
+        bytes_sent=_request_size(response.request),
+        bytes_received=len(response.content),
+    )
+    return response
+
+
+def _request_size(request: httpx.Request) -> int:
+    content_length = request.headers.get("Content-Length")
+    if content_length is not None:
+        return int(content_length)
+    try:
+        return len(request.content)
+    except httpx.RequestNotRead:
+        # Streamed without a length, the body isn't kept
+        return 0
@@ -0,0 +1,86 @@
+import logging
+import typing
+import zlib
+from time import perf_counter
+
+logger = logging.getLogger("codecovcli")
+
+
+def _import_zstd():
+    try:
+        # Python 3.14+
+        from compression import zstd
+
+        return zstd
+    except ImportError:
+        pass
+    try:
+        import zstandard
+
+        return zstandard
+    except ImportError:
+        return None
+
+
+def is_zstd_available() -> bool:
+    return _import_zstd() is not None
+
+
+def get_stream_compressor(compression: str, level: typing.Optional[int] = None):
+    """
+    Returns an object with `compress(data)` and `flush()` that produces a single
+    `compression` stream ("gzip" or "zstd").
+    """
+    if compression == "gzip":
+        return zlib.compressobj(
+            level if level is not None else zlib.Z_DEFAULT_COMPRESSION,
+            zlib.DEFLATED,
+            16 + zlib.MAX_WBITS,
+        )
+    if compression == "zstd":
+        zstd = _import_zstd()
+        if zstd is None:
+            raise ValueError("zstd compression is not available")
+        if zstd.__name__ == "compression.zstd":
+            return zstd.ZstdCompressor(level=level)
+        return zstd.ZstdCompressor(level=level or 3).compressobj()
+    raise ValueError(f"Invalid compression: {compression}")
+
+
+def compress_chunks(
+    chunks: typing.Iterable[bytes],
+    compression: str,
+    level: typing.Optional[int] = None,
+) -> typing.Iterator[bytes]:
+    """
+    Compresses `chunks` as one stream, yielding compressed data as it is produced.
+    Logs the compression ratio and the time spent compressing once done.
+    """
+    compressor = get_stream_compressor(compression, level)
+    raw_size = compressed_size = 0
+    elapsed = 0.0
+    for chunk in chunks:
+        start = perf_counter()
+        compressed = compressor.compress(chunk)
+        elapsed += perf_counter() - start
+        raw_size += len(chunk)
+        if compressed:
+            compressed_size += len(compressed)
+            yield compressed
+    start = perf_counter()
+    compressed = compressor.flush()
+    elapsed += perf_counter() - start
+    compressed_size += len(compressed)
+    if compressed:
+        yield compressed
+    logger.debug(
+        f"Compressed payload with {compression}",
+        extra=dict(
+            extra_log_attributes=dict(
+                raw_bytes=raw_size,
+                compressed_bytes=compressed_size,
+                ratio=round(raw_size / compressed_size, 2) if compressed_size else None,
+                compression_seconds=round(elapsed, 3),
+            )
+        ),
+    )
@@ -1,5 +1,7 @@
 import logging
+import os
 import pathlib
+import sys
 import typing as t
 
 import yaml
@@ -27,6 +29,20 @@ CODECOV_YAML_RECOGNIZED_FILENAMES = [
 ]
 
 
+def get_user_cache_dir() -> pathlib.Path:
+    """
+    Folder for files the CLI keeps between runs, in the user cache
+    directory so they aren't left in the folder being uploaded or analyzed.
+    """
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or pathlib.Path.home() / "AppData/Local"
+    elif sys.platform == "darwin":
+        base = pathlib.Path.home() / "Library/Caches"
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or pathlib.Path.home() / ".cache"
+    return pathlib.Path(base) / "codecov-cli"
+
+
 def _find_codecov_yamls():
     vcs = get_versioning_system()
     vcs_root = vcs.get_network_root() if vcs else None
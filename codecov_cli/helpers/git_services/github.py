@@ -1,8 +1,12 @@
 import json
+import logging
 
 import requests
 
 from codecov_cli.helpers.git_services import PullDict
+from codecov_cli.helpers.timeouts import DeadlineExceeded, get_timeouts
+
+logger = logging.getLogger("codecovcli")
 
 
 class Github:
@@ -13,7 +17,13 @@ class Github:
         pull_url = f"/repos/{slug}/pulls/{pr_number}"
         url = self.api_url + pull_url
         headers = {"X-GitHub-Api-Version": self.api_version}
-        response = requests.get(url, headers=headers)
+        try:
+            response = requests.get(
+                url, headers=headers, timeout=get_timeouts().for_requests()
+            )
+        except (requests.exceptions.Timeout, DeadlineExceeded) as exp:
+            logger.warning(f"Unable to get pull request from GitHub: {exp}")
+            return None
         if response.status_code == 200:
             res = json.loads(response.text)
             return {
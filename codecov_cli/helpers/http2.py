@@ -0,0 +1,117 @@
+import importlib.util
+import threading
+import typing
+
+import httpx
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import select_proxy
+
+# Headers that only apply to a single HTTP/1.1 connection. HTTP/2 forbids them.
+_CONNECTION_HEADERS = frozenset(
+    ["connection", "keep-alive", "proxy-connection", "transfer-encoding", "upgrade"]
+)
+
+
+def is_http2_available() -> bool:
+    # httpx needs the optional `h2` package for HTTP/2
+    return importlib.util.find_spec("h2") is not None
+
+
+class HTTP2Adapter(BaseAdapter):
+    """
+    Transport adapter that sends the requests of a `requests.Session` through
+    an `httpx.Client` with HTTP/2 enabled, so concurrent requests to a host
+    share one multiplexed connection.
+
+    HTTP/2 is negotiated during the TLS handshake. Servers that don't support
+    it, and plain http URLs, are spoken to over HTTP/1.1. Certificate
+    verification, client certificates and proxies are the ones `requests`
+    resolved for the request (e.g. from REQUESTS_CA_BUNDLE or HTTPS_PROXY).
+    httpx sets them per client, so there is one client per combination.
+    """
+
+    def __init__(self, pool_size: int):
+        super().__init__()
+        self._pool_size = pool_size
+        self._clients: typing.Dict[tuple, httpx.Client] = {}
+        self._lock = threading.Lock()
+
+    def _get_client(self, verify, cert, proxy) -> httpx.Client:
+        key = (verify, cert, proxy)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._clients[key] = httpx.Client(
+                    http2=True,
+                    limits=httpx.Limits(max_keepalive_connections=self._pool_size),
+                    verify=verify,
+                    cert=cert,
+                    proxy=proxy,
+                    # `requests` already applied the environment settings
+                    trust_env=False,
+                )
+            return client
+
+    def send(
+        self,
+        request: requests.PreparedRequest,
+        stream: bool = False,
+        timeout: typing.Union[None, float, typing.Tuple] = None,
+        verify: typing.Union[bool, str] = True,
+        cert: typing.Union[None, str, typing.Tuple[str, str]] = None,
+        proxies: typing.Optional[typing.Mapping[str, str]] = None,
+    ) -> requests.Response:
+        connect_timeout, read_timeout = (
+            timeout if isinstance(timeout, tuple) else (timeout, timeout)
+        )
+        headers = {
+            name: value
+            for name, value in request.headers.items()
+            if name.lower() not in _CONNECTION_HEADERS
+        }
+        client = self._get_client(verify, cert, select_proxy(request.url, proxies))
+        try:
+            resp = client.request(
+                request.method,
+                request.url,
+                headers=headers,
+                content=request.body,
+                timeout=httpx.Timeout(
+                    connect=connect_timeout,
+                    read=read_timeout,
+                    write=read_timeout,
+                    pool=connect_timeout,
+                ),
+            )
+        except httpx.ConnectTimeout as exp:
+            raise requests.exceptions.ConnectTimeout(exp, request=request)
+        except httpx.TimeoutException as exp:
+            raise requests.exceptions.ReadTimeout(exp, request=request)
+        except httpx.TransportError as exp:
+            raise requests.exceptions.ConnectionError(exp, request=request)
+        return self._build_response(request, resp)
+
+    def _build_response(
+        self, request: requests.PreparedRequest, resp: httpx.Response
+    ) -> requests.Response:
+        response = requests.Response()
+        response.status_code = resp.status_code
+        response.reason = resp.reason_phrase
+        response.headers = CaseInsensitiveDict(resp.headers)
+        response.encoding = resp.encoding
+        response.url = str(resp.url)
+        response.request = request
+        response.connection = self
+        response._content = resp.content
+        # Exposed so callers can tell which protocol was used
+        response.http_version = resp.http_version
+        return response
+
+    def close(self):
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            client.close()
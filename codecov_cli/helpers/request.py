@@ -1,21 +1,80 @@
+import functools
 import json
 import logging
+import tempfile
+import threading
+import weakref
 from sys import exit
-from time import sleep
-from typing import Optional
+from time import perf_counter, sleep
+from typing import Callable, Iterator, Optional, Union
 
 import click
 import requests
+from urllib3 import HTTPConnectionPool
 
 from codecov_cli import __version__
+from codecov_cli.helpers import request_metrics
+from codecov_cli.helpers.http2 import HTTP2Adapter, is_http2_available
+from codecov_cli.helpers.retry import RetryPolicy, parse_retry_after
+from codecov_cli.helpers.timeouts import DeadlineExceeded, get_timeouts
 from codecov_cli.types import RequestError, RequestResult
 
 logger = logging.getLogger("codecovcli")
 
-MAX_RETRIES = 3
-
 USER_AGENT = f"codecov-cli/{__version__}"
 
+DEFAULT_POOL_SIZE = 10
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+_pool_size = DEFAULT_POOL_SIZE
+_http2 = False
+# Number of connections each pool had opened when last used
+_seen_connections = weakref.WeakKeyDictionary()
+
+
+def configure_session(pool_size: int = DEFAULT_POOL_SIZE, http2: bool = False):
+    """
+    Sets the number of connections kept alive per host, and whether https
+    requests use HTTP/2. Applies to requests made after this call.
+    """
+    global _pool_size, _http2, _session
+    if http2 and not is_http2_available():
+        logger.warning(
+            "HTTP/2 needs the h2 package, install it with `pip install httpx[http2]`. Using HTTP/1.1."
+        )
+        http2 = False
+    with _session_lock:
+        _pool_size = pool_size
+        _http2 = http2
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def get_pool_size() -> int:
+    return _pool_size
+
+
+def is_http2_enabled() -> bool:
+    return _http2
+
+
+def get_session() -> requests.Session:
+    """
+    Process-wide session shared by all requests, so connections to a host
+    are kept alive and reused instead of being opened for every request.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = request_metrics.TimedHTTPAdapter(pool_maxsize=_pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", HTTP2Adapter(_pool_size) if _http2 else adapter)
+            _session = session
+        return _session
+
 
 def _set_user_agent(headers: Optional[dict] = None) -> dict:
     headers = headers or {}
@@ -23,19 +82,153 @@ def _set_user_agent(headers: Optional[dict] = None) -> dict:
     return headers
 
 
+def _log_connection_reuse(response: requests.Response):
+    pool = getattr(getattr(response, "raw", None), "_pool", None)
+    if not isinstance(pool, HTTPConnectionPool):
+        return
+    with _session_lock:
+        opened_connections = pool.num_connections - _seen_connections.get(pool, 0)
+        _seen_connections[pool] = pool.num_connections
+    logger.debug(
+        f"{'Opened new' if opened_connections else 'Reused'} connection to {pool.host}",
+        extra=dict(
+            extra_log_attributes=dict(
+                connections=pool.num_connections, requests=pool.num_requests
+            )
+        ),
+    )
+
+
+def _send(method: str, url: str, **kwargs) -> requests.Response:
+    kwargs["timeout"] = get_timeouts().for_requests()
+    metrics = request_metrics.get_request_metrics()
+    if metrics is None:
+        response = getattr(get_session(), method)(url, **kwargs)
+        _log_connection_reuse(response)
+        return response
+
+    data = kwargs.get("data")
+    streamed_body = None
+    if (
+        data is not None
+        and not isinstance(data, dict)
+        and request_metrics.body_size(data) is None
+    ):
+        streamed_body = kwargs["data"] = request_metrics.CountingIterable(data)
+    request_metrics.reset_connection_timings()
+    start = perf_counter()
+    try:
+        response = getattr(get_session(), method)(url, **kwargs)
+    except requests.exceptions.RequestException as exp:
+        connect, tls = request_metrics.get_connection_timings()
+        metrics.record(
+            method,
+            url,
+            total=perf_counter() - start,
+            error=exp,
+            connect=connect,
+            tls=tls,
+            bytes_sent=streamed_body.size if streamed_body is not None else 0,
+        )
+        raise
+    total = perf_counter() - start
+    connect, tls = request_metrics.get_connection_timings()
+    metrics.record(
+        method,
+        url,
+        total=total,
+        status_code=response.status_code,
+        # Not measured when sent over HTTP/2
+        ttfb=response.elapsed.total_seconds() or None,
+        connect=connect,
+        tls=tls,
+        bytes_sent=(
+            streamed_body.size
+            if streamed_body is not None
+            else request_metrics.body_size(response.request.body) or 0
+        ),
+        bytes_received=len(response.content),
+    )
+    _log_connection_reuse(response)
+    return response
+
+
 def patch(url: str, headers: dict = None, json: dict = None) -> requests.Response:
     headers = _set_user_agent(headers)
-    return requests.patch(url, json=json, headers=headers)
+    return _send("patch", url, json=json, headers=headers)
 
 
 def get(url: str, headers: dict = None, params: dict = None) -> requests.Response:
     headers = _set_user_agent(headers)
-    return requests.get(url, params=params, headers=headers)
+    return _send("get", url, params=params, headers=headers)
+
+
+class StreamingPayload(object):
+    """
+    Request body produced lazily, one chunk at a time.
+
+    `requests` sends iterables without a length using chunked transfer encoding,
+    so the body never has to be held in memory as a whole. Every iteration calls
+    `generate` again, so a retried request re-sends the complete body.
+
+    Presigned storage URLs (e.g. S3) usually reject chunked bodies, so bodies
+    sent to storage are `buffered` first to be sent with a Content-Length.
+    """
 
+    # Buffered bodies larger than this are written to disk
+    BUFFER_MEMORY_SIZE = 8 * 1024 * 1024
+    READ_BLOCK_SIZE = 1024 * 1024
 
-def put(url: str, data: dict = None, headers: dict = None) -> requests.Response:
+    def __init__(self, generate: Callable[[], Iterator[bytes]]):
+        self._generate = generate
+
+    def __iter__(self) -> Iterator[bytes]:
+        return self._generate()
+
+    def buffered(self) -> "SizedPayload":
+        """
+        Generates the body once into a temporary file, kept in memory while
+        small, and returns it as a body of known size. The file has no name on
+        disk and goes away with the returned body.
+        """
+        buffer = tempfile.SpooledTemporaryFile(max_size=self.BUFFER_MEMORY_SIZE)
+        try:
+            for chunk in self:
+                buffer.write(chunk)
+        except BaseException:
+            buffer.close()
+            raise
+        length = buffer.tell()
+
+        def read_buffer() -> Iterator[bytes]:
+            buffer.seek(0)
+            yield from iter(lambda: buffer.read(self.READ_BLOCK_SIZE), b"")
+
+        return SizedPayload(read_buffer, length)
+
+
+class SizedPayload(StreamingPayload):
+    """
+    Streamed request body whose size is known before it's sent, so `requests`
+    sends it with a Content-Length header instead of chunked.
+    """
+
+    def __init__(self, generate: Callable[[], Iterator[bytes]], length: int):
+        super().__init__(generate)
+        self.length = length
+
+    def __len__(self) -> int:
+        return self.length
+
+    def buffered(self) -> "SizedPayload":
+        return self
+
+
+def put(
+    url: str, data: Union[dict, bytes, StreamingPayload] = None, headers: dict = None
+) -> requests.Response:
     headers = _set_user_agent(headers)
-    return requests.put(url, data=data, headers=headers)
+    return _send("put", url, data=data, headers=headers)
 
 
 def post(
@@ -45,60 +238,117 @@ def post(
     params: Optional[dict] = None,
 ) -> requests.Response:
     headers = _set_user_agent(headers)
-    return requests.post(url, json=data, headers=headers, params=params)
+    return _send("post", url, json=data, headers=headers, params=params)
+
+
+_retry_policy = RetryPolicy()
+
 
+def configure_retry_policy(policy: RetryPolicy):
+    """
+    Sets the policy used by requests that don't pass one explicitly.
+    """
+    global _retry_policy
+    _retry_policy = policy
 
-def backoff_time(curr_retry):
-    return 2 ** (curr_retry - 1)
 
+def get_retry_policy() -> RetryPolicy:
+    return _retry_policy
 
-class RetryException(Exception): ...
 
+def retry_request(method: str, policy: Optional[RetryPolicy] = None):
+    """
+    Retries the decorated function, which sends a `method` request and returns
+    its response, according to `policy` (the configured policy by default).
+    """
 
-def retry_request(func):
-    def wrapper(*args, **kwargs):
-        retry = 0
-        while retry < MAX_RETRIES:
-            try:
-                response = func(*args, **kwargs)
-                if response.status_code >= 500:
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            retry_state = (policy or get_retry_policy()).start()
+            while True:
+                retry_after = None
+                try:
+                    response = func(*args, **kwargs)
+                    if not retry_state.policy.should_retry_status(response.status_code):
+                        return response
                     logger.warning(
                         f"Response status code was {response.status_code}.",
-                        extra=dict(extra_log_attributes=dict(retry=retry)),
+                        extra=dict(extra_log_attributes=dict(retry=retry_state.retry)),
                     )
-                    raise RetryException
-                return response
-            except (
-                requests.exceptions.ConnectionError,
-                requests.exceptions.Timeout,
-                RetryException,
-            ):
+                    headers = getattr(response, "headers", None) or {}
+                    retry_after = parse_retry_after(headers.get("Retry-After"))
+                except (
+                    requests.exceptions.ConnectionError,
+                    requests.exceptions.Timeout,
+                ) as exp:
+                    # A read timeout means the server got the request
+                    request_sent = isinstance(exp, requests.exceptions.ReadTimeout)
+                    if not retry_state.policy.should_retry_error(method, request_sent):
+                        raise
                 logger.warning(
                     "Request failed. Retrying",
-                    extra=dict(extra_log_attributes=dict(retry=retry)),
+                    extra=dict(extra_log_attributes=dict(retry=retry_state.retry)),
                 )
-                sleep(backoff_time(retry))
-                retry += 1
-        raise Exception(f"Request failed after too many retries. URL: {kwargs.get('url', args[0] if args else 'Unknown')}")
+                delay = retry_state.next_delay(retry_after)
+                if delay is None:
+                    break
+                remaining = get_timeouts().remaining()
+                if remaining is not None and delay >= remaining:
+                    raise DeadlineExceeded(
+                        "The command would run out of time before the request is retried"
+                    )
+                metrics = request_metrics.get_request_metrics()
+                if metrics is not None:
+                    metrics.record_retry(
+                        method, kwargs.get("url", args[0] if args else "")
+                    )
+                sleep(delay)
+            raise Exception(
+                f"Request failed after too many retries. URL: {kwargs.get('url', args[0] if args else 'Unknown')}"
+            )
+
+        return wrapper
+
+    return decorator
 
-    return wrapper
+
+_post_with_retries = retry_request("POST")(post)
+_get_with_retries = retry_request("GET")(get)
+_put_with_retries = retry_request("PUT")(put)
+
+
+def timeout_result(url: str, exp: Exception) -> RequestResult:
+    description = f"Request to {url} timed out: {exp}"
+    return RequestResult(
+        status_code=0,
+        error=RequestError(code="Timeout", description=description, params={}),
+        warnings=[],
+        text="",
+    )
 
 
-@retry_request
 def send_post_request(
     url: str,
     data: Optional[dict] = None,
     headers: Optional[dict] = None,
     params: Optional[dict] = None,
 ):
-    return request_result(post(url=url, data=data, headers=headers, params=params))
+    try:
+        resp = _post_with_retries(url=url, data=data, headers=headers, params=params)
+    except (requests.exceptions.Timeout, DeadlineExceeded) as exp:
+        return timeout_result(url, exp)
+    return request_result(resp)
 
 
-@retry_request
 def send_get_request(
     url: str, headers: dict = None, params: dict = None
 ) -> RequestResult:
-    return request_result(get(url=url, headers=headers, params=params))
+    try:
+        resp = _get_with_retries(url=url, headers=headers, params=params)
+    except (requests.exceptions.Timeout, DeadlineExceeded) as exp:
+        return timeout_result(url, exp)
+    return request_result(resp)
 
 
 def get_token_header_or_fail(token: Optional[str]) -> dict:
@@ -121,13 +371,16 @@ def get_token_header(token: Optional[str]) -> Optional[dict]:
     return {"Authorization": f"token {token}"}
 
 
-@retry_request
 def send_put_request(
     url: str,
-    data: dict = None,
+    data: Union[dict, bytes, StreamingPayload] = None,
     headers: dict = None,
 ):
-    return request_result(put(url=url, data=data, headers=headers))
+    try:
+        resp = _put_with_retries(url=url, data=data, headers=headers)
+    except (requests.exceptions.Timeout, DeadlineExceeded) as exp:
+        return timeout_result(url, exp)
+    return request_result(resp)
 
 
 def request_result(resp: requests.Response) -> RequestResult:
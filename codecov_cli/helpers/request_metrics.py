@@ -0,0 +1,292 @@
+import json
+import re
+import sys
+import threading
+import typing
+from time import perf_counter
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.connection import HTTPConnection, HTTPSConnection
+
+_UUID_PATTERN = re.compile(
+    r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+)
+_HEX_PATTERN = re.compile(r"[0-9a-fA-F]{7,}")
+_NUMBER_PATTERN = re.compile(r"[0-9][0-9._:-]*")
+_LONG_SEGMENT_LENGTH = 32
+_PHASES = ("connect", "tls", "ttfb", "transfer", "total")
+
+
+def _template_segment(segment: str) -> str:
+    if "::::" in segment:
+        return "{slug}"
+    if _NUMBER_PATTERN.fullmatch(segment):
+        return "{id}"
+    segment = _UUID_PATTERN.sub("{uuid}", segment)
+    segment = _HEX_PATTERN.sub(
+        lambda match: (
+            "{sha}" if any(c.isdigit() for c in match.group()) else match.group()
+        ),
+        segment,
+    )
+    if len(segment) >= _LONG_SEGMENT_LENGTH:
+        return "{id}"
+    return segment
+
+
+def endpoint_template(method: str, url: str) -> str:
+    """
+    Groups requests to the same endpoint, e.g.
+    `POST api.codecov.io/upload/github/{slug}/commits/{sha}/reports`.
+
+    The query string, user info and the parts of the path that identify a
+    single commit, upload or object are left out, so tokens and URL signatures
+    don't end up in the metrics.
+    """
+    parts = urlsplit(url)
+    host = parts.hostname or ""
+    if parts.port is not None:
+        host = f"{host}:{parts.port}"
+    path = "/".join(_template_segment(segment) for segment in parts.path.split("/"))
+    return f"{method.upper()} {host}{path}"
+
+
+class _PhaseStats(object):
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "total": round(self.total, 6),
+            "mean": round(self.total / self.count, 6),
+            "max": round(self.max, 6),
+        }
+
+
+class EndpointMetrics(object):
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.status_codes: typing.Dict[str, int] = {}
+        self.errors: typing.Dict[str, int] = {}
+        self.timings = {phase: _PhaseStats() for phase in _PHASES}
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "status_codes": dict(sorted(self.status_codes.items())),
+            "errors": dict(sorted(self.errors.items())),
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "timings": {
+                phase: stats.as_dict()
+                for phase, stats in self.timings.items()
+                if stats.count
+            },
+        }
+
+
+class RequestMetrics(object):
+    """
+    Timings, sizes, status codes and retries of the requests made by a
+    command, per endpoint template. Safe to use from several threads.
+
+    Timings are in seconds. `connect` includes the DNS lookup and `tls` is the
+    handshake; both are only recorded for requests that opened a connection.
+    `ttfb` goes from the start of the request until the response headers
+    arrived, so it includes connecting and sending the body. `transfer` is the
+    time spent reading the response body.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints: typing.Dict[str, EndpointMetrics] = {}
+
+    def _endpoint(self, method: str, url: str) -> EndpointMetrics:
+        template = endpoint_template(method, url)
+        if template not in self._endpoints:
+            self._endpoints[template] = EndpointMetrics()
+        return self._endpoints[template]
+
+    def record(
+        self,
+        method: str,
+        url: str,
+        total: float,
+        status_code: typing.Optional[int] = None,
+        error: typing.Optional[BaseException] = None,
+        ttfb: typing.Optional[float] = None,
+        connect: typing.Optional[float] = None,
+        tls: typing.Optional[float] = None,
+        bytes_sent: int = 0,
+        bytes_received: int = 0,
+    ):
+        with self._lock:
+            endpoint = self._endpoint(method, url)
+            endpoint.requests += 1
+            endpoint.bytes_sent += bytes_sent
+            endpoint.bytes_received += bytes_received
+            if status_code is not None:
+                key = str(status_code)
+                endpoint.status_codes[key] = endpoint.status_codes.get(key, 0) + 1
+            if error is not None:
+                key = type(error).__name__
+                endpoint.errors[key] = endpoint.errors.get(key, 0) + 1
+            endpoint.timings["total"].add(total)
+            if ttfb is not None:
+                endpoint.timings["ttfb"].add(ttfb)
+                endpoint.timings["transfer"].add(max(0.0, total - ttfb))
+            if connect is not None:
+                endpoint.timings["connect"].add(connect)
+            if tls is not None:
+                endpoint.timings["tls"].add(tls)
+
+    def record_retry(self, method: str, url: str):
+        with self._lock:
+            self._endpoint(method, url).retries += 1
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "endpoints": {
+                    template: endpoint.as_dict()
+                    for template, endpoint in sorted(self._endpoints.items())
+                }
+            }
+
+    def write(self, destination: str):
+        """
+        Writes the metrics as JSON to the file `destination`, or to stderr if
+        it is "-".
+        """
+        content = json.dumps(self.as_dict(), indent=2)
+        if destination == "-":
+            sys.stderr.write(content + "\n")
+            return
+        with open(destination, "w") as file:
+            file.write(content + "\n")
+
+
+_metrics: typing.Optional[RequestMetrics] = None
+
+
+def configure_request_metrics(enabled: bool):
+    """
+    Starts collecting metrics for the requests made from now on, or stops
+    collecting them.
+    """
+    global _metrics
+    _metrics = RequestMetrics() if enabled else None
+
+
+def get_request_metrics() -> typing.Optional[RequestMetrics]:
+    return _metrics
+
+
+def body_size(body) -> typing.Optional[int]:
+    """
+    Size in bytes of a request body, or None if it's only known once sent.
+    """
+    if body is None:
+        return 0
+    if isinstance(body, str):
+        return len(body.encode())
+    if isinstance(body, (bytes, bytearray)):
+        return len(body)
+    if hasattr(body, "__len__") and not isinstance(body, dict):
+        # Streamed bodies of known size
+        return len(body)
+    return None
+
+
+class CountingIterable(object):
+    """
+    Wraps a streamed request body to count the bytes sent, every time it's
+    iterated.
+    """
+
+    def __init__(self, iterable: typing.Iterable[bytes]):
+        self._iterable = iterable
+        self.size = 0
+
+    def __iter__(self) -> typing.Iterator[bytes]:
+        self.size = 0
+        for chunk in self._iterable:
+            self.size += len(chunk)
+            yield chunk
+
+
+# Connection timings of the request being sent by the current thread
+_connection_timings = threading.local()
+
+
+def reset_connection_timings():
+    _connection_timings.connect = None
+    _connection_timings.tls = None
+
+
+def get_connection_timings() -> typing.Tuple[
+    typing.Optional[float], typing.Optional[float]
+]:
+    return (
+        getattr(_connection_timings, "connect", None),
+        getattr(_connection_timings, "tls", None),
+    )
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    def _new_conn(self):
+        start = perf_counter()
+        sock = super()._new_conn()
+        _connection_timings.connect = perf_counter() - start
+        return sock
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def _new_conn(self):
+        start = perf_counter()
+        sock = super()._new_conn()
+        _connection_timings.connect = perf_counter() - start
+        return sock
+
+    def connect(self):
+        _connection_timings.connect = None
+        start = perf_counter()
+        super().connect()
+        connect = getattr(_connection_timings, "connect", None) or 0.0
+        _connection_timings.tls = perf_counter() - start - connect
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """
+    `HTTPAdapter` that measures how long opening each connection takes, for
+    `get_connection_timings`.
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
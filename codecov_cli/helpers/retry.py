@@ -0,0 +1,117 @@
+import random
+import typing
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from time import monotonic
+
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_RETRY_STATUSES = frozenset([429, *range(500, 600)])
+# Sending these twice has the same effect as sending them once
+IDEMPOTENT_METHODS = frozenset(["DELETE", "GET", "HEAD", "OPTIONS", "PUT"])
+
+
+def parse_retry_after(value: typing.Optional[str]) -> typing.Optional[float]:
+    """
+    Seconds to wait according to a `Retry-After` header, given either as a
+    number of seconds or as an HTTP date.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class RetryPolicy(object):
+    """
+    Decides which failed requests are retried and how long to wait in between.
+
+    Waits use decorrelated jitter, so clients that failed at the same time
+    don't retry at the same time. A `Retry-After` header from the server is
+    honored, up to `max_delay`. With a `deadline` (seconds), no retry is
+    started that would end past the deadline, counted from when the policy
+    is created. The CLI creates one policy per command, so the deadline
+    covers all the requests of the command.
+
+    Requests with a non-idempotent method (like POST) are not retried after
+    an error that happened once the request was sent, since the server might
+    have processed it already.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        retry_statuses: typing.Iterable[int] = DEFAULT_RETRY_STATUSES,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        deadline: typing.Optional[float] = None,
+        idempotent_methods: typing.Iterable[str] = IDEMPOTENT_METHODS,
+    ):
+        self.max_attempts = max_attempts
+        self.retry_statuses = frozenset(retry_statuses)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self._deadline_at = monotonic() + deadline if deadline is not None else None
+        self.idempotent_methods = frozenset(m.upper() for m in idempotent_methods)
+
+    def is_idempotent(self, method: str) -> bool:
+        return method.upper() in self.idempotent_methods
+
+    def should_retry_status(self, status_code: int) -> bool:
+        return status_code in self.retry_statuses
+
+    def remaining(self) -> typing.Optional[float]:
+        """
+        Seconds left before the deadline, or None if there is no deadline.
+        """
+        if self._deadline_at is None:
+            return None
+        return self._deadline_at - monotonic()
+
+    def should_retry_error(self, method: str, request_sent: bool) -> bool:
+        return not request_sent or self.is_idempotent(method)
+
+    def start(self) -> "RetryState":
+        return RetryState(self)
+
+
+class RetryState(object):
+    """
+    Attempts made so far for a single request under a `RetryPolicy`.
+    """
+
+    def __init__(self, policy: RetryPolicy):
+        self.policy = policy
+        self.retry = 0
+        self._previous_delay = policy.base_delay
+
+    def next_delay(
+        self, retry_after: typing.Optional[float] = None
+    ) -> typing.Optional[float]:
+        """
+        Seconds to wait before the next attempt, or None if the request
+        shouldn't be attempted again.
+        """
+        policy = self.policy
+        if self.retry + 1 >= policy.max_attempts:
+            return None
+        delay = min(
+            policy.max_delay,
+            random.uniform(policy.base_delay, self._previous_delay * 3),
+        )
+        self._previous_delay = delay
+        if retry_after is not None:
+            delay = min(policy.max_delay, max(delay, retry_after))
+        remaining = policy.remaining()
+        if remaining is not None and delay > remaining:
+            return None
+        self.retry += 1
+        return delay
@@ -0,0 +1,84 @@
+import typing
+from time import monotonic
+
+import httpx
+import requests
+
+DEFAULT_CONNECT_TIMEOUT = 10.0
+DEFAULT_READ_TIMEOUT = 60.0
+DEFAULT_WRITE_TIMEOUT = 60.0
+
+
+class DeadlineExceeded(requests.exceptions.RequestException):
+    """
+    Raised when a request can't start or continue because the command ran out
+    of time.
+    """
+
+
+class RequestTimeouts(object):
+    """
+    Time limits for network calls, in seconds.
+
+    `connect`, `read` and `write` apply to each request. `total` is a deadline
+    for all requests of the command, counted from when these timeouts are
+    created. `requests` has no separate write timeout, so `write` only applies
+    to `httpx` clients.
+    """
+
+    def __init__(
+        self,
+        connect: typing.Optional[float] = DEFAULT_CONNECT_TIMEOUT,
+        read: typing.Optional[float] = DEFAULT_READ_TIMEOUT,
+        write: typing.Optional[float] = DEFAULT_WRITE_TIMEOUT,
+        total: typing.Optional[float] = None,
+    ):
+        self.connect = connect
+        self.read = read
+        self.write = write
+        self.total = total
+        self._deadline = monotonic() + total if total is not None else None
+
+    def remaining(self) -> typing.Optional[float]:
+        """
+        Seconds left before the deadline, or None if there is no deadline.
+        """
+        if self._deadline is None:
+            return None
+        return self._deadline - monotonic()
+
+    def _limit(self, timeout: typing.Optional[float]) -> typing.Optional[float]:
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+        if remaining <= 0:
+            raise DeadlineExceeded(
+                f"The command did not finish within {self.total} seconds"
+            )
+        return remaining if timeout is None else min(timeout, remaining)
+
+    def for_requests(self) -> typing.Tuple[typing.Optional[float], ...]:
+        """
+        `timeout` argument for `requests`, as (connect, read).
+        """
+        return (self._limit(self.connect), self._limit(self.read))
+
+    def for_httpx(self, pool: typing.Optional[float] = None) -> httpx.Timeout:
+        return httpx.Timeout(
+            connect=self._limit(self.connect),
+            read=self._limit(self.read),
+            write=self._limit(self.write),
+            pool=self._limit(pool),
+        )
+
+
+_timeouts = RequestTimeouts()
+
+
+def configure_timeouts(timeouts: RequestTimeouts):
+    global _timeouts
+    _timeouts = timeouts
+
+
+def get_timeouts() -> RequestTimeouts:
+    return _timeouts
@@ -10,6 +10,7 @@ from codecov_cli.commands.base_picking import pr_base_picking
 from codecov_cli.commands.commit import create_commit
 from codecov_cli.commands.create_report_result import create_report_results
 from codecov_cli.commands.empty_upload import empty_upload
+from codecov_cli.commands.flush_spool import flush_spool
 from codecov_cli.commands.get_report_results import get_report_results
 from codecov_cli.commands.labelanalysis import label_analysis
 from codecov_cli.commands.process_test_results import process_test_results
@@ -22,11 +23,54 @@ from codecov_cli.commands.upload_process import upload_process
 from codecov_cli.helpers.ci_adapters import get_ci_adapter, get_ci_providers_list
 from codecov_cli.helpers.config import load_cli_config
 from codecov_cli.helpers.logging_utils import configure_logger
+from codecov_cli.helpers.request import (
+    DEFAULT_POOL_SIZE,
+    configure_retry_policy,
+    configure_session,
+)
+from codecov_cli.helpers.request_metrics import (
+    configure_request_metrics,
+    get_request_metrics,
+)
+from codecov_cli.helpers.retry import DEFAULT_MAX_ATTEMPTS, RetryPolicy
+from codecov_cli.helpers.timeouts import (
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+    DEFAULT_WRITE_TIMEOUT,
+    RequestTimeouts,
+    configure_timeouts,
+)
 from codecov_cli.helpers.versioning_systems import get_versioning_system
 
 logger = logging.getLogger("codecovcli")
 
 
+def _get_request_timeouts(
+    codecov_yaml: typing.Optional[dict], **timeouts
+) -> RequestTimeouts:
+    """
+    Timeouts given as options take precedence over `cli.timeouts` in the
+    codecov.yml, which take precedence over the defaults.
+    """
+    yaml_timeouts = ((codecov_yaml or {}).get("cli") or {}).get("timeouts") or {}
+    for name, value in timeouts.items():
+        if value is None:
+            timeouts[name] = yaml_timeouts.get(name)
+    return RequestTimeouts(
+        **{name: value for name, value in timeouts.items() if value is not None}
+    )
+
+
+def _write_request_metrics(path: str):
+    metrics = get_request_metrics()
+    if metrics is None:
+        return
+    try:
+        metrics.write(path)
+    except OSError as exp:
+        logger.warning(f"Could not write request metrics to {path}: {exp}")
+
+
 @click.group()
 @click.option(
     "--auto-load-params-from",
@@ -47,6 +91,67 @@ logger = logging.getLogger("codecovcli")
 @click.option(
     "--disable-telem", help="Disable sending telemetry data to Codecov", is_flag=True
 )
+@click.option(
+    "--http-pool-size",
+    help="Number of HTTP connections kept alive per host",
+    type=click.IntRange(min=1),
+    default=DEFAULT_POOL_SIZE,
+    show_default=True,
+    envvar="CODECOV_HTTP_POOL_SIZE",
+)
+@click.option(
+    "--http2",
+    help="Use HTTP/2 for https requests when the server supports it. Needs the h2 package",
+    is_flag=True,
+    envvar="CODECOV_HTTP2",
+)
+@click.option(
+    "--max-request-attempts",
+    help="Number of times a failed request is attempted before giving up",
+    type=click.IntRange(min=1),
+    default=DEFAULT_MAX_ATTEMPTS,
+    show_default=True,
+    envvar="CODECOV_MAX_REQUEST_ATTEMPTS",
+)
+@click.option(
+    "--request-deadline",
+    help="Seconds from the start of the command after which failed requests are no longer retried",
+    type=click.FloatRange(min=0),
+    default=None,
+    envvar="CODECOV_REQUEST_DEADLINE",
+)
+@click.option(
+    "--connect-timeout",
+    help=f"Seconds to wait for a connection to be established  [default: {DEFAULT_CONNECT_TIMEOUT:g}]",
+    type=click.FloatRange(min=0, min_open=True),
+    envvar="CODECOV_CONNECT_TIMEOUT",
+)
+@click.option(
+    "--read-timeout",
+    help=f"Seconds to wait for the server to send data  [default: {DEFAULT_READ_TIMEOUT:g}]",
+    type=click.FloatRange(min=0, min_open=True),
+    envvar="CODECOV_READ_TIMEOUT",
+)
+@click.option(
+    "--write-timeout",
+    help=f"Seconds to wait for the server to accept data  [default: {DEFAULT_WRITE_TIMEOUT:g}]",
+    type=click.FloatRange(min=0, min_open=True),
+    envvar="CODECOV_WRITE_TIMEOUT",
+)
+@click.option(
+    "--command-timeout",
+    help="Seconds after which no more requests are made for the command",
+    type=click.FloatRange(min=0, min_open=True),
+    envvar="CODECOV_COMMAND_TIMEOUT",
+)
+@click.option(
+    "--request-metrics",
+    "request_metrics_path",
+    help="Write timings, sizes and status codes of the requests made, per endpoint, as JSON to this file when the command ends. Use - for stderr",
+    type=click.Path(dir_okay=False, allow_dash=True),
+    default=None,
+    envvar="CODECOV_REQUEST_METRICS",
+)
 @click.pass_context
 @click.version_option(__version__, prog_name="codecovcli")
 def cli(
@@ -56,10 +161,26 @@ def cli(
     enterprise_url: str,
     verbose: bool = False,
     disable_telem: bool = False,
+    http_pool_size: int = DEFAULT_POOL_SIZE,
+    http2: bool = False,
+    max_request_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    request_deadline: typing.Optional[float] = None,
+    connect_timeout: typing.Optional[float] = None,
+    read_timeout: typing.Optional[float] = None,
+    write_timeout: typing.Optional[float] = None,
+    command_timeout: typing.Optional[float] = None,
+    request_metrics_path: typing.Optional[str] = None,
 ):
     ctx.obj["cli_args"] = ctx.params
     ctx.obj["cli_args"]["version"] = f"cli-{__version__}"
     configure_logger(logger, log_level=(logging.DEBUG if verbose else logging.INFO))
+    configure_session(pool_size=http_pool_size, http2=http2)
+    configure_retry_policy(
+        RetryPolicy(max_attempts=max_request_attempts, deadline=request_deadline)
+    )
+    configure_request_metrics(request_metrics_path is not None)
+    if request_metrics_path is not None:
+        ctx.call_on_close(lambda: _write_request_metrics(request_metrics_path))
     ctx.help_option_names = ["-h", "--help"]
     ctx.obj["ci_adapter"] = get_ci_adapter(auto_load_params_from)
     ctx.obj["versioning_system"] = get_versioning_system()
@@ -68,6 +189,15 @@ def cli(
         logger.debug("No codecov_yaml found")
     elif (token := ctx.obj["codecov_yaml"].get("codecov", {}).get("token")) is not None:
         ctx.default_map = {ctx.invoked_subcommand: {"token": token}}
+    configure_timeouts(
+        _get_request_timeouts(
+            ctx.obj["codecov_yaml"],
+            connect=connect_timeout,
+            read=read_timeout,
+            write=write_timeout,
+            total=command_timeout,
+        )
+    )
     ctx.obj["enterprise_url"] = enterprise_url
     ctx.obj["disable_telem"] = disable_telem
 
@@ -87,6 +217,7 @@ cli.add_command(upload_coverage)
 cli.add_command(upload_process)
 cli.add_command(send_notifications)
 cli.add_command(process_test_results)
+cli.add_command(flush_spool)
 
 
 def run():
@@ -1,20 +1,39 @@
 import asyncio
+import hashlib
 import json
 import logging
+import os
+import threading
+import time
 import typing
 from functools import partial
 from multiprocessing import Pool
+from multiprocessing.pool import ThreadPool
 from pathlib import Path
 
 import click
 import httpx
 import requests
 
-from codecov_cli.helpers import request
+from codecov_cli.helpers import async_request, request
 from codecov_cli.helpers.config import CODECOV_API_URL
-from codecov_cli.services.staticanalysis.analyzers import get_best_analyzer
+from codecov_cli.helpers.timeouts import DeadlineExceeded, get_timeouts
+from codecov_cli.services.staticanalysis.analyzers import (
+    get_analyzer_class,
+    get_best_analyzer,
+    load_analyzers,
+)
+from codecov_cli.services.staticanalysis.cache import AnalysisCache
 from codecov_cli.services.staticanalysis.exceptions import AnalysisError
 from codecov_cli.services.staticanalysis.finders import select_file_finder
+from codecov_cli.services.staticanalysis.result_store import AnalysisResultStore
+from codecov_cli.services.staticanalysis.scheduling import (
+    BatchResult,
+    WorkerUtilisation,
+    get_file_size,
+    schedule_files,
+    select_executor,
+)
 from codecov_cli.services.staticanalysis.types import (
     FileAnalysisRequest,
     FileAnalysisResult,
@@ -34,10 +53,37 @@ async def run_analysis_entrypoint(
     folders_to_exclude: typing.List[Path],
     enterprise_url: typing.Optional[str],
     args: dict,
+    cache_path: typing.Optional[Path] = None,
+    pipelined: bool = False,
+    file_finder: str = "walk",
+    base_commit: typing.Optional[str] = None,
+    executor: str = "auto",
 ):
-    ff = select_file_finder(config)
+    ff = select_file_finder(config, file_finder, base_commit)
     files = list(ff.find_files(folder, pattern, folders_to_exclude))
-    processing_results = await process_files(files, numberprocesses, config)
+    cache = AnalysisCache(cache_path) if cache_path is not None else None
+    upload_url = enterprise_url or CODECOV_API_URL
+    if pipelined:
+        processing_errors = await run_pipelined_analysis(
+            files,
+            numberprocesses,
+            config,
+            cache,
+            upload_url,
+            token,
+            commit,
+            should_force,
+            executor=executor,
+        )
+        if cache is not None:
+            cache.evict()
+        log_processing_errors(processing_errors)
+        return
+    processing_results = await process_files(
+        files, numberprocesses, config, cache, executor
+    )
+    if cache is not None:
+        cache.evict()
     # Let users know if there were processing errors
     # This is here and not in the function so we can add an option to ignore those (possibly)
     # Also makes the function easier to test
@@ -46,49 +92,7 @@ async def run_analysis_entrypoint(
     # Upload results metadata to codecov to get list of files that we need to upload
     file_metadata = processing_results["file_metadata"]
     all_data = processing_results["all_data"]
-    try:
-        json_output = {"commit": commit, "filepaths": file_metadata}
-        logger.info(
-            "Sending files fingerprints to Codecov",
-            extra=dict(
-                extra_log_attributes=dict(
-                    files_effectively_analyzed=len(json_output["filepaths"])
-                )
-            ),
-        )
-        logger.debug(
-            "Data sent to Codecov",
-            extra=dict(extra_log_attributes=dict(json_payload=json_output)),
-        )
-        upload_url = enterprise_url or CODECOV_API_URL
-        response = request.post(
-            f"{upload_url}/staticanalysis/analyses",
-            data=json_output,
-            headers={"Authorization": f"Repotoken {token}"},
-        )
-        response_json = response.json()
-        if response.status_code >= 500:
-            raise click.ClickException("Sorry. Codecov is having problems")
-        if response.status_code >= 400:
-            raise click.ClickException(
-                f"There is some problem with the submitted information.\n{response_json.get('detail')}"
-            )
-    except requests.RequestException:
-        raise click.ClickException(click.style("Unable to reach Codecov", fg="red"))
-    logger.info(
-        "Received response from server",
-        extra=dict(
-            extra_log_attributes=dict(time_taken=response.elapsed.total_seconds())
-        ),
-    )
-    logger.debug(
-        "Response",
-        extra=dict(
-            extra_log_attributes=dict(
-                response_json=response_json,
-            )
-        ),
-    )
+    response_json = send_fingerprints(upload_url, token, commit, file_metadata)
 
     valid_files_len = len(
         [el for el in response_json["filepaths"] if el["state"].lower() == "valid"]
@@ -116,9 +120,12 @@ async def run_analysis_entrypoint(
             # It's better to have less files competing over CPU time when uploading
             # Especially if we might have large files
             limits = httpx.Limits(max_connections=20)
-            # Because there might be too many files to upload we will ignore most timeouts
-            timeout = httpx.Timeout(read=None, pool=None, connect=None, write=10.0)
-            async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+            # Because there might be too many files to upload we don't limit
+            # the time spent waiting for a free connection
+            timeout = get_timeouts().for_httpx(pool=None)
+            async with async_request.async_client(
+                timeout=timeout, limits=limits
+            ) as client:
                 all_tasks = []
                 for el in files_that_need_upload:
                     all_tasks.append(send_single_upload_put(client, all_data, el))
@@ -165,6 +172,61 @@ async def run_analysis_entrypoint(
     log_processing_errors(processing_errors)
 
 
+def send_fingerprints(
+    upload_url: str,
+    token: str,
+    commit: str,
+    file_metadata: typing.List[typing.Dict[str, str]],
+) -> typing.Dict:
+    """
+    Sends the hashes of the analyzed files to Codecov, and returns the state
+    of each of them and where to upload the ones it doesn't have yet.
+    """
+    try:
+        json_output = {"commit": commit, "filepaths": file_metadata}
+        logger.info(
+            "Sending files fingerprints to Codecov",
+            extra=dict(
+                extra_log_attributes=dict(
+                    files_effectively_analyzed=len(json_output["filepaths"])
+                )
+            ),
+        )
+        logger.debug(
+            "Data sent to Codecov",
+            extra=dict(extra_log_attributes=dict(json_payload=json_output)),
+        )
+        response = request.post(
+            f"{upload_url}/staticanalysis/analyses",
+            data=json_output,
+            headers={"Authorization": f"Repotoken {token}"},
+        )
+        response_json = response.json()
+        if response.status_code >= 500:
+            raise click.ClickException("Sorry. Codecov is having problems")
+        if response.status_code >= 400:
+            raise click.ClickException(
+                f"There is some problem with the submitted information.\n{response_json.get('detail')}"
+            )
+    except requests.RequestException:
+        raise click.ClickException(click.style("Unable to reach Codecov", fg="red"))
+    logger.info(
+        "Received response from server",
+        extra=dict(
+            extra_log_attributes=dict(time_taken=response.elapsed.total_seconds())
+        ),
+    )
+    logger.debug(
+        "Response",
+        extra=dict(
+            extra_log_attributes=dict(
+                response_json=response_json,
+            )
+        ),
+    )
+    return response_json
+
+
 def log_processing_errors(processing_errors: typing.Dict[str, str]) -> None:
     if len(processing_errors) > 0:
         logger.error(
@@ -178,60 +240,262 @@ async def process_files(
     files_to_analyze: typing.List[FileAnalysisRequest],
     numberprocesses: int,
     config: typing.Optional[typing.Dict],
+    cache: typing.Optional[AnalysisCache] = None,
+    executor: str = "auto",
 ):
-    logger.info(f"Running the analyzer on {len(files_to_analyze)} files")
-    mapped_func = partial(analyze_file, config)
     all_data = {}
     file_metadata = []
     errors = {}
+
+    def add_result(result: FileAnalysisResult):
+        if result.result:
+            all_data[result.filename] = result.result
+            file_metadata.append(
+                {
+                    "filepath": result.filename,
+                    "file_hash": result.result["hash"],
+                }
+            )
+        elif result.error:
+            errors[result.filename] = result.error
+
+    analyze_files(
+        files_to_analyze, numberprocesses, config, add_result, cache, executor
+    )
+    return dict(
+        all_data=all_data, file_metadata=file_metadata, processing_errors=errors
+    )
+
+
+def analyze_files(
+    files_to_analyze: typing.List[FileAnalysisRequest],
+    numberprocesses: int,
+    config: typing.Optional[typing.Dict],
+    on_result: typing.Callable[[FileAnalysisResult], None],
+    cache: typing.Optional[AnalysisCache] = None,
+    executor: str = "auto",
+):
+    """
+    Analyzes the files with the given executor (see `select_executor`),
+    calling `on_result` with the result of each file as soon as it's
+    available.
+    """
+    logger.info(f"Running the analyzer on {len(files_to_analyze)} files")
+    mapped_func = partial(analyze_batch, config)
+    cached_results = []
+    cache_keys = {}
+    files_to_process = files_to_analyze
+    if cache is not None:
+        cached_results, files_to_process, cache_keys = cache.split_cached_files(
+            files_to_analyze
+        )
+        logger.info(f"Reusing cached analysis of {len(cached_results)} files")
+
     with click.progressbar(
         length=len(files_to_analyze),
         label="Analyzing files",
     ) as bar:
-        # https://docs.python.org/3/library/multiprocessing.html#contexts-and-start-methods
-        # from the link above, we want to use the default start methods
-        with Pool(processes=numberprocesses) as pool:
-            file_results = pool.imap_unordered(mapped_func, files_to_analyze)
-            for result in file_results:
-                bar.update(1, result)
-                if result is not None:
-                    if result.result:
-                        all_data[result.filename] = result.result
-                        file_metadata.append(
-                            {
-                                "filepath": result.filename,
-                                "file_hash": result.result["hash"],
-                            }
-                        )
-                    elif result.error:
-                        errors[result.filename] = result.error
+        for result in cached_results:
+            bar.update(1, result)
+            on_result(result)
+        if files_to_process:
+            file_sizes = [get_file_size(f) for f in files_to_process]
+            selected_executor = select_executor(
+                executor, len(files_to_process), sum(file_sizes), numberprocesses
+            )
+            batches = schedule_files(
+                files_to_process,
+                1 if selected_executor == "inline" else numberprocesses,
+                file_sizes,
+            )
+            logger.debug(
+                f"Analyzing {len(files_to_process)} files in {len(batches)} batches",
+                extra=dict(
+                    extra_log_attributes=dict(
+                        executor=selected_executor, total_size=sum(file_sizes)
+                    )
+                ),
+            )
+            utilisation = WorkerUtilisation()
+            start_time = time.monotonic()
+            with _start_executor(selected_executor, numberprocesses) as pool:
+                batch_results = pool.imap_unordered(mapped_func, batches)
+                for batch_result in batch_results:
+                    utilisation.add(batch_result)
+                    for result in batch_result.results:
+                        bar.update(1, result)
+                        if result is None:
+                            continue
+                        on_result(result)
+                        if result.result and result.filename in cache_keys:
+                            cache.set(cache_keys[result.filename], result.result)
+            utilisation.log(time.monotonic() - start_time)
     logger.info("All files have been processed")
-    return dict(
-        all_data=all_data, file_metadata=file_metadata, processing_errors=errors
+
+
+async def run_pipelined_analysis(
+    files_to_analyze: typing.List[FileAnalysisRequest],
+    numberprocesses: int,
+    config: typing.Optional[typing.Dict],
+    cache: typing.Optional[AnalysisCache],
+    upload_url: str,
+    token: str,
+    commit: str,
+    should_force: bool,
+    executor: str = "auto",
+) -> typing.Dict[str, str]:
+    """
+    Analyzes the files while uploading the results Codecov asks for, instead
+    of waiting for all files to be analyzed.
+    The fingerprints are the hashes of the file contents, so they are sent
+    before the files are analyzed, creating a single analysis. Results are
+    kept on disk until they are uploaded. Returns the processing errors.
+    """
+    loop = asyncio.get_running_loop()
+    analyzed = asyncio.Queue()
+    errors = {}
+    stopped = threading.Event()
+    with AnalysisResultStore() as store:
+        # Called from the analysis thread
+        def add_result(result: FileAnalysisResult):
+            if stopped.is_set():
+                raise _AnalysisStopped()
+            if result.result:
+                store[result.filename] = result.result
+                loop.call_soon_threadsafe(analyzed.put_nowait, result.filename)
+            elif result.error:
+                errors[result.filename] = result.error
+
+        file_metadata = get_fingerprints(files_to_analyze)
+        analysis = loop.run_in_executor(
+            None,
+            analyze_files,
+            files_to_analyze,
+            numberprocesses,
+            config,
+            add_result,
+            cache,
+            executor,
+        )
+        analysis.add_done_callback(lambda _: analyzed.put_nowait(None))
+
+        limits = httpx.Limits(max_connections=20)
+        timeout = get_timeouts().for_httpx(pool=None)
+        async with async_request.async_client(timeout=timeout, limits=limits) as client:
+            upload_tasks = []
+            try:
+                response_json = await loop.run_in_executor(
+                    None, send_fingerprints, upload_url, token, commit, file_metadata
+                )
+                valid_files_len = 0
+                files_to_upload = {}
+                for el in response_json["filepaths"]:
+                    if el["state"].lower() == "valid":
+                        valid_files_len += 1
+                    if el["state"].lower() == "created" or should_force:
+                        files_to_upload[el["filepath"]] = el
+                logger.info(
+                    f"{valid_files_len} files VALID; {len(files_to_upload)} files to upload",
+                )
+                if not files_to_upload:
+                    logger.info("All files are already uploaded!")
+                while True:
+                    filename = await analyzed.get()
+                    if filename is None:
+                        break
+                    el = files_to_upload.pop(filename, None)
+                    if el is not None:
+                        upload_tasks.append(
+                            asyncio.ensure_future(
+                                send_single_upload_put(client, store, el)
+                            )
+                        )
+                # Raises the errors of the analysis, if any
+                await analysis
+            except BaseException:
+                for task in upload_tasks:
+                    task.cancel()
+                # The analysis thread writes to the store, so it has to stop
+                # before the store is deleted
+                stopped.set()
+                await asyncio.gather(analysis, return_exceptions=True)
+                raise
+            try:
+                upload_results = await asyncio.gather(*upload_tasks)
+            except asyncio.CancelledError:
+                raise click.ClickException("Unknown error cancelled the upload tasks.")
+    uploaded_files = [r["filepath"] for r in upload_results if r["succeeded"]]
+    # Files whose analysis failed have no result to upload
+    failed_uploads = [
+        r["filepath"] for r in upload_results if not r["succeeded"]
+    ] + list(files_to_upload)
+    if failed_uploads:
+        logger.warning(f"{len(failed_uploads)} files failed to upload")
+        logger.debug(
+            "Failed files",
+            extra=dict(extra_log_attributes=dict(filenames=failed_uploads)),
+        )
+    logger.info(
+        f"Uploaded {len(uploaded_files)} files",
     )
+    try:
+        response = send_finish_signal(response_json, upload_url, token)
+    except requests.RequestException:
+        raise click.ClickException(click.style("Unable to reach Codecov", fg="red"))
+    logger.info(
+        "Received response with status code %s from server",
+        response.status_code,
+        extra=dict(
+            extra_log_attributes=dict(time_taken=response.elapsed.total_seconds())
+        ),
+    )
+    return errors
+
+
+class _AnalysisStopped(Exception):
+    pass
+
+
+def get_fingerprints(
+    files_to_analyze: typing.List[FileAnalysisRequest],
+) -> typing.List[typing.Dict[str, str]]:
+    """
+    The fingerprints sent to Codecov for the files an analyzer handles,
+    without analyzing them. Like the "hash" of the analyzer output, they are
+    the md5 of the file contents.
+    """
+    file_metadata = []
+    for filename in files_to_analyze:
+        if get_analyzer_class(filename) is None:
+            continue
+        try:
+            with open(filename.actual_filepath, "rb") as file:
+                file_hash = hashlib.md5(file.read()).hexdigest()
+        except OSError:
+            # Analyzing it fails too, and reports the error
+            continue
+        file_metadata.append(
+            {"filepath": filename.result_filename, "file_hash": file_hash}
+        )
+    return file_metadata
 
 
 async def send_single_upload_put(client, all_data, el) -> typing.Dict:
-    retryable_statuses = (429,)
     presigned_put = el["raw_upload_location"]
-    number_retries = 5
     try:
-        for current_retry in range(number_retries):
-            response = await client.put(
-                presigned_put, data=json.dumps(all_data[el["filepath"]])
-            )
-            if response.status_code < 300:
-                return {
-                    "status_code": response.status_code,
-                    "filepath": el["filepath"],
-                    "succeeded": True,
-                }
-            if response.status_code in retryable_statuses:
-                await asyncio.sleep(2**current_retry)
+        response = await async_request.send_with_retries(
+            client, "PUT", presigned_put, data=json.dumps(all_data[el["filepath"]])
+        )
+        if response.status_code < 300:
+            return {
+                "status_code": response.status_code,
+                "filepath": el["filepath"],
+                "succeeded": True,
+            }
         status_code = response.status_code
         message_to_warn = response.text
         exception = None
-    except httpx.HTTPError as exp:
+    except (httpx.HTTPError, DeadlineExceeded) as exp:
         status_code = None
         exception = type(exp)
         message_to_warn = str(exp)
@@ -273,6 +537,57 @@ def send_finish_signal(response_json, upload_url: str, token: str):
     return response
 
 
+class _InlineExecutor(object):
+    """
+    Runs the batches in the calling thread, with the same interface as a Pool.
+    """
+
+    def __enter__(self):
+        load_analyzers()
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def imap_unordered(self, func, iterable):
+        return map(func, iterable)
+
+
+def _start_executor(executor: str, numberprocesses: typing.Optional[int]):
+    if executor == "inline":
+        return _InlineExecutor()
+    if executor == "thread":
+        # Loaded here so the threads don't race to load them
+        load_analyzers()
+        return ThreadPool(processes=numberprocesses)
+    # https://docs.python.org/3/library/multiprocessing.html#contexts-and-start-methods
+    # from the link above, we want to use the default start methods
+    return Pool(processes=numberprocesses, initializer=_init_worker)
+
+
+def _init_worker():
+    # A Pool replaces workers whose initializer fails, forever. Analyzing the
+    # first file fails the same way instead, and the error reaches the caller
+    try:
+        load_analyzers()
+    except Exception:
+        pass
+
+
+def analyze_batch(config, batch: typing.List[FileAnalysisRequest]) -> BatchResult:
+    start_time = time.monotonic()
+    results = [analyze_file(config, filename) for filename in batch]
+    return BatchResult(
+        worker=(
+            os.getpid()
+            if threading.current_thread() is threading.main_thread()
+            else threading.get_ident()
+        ),
+        busy_time=time.monotonic() - start_time,
+        results=results,
+    )
+
+
 def analyze_file(
     config, filename: FileAnalysisRequest
 ) -> typing.Optional[FileAnalysisResult]:
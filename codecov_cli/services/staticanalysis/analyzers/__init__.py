@@ -1,14 +1,37 @@
+import typing
+
 from codecov_cli.services.staticanalysis.analyzers.general import BaseAnalyzer
 from codecov_cli.services.staticanalysis.analyzers.javascript_es6 import ES6Analyzer
 from codecov_cli.services.staticanalysis.analyzers.python import PythonAnalyzer
 from codecov_cli.services.staticanalysis.types import FileAnalysisRequest
 
 
-def get_best_analyzer(
-    filename: FileAnalysisRequest, actual_code: bytes
-) -> BaseAnalyzer:
+ANALYZER_CLASSES = [PythonAnalyzer, ES6Analyzer]
+
+
+def load_analyzers():
+    """
+    Loads the languages and compiles the queries of all analyzers, so the
+    first files analyzed by a worker process don't pay for it.
+    """
+    for analyzer_class in ANALYZER_CLASSES:
+        analyzer_class.get_language_context()
+
+
+def get_analyzer_class(
+    filename: FileAnalysisRequest,
+) -> typing.Optional[typing.Type[BaseAnalyzer]]:
     if filename.actual_filepath.suffix == ".py":
-        return PythonAnalyzer(filename, actual_code)
+        return PythonAnalyzer
     if filename.actual_filepath.suffix == ".js":
-        return ES6Analyzer(filename, actual_code)
+        return ES6Analyzer
     return None
+
+
+def get_best_analyzer(
+    filename: FileAnalysisRequest, actual_code: bytes
+) -> BaseAnalyzer:
+    analyzer_class = get_analyzer_class(filename)
+    if analyzer_class is None:
+        return None
+    return analyzer_class(filename, actual_code)
@@ -1,55 +1,137 @@
 import hashlib
-from collections import deque
+import threading
+import typing
+
+from tree_sitter import Language, Node, Parser
+
+import staticcodecov_languages
+
+
+class LanguageContext(object):
+    """
+    Tree-sitter language, parser and compiled queries of an analyzer.
+
+    Loading a language and compiling queries takes much longer than parsing a
+    typical file, so they are created once per process and shared by all the
+    analyzers of that language. A parser can't be used by two threads at
+    once, so each thread gets its own.
+    """
+
+    def __init__(self, language_name: str, queries: typing.Dict[str, str]):
+        self.language = Language(staticcodecov_languages.__file__, language_name)
+        self._local = threading.local()
+        self.queries = {
+            name: self.language.query(query_str) for name, query_str in queries.items()
+        }
+
+    @property
+    def parser(self) -> Parser:
+        parser = getattr(self._local, "parser", None)
+        if parser is None:
+            parser = Parser()
+            parser.set_language(self.language)
+            self._local.parser = parser
+        return parser
+
+
+_language_contexts: typing.Dict[type, LanguageContext] = {}
+
+
+class BaseNodeVisitor(object):
+    """
+    Visits every node of a tree once, in the same order as a recursive
+    pre-order traversal, and computes the complexity metrics of the function
+    bodies in the same pass.
+
+    The tree is walked with a TreeCursor instead of recursion, so deeply
+    nested code (e.g. generated code) doesn't hit the recursion limit.
+    """
+
+    def __init__(self, analyzer):
+        self.analyzer = analyzer
+
+    def start_visit(self, node: Node, function_bodies: typing.Iterable[Node] = ()):
+        """
+        Returns the complexity metrics of each node in function_bodies, by node id.
+        """
+        condition_statements = frozenset(self.analyzer.condition_statements)
+        body_ids = set(body.id for body in function_bodies)
+        metrics = {}
+        # Metrics of the function bodies that contain the current node, and
+        # the nested conditional depth outside of each of them
+        open_bodies = []
+        # (is conditional, is function body) for each node in the current path
+        path = []
+        depth = 0
+        cursor = node.walk()
+        while True:
+            current = cursor.node
+            is_conditional = current.type in condition_statements
+            depth += is_conditional
+            is_body = current.id in body_ids
+            if is_body:
+                open_bodies.append(
+                    (
+                        {
+                            "conditions": 0,
+                            "mccabe_cyclomatic_complexity": 1,
+                            "returns": 0,
+                            "max_nested_conditional": 0,
+                        },
+                        depth - is_conditional,
+                    )
+                )
+                metrics[current.id] = open_bodies[-1][0]
+            is_return = current.type == "return_statement"
+            for body_metrics, base_depth in open_bodies:
+                if is_conditional:
+                    body_metrics["conditions"] += 1
+                    body_metrics["mccabe_cyclomatic_complexity"] += 1
+                if is_return:
+                    body_metrics["returns"] += 1
+                if depth - base_depth > body_metrics["max_nested_conditional"]:
+                    body_metrics["max_nested_conditional"] = depth - base_depth
+            path.append((is_conditional, is_body))
+            self.do_visit(current)
+            if cursor.goto_first_child():
+                continue
+            # Leave nodes until one with a next sibling is found
+            while True:
+                was_conditional, was_body = path.pop()
+                depth -= was_conditional
+                if was_body:
+                    open_bodies.pop()
+                if cursor.goto_next_sibling():
+                    break
+                if not cursor.goto_parent():
+                    return metrics
+
+    def do_visit(self, node: Node):
+        pass
 
 
 class BaseAnalyzer(object):
+    # Increase when the output for the same code changes, so cached results
+    # of earlier versions aren't used
+    version = 1
+    # Tree-sitter language and queries used by the analyzer
+    language_name: typing.Optional[str] = None
+    queries: typing.Dict[str, str] = {}
+
+    @classmethod
+    def get_language_context(cls) -> LanguageContext:
+        context = _language_contexts.get(cls)
+        if context is None:
+            context = LanguageContext(cls.language_name, cls.queries)
+            _language_contexts[cls] = context
+        return context
+
     def __init__(self, filename, actual_code):
         pass
 
     def process(self):
         return {}
 
-    def _count_elements(self, node, types):
-        count = 0
-        for c in node.children:
-            count += self._count_elements(c, types)
-        if node.type in types:
-            count += 1
-        return count
-
-    def _get_max_nested_conditional(self, head):
-        """Iterates over all nodes in a function body and returns the max nested conditional depth.
-        Uses BFS to avoid recursion calls (so we don't throw RecursionError)
-        """
-        nodes_to_visit = deque()
-        nodes_to_visit.append([head, int(head.type in self.condition_statements)])
-        max_nested_depth = 0
-
-        while nodes_to_visit:
-            curr_node, curr_depth = nodes_to_visit.popleft()
-            max_nested_depth = max(max_nested_depth, curr_depth)
-            # Here is where the depth might change
-            # If the current node is a conditional
-            is_curr_conditional = curr_node.type in self.condition_statements
-
-            # Enqueue all child nodes of the curr_node
-            for child in curr_node.children:
-                nodes_to_visit.append([child, curr_depth + is_curr_conditional])
-
-        return max_nested_depth
-
-    def _get_complexity_metrics(self, body_node):
-        number_conditions = self._count_elements(
-            body_node,
-            self.condition_statements,
-        )
-        return {
-            "conditions": number_conditions,
-            "mccabe_cyclomatic_complexity": number_conditions + 1,
-            "returns": self._count_elements(body_node, ["return_statement"]),
-            "max_nested_conditional": self._get_max_nested_conditional(body_node),
-        }
-
     def _get_name(self, node):
         name_node = node.child_by_field_name("name")
         body_node = node.child_by_field_name("body")
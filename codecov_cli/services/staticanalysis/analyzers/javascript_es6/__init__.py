@@ -1,8 +1,5 @@
 import hashlib
 
-from tree_sitter import Language, Parser
-
-import staticcodecov_languages
 from codecov_cli.services.staticanalysis.analyzers.general import BaseAnalyzer
 from codecov_cli.services.staticanalysis.analyzers.javascript_es6.node_wrappers import (
     NodeVisitor,
@@ -54,6 +51,13 @@ class ES6Analyzer(BaseAnalyzer):
         "generator_function",
         "arrow_function",
     ]
+    language_name = "javascript"
+    queries = {
+        "function": function_query_str,
+        "method": method_query_str,
+        "imports": imports_query_str,
+        "definitions": definitions_query_str,
+    }
 
     def __init__(self, path, actual_code, **options):
         self.actual_code = actual_code
@@ -61,9 +65,9 @@ class ES6Analyzer(BaseAnalyzer):
         self.executable_lines = set()
         self.functions = []
         self.path = path.result_filename
-        self.JS_LANGUAGE = Language(staticcodecov_languages.__file__, "javascript")
-        self.parser = Parser()
-        self.parser.set_language(self.JS_LANGUAGE)
+        self.context = self.get_language_context()
+        self.JS_LANGUAGE = self.context.language
+        self.parser = self.context.parser
         self.import_lines = set()
         self.definitions_lines = set()
         self.line_surety_ancestorship = {}
@@ -77,15 +81,17 @@ class ES6Analyzer(BaseAnalyzer):
     def process(self):
         tree = self.parser.parse(self.actual_code)
         root_node = tree.root_node
-        function_query = self.JS_LANGUAGE.query(function_query_str)
-        method_query = self.JS_LANGUAGE.query(method_query_str)
-        imports_query = self.JS_LANGUAGE.query(imports_query_str)
-        definitions_query = self.JS_LANGUAGE.query(definitions_query_str)
+        function_query = self.context.queries["function"]
+        method_query = self.context.queries["method"]
+        imports_query = self.context.queries["imports"]
+        definitions_query = self.context.queries["definitions"]
         combined_results = function_query.captures(root_node) + method_query.captures(
             root_node
         )
+        body_nodes = []
         for func_node, _ in combined_results:
             body_node = func_node.child_by_field_name("body")
+            body_nodes.append(body_node)
             self.functions.append(
                 {
                     "identifier": self._get_name(func_node),
@@ -94,16 +100,18 @@ class ES6Analyzer(BaseAnalyzer):
                     "code_hash": self.get_code_hash(
                         body_node.start_byte, body_node.end_byte
                     ),
-                    "complexity_metrics": self._get_complexity_metrics(body_node),
+                    "complexity_metrics": None,
                 }
             )
-        self.functions = sorted(self.functions, key=lambda x: x["start_line"])
 
         self.import_lines = self.get_import_lines(root_node, imports_query)
         self.definition_lines = self.get_definition_lines(root_node, definitions_query)
 
         visitor = NodeVisitor(self)
-        visitor.start_visit(tree.root_node)
+        complexity_metrics = visitor.start_visit(tree.root_node, body_nodes)
+        for function, body_node in zip(self.functions, body_nodes):
+            function["complexity_metrics"] = complexity_metrics[body_node.id]
+        self.functions = sorted(self.functions, key=lambda x: x["start_line"])
         statements = self.get_statements()
 
         h = hashlib.md5()
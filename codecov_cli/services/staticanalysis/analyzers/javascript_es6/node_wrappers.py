@@ -1,15 +1,7 @@
-class NodeVisitor(object):
-    def __init__(self, analyzer):
-        self.analyzer = analyzer
+from codecov_cli.services.staticanalysis.analyzers.general import BaseNodeVisitor
 
-    def start_visit(self, node):
-        self.visit(node)
-
-    def visit(self, node):
-        self.do_visit(node)
-        for c in node.children:
-            self.visit(c)
 
+class NodeVisitor(BaseNodeVisitor):
     def do_visit(self, node):
         if node.is_named:
             current_line_number = node.start_point[0] + 1
@@ -1,8 +1,5 @@
 import hashlib
 
-from tree_sitter import Language, Parser
-
-import staticcodecov_languages
 from codecov_cli.services.staticanalysis.analyzers.general import BaseAnalyzer
 from codecov_cli.services.staticanalysis.analyzers.python.node_wrappers import (
     NodeVisitor,
@@ -51,6 +48,12 @@ class PythonAnalyzer(BaseAnalyzer):
         "conditional_expression",
     ]
     wrappers = ["class_definition", "function_definition"]
+    language_name = "python"
+    queries = {
+        "function": _function_query_str,
+        "definitions": _definitions_query_str,
+        "imports": _imports_query_str,
+    }
 
     def __init__(
         self, file_analysis_request: FileAnalysisRequest, actual_code: bytes, **options
@@ -62,21 +65,23 @@ class PythonAnalyzer(BaseAnalyzer):
         self.definitions_lines = set()
         self.functions = []
         self.path = file_analysis_request.result_filename
-        self.PY_LANGUAGE = Language(staticcodecov_languages.__file__, "python")
-        self.parser = Parser()
-        self.parser.set_language(self.PY_LANGUAGE)
+        self.context = self.get_language_context()
+        self.PY_LANGUAGE = self.context.language
+        self.parser = self.context.parser
         self.line_surety_ancestorship = {}
 
     def process(self):
-        function_query = self.PY_LANGUAGE.query(_function_query_str)
-        definitions_query = self.PY_LANGUAGE.query(_definitions_query_str)
-        imports_query = self.PY_LANGUAGE.query(_imports_query_str)
+        function_query = self.context.queries["function"]
+        definitions_query = self.context.queries["definitions"]
+        imports_query = self.context.queries["imports"]
         tree = self.parser.parse(self.actual_code)
         root_node = tree.root_node
         captures = function_query.captures(root_node)
+        body_nodes = []
         for node, _ in captures:
             actual_name = self._get_name(node)
             body_node = node.child_by_field_name("body")
+            body_nodes.append(body_node)
             self.functions.append(
                 {
                     "identifier": actual_name,
@@ -85,11 +90,13 @@ class PythonAnalyzer(BaseAnalyzer):
                     "code_hash": self._get_code_hash(
                         body_node.start_byte, body_node.end_byte
                     ),
-                    "complexity_metrics": self._get_complexity_metrics(body_node),
+                    "complexity_metrics": None,
                 }
             )
         visitor = NodeVisitor(self)
-        visitor.start_visit(tree.root_node)
+        complexity_metrics = visitor.start_visit(tree.root_node, body_nodes)
+        for function, body_node in zip(self.functions, body_nodes):
+            function["complexity_metrics"] = complexity_metrics[body_node.id]
         self.functions = sorted(self.functions, key=lambda x: x["start_line"])
 
         self.import_lines = self.get_import_lines(root_node, imports_query)
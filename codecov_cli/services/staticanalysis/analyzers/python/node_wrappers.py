@@ -1,20 +1,10 @@
 from tree_sitter import Node
 
+from codecov_cli.services.staticanalysis.analyzers.general import BaseNodeVisitor
 from codecov_cli.services.staticanalysis.exceptions import AnalysisError
 
 
-class NodeVisitor(object):
-    def __init__(self, analyzer):
-        self.analyzer = analyzer
-
-    def start_visit(self, node):
-        self.visit(node)
-
-    def visit(self, node: Node):
-        self.do_visit(node)
-        for c in node.children:
-            self.visit(c)
-
+class NodeVisitor(BaseNodeVisitor):
     def _is_function_docstring(self, node: Node):
         """Skips docstrings for functions, such as this one.
         Pytest doesn't include them in the report, so I don't think we should either,
@@ -0,0 +1,157 @@
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import tempfile
+import time
+import typing
+
+from codecov_cli import __version__
+from codecov_cli.helpers.config import get_user_cache_dir
+from codecov_cli.services.staticanalysis.analyzers import get_analyzer_class
+from codecov_cli.services.staticanalysis.types import (
+    FileAnalysisRequest,
+    FileAnalysisResult,
+)
+
+logger = logging.getLogger("codecovcli")
+
+# Cached results that weren't used for this long are deleted
+MAX_CACHE_AGE = 30 * 24 * 60 * 60
+# Past this size, the least recently used results are deleted
+MAX_CACHE_SIZE = 256 * 1024 * 1024
+
+
+def get_default_cache_path() -> pathlib.Path:
+    return get_user_cache_dir() / "static_analysis"
+
+
+class AnalysisCache(object):
+    """
+    Analyzer output of files analyzed before, by file path, file content and
+    analyzer version, so unchanged files don't have to be parsed again.
+
+    Each result is saved in its own file, named after its key. Reading a
+    result updates its modification time, which `evict` uses to delete the
+    results that weren't used recently.
+    """
+
+    def __init__(
+        self,
+        path: pathlib.Path,
+        max_age: float = MAX_CACHE_AGE,
+        max_size: int = MAX_CACHE_SIZE,
+    ):
+        self.path = path
+        self.max_age = max_age
+        self.max_size = max_size
+
+    @staticmethod
+    def get_key(
+        filename: FileAnalysisRequest, actual_code: bytes
+    ) -> typing.Optional[str]:
+        """
+        Key of the result for a file, or None if no analyzer handles the file.
+        """
+        analyzer_class = get_analyzer_class(filename)
+        if analyzer_class is None:
+            return None
+        h = hashlib.sha256()
+        # Some analyzers include the filename in their output
+        h.update(
+            f"{analyzer_class.__name__}:{analyzer_class.version}:{__version__}:{filename.result_filename}\0".encode()
+        )
+        h.update(actual_code)
+        return h.hexdigest()
+
+    def _get_path(self, key: str) -> pathlib.Path:
+        return self.path / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> typing.Optional[dict]:
+        path = self._get_path(key)
+        try:
+            with open(path, "r") as f:
+                result = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            logger.debug(f"Ignoring unreadable cached analysis {key}")
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return result
+
+    def set(self, key: str, result: dict):
+        path = self._get_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent)
+            with os.fdopen(fd, "w") as f:
+                json.dump(result, f)
+            os.replace(tmp_path, path)
+        except OSError as exp:
+            logger.warning(f"Unable to save cached analysis to {path}: {exp}")
+
+    def evict(self):
+        """
+        Deletes the results not used in `max_age` seconds, then the least
+        recently used ones until the cache is under `max_size` bytes.
+        """
+        entries = []
+        for path in self.path.glob("*/*"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort(key=lambda x: x[0], reverse=True)
+        oldest_allowed = time.time() - self.max_age
+        total_size = 0
+        removed = 0
+        for mtime, size, path in entries:
+            total_size += size
+            if mtime >= oldest_allowed and total_size <= self.max_size:
+                continue
+            try:
+                path.unlink()
+                removed += 1
+            except OSError:
+                pass
+        if removed:
+            logger.debug(f"Removed {removed} results from the analysis cache")
+
+    def split_cached_files(
+        self, files_to_analyze: typing.List[FileAnalysisRequest]
+    ) -> typing.Tuple[
+        typing.List[FileAnalysisResult],
+        typing.List[FileAnalysisRequest],
+        typing.Dict[str, str],
+    ]:
+        """
+        Returns the cached results, the files that still have to be analyzed,
+        and the keys of those files by result filename.
+        """
+        cached_results = []
+        files_to_process = []
+        keys = {}
+        for filename in files_to_analyze:
+            key = None
+            if get_analyzer_class(filename) is not None:
+                try:
+                    with open(filename.actual_filepath, "rb") as file:
+                        key = self.get_key(filename, file.read())
+                except OSError:
+                    pass
+            result = self.get(key) if key is not None else None
+            if result is not None:
+                cached_results.append(
+                    FileAnalysisResult(filename=filename.result_filename, result=result)
+                )
+                continue
+            if key is not None:
+                keys[filename.result_filename] = key
+            files_to_process.append(filename)
+        return cached_results, files_to_process, keys
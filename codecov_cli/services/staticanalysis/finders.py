@@ -1,9 +1,13 @@
+import logging
 import subprocess
-from pathlib import Path
+import typing
+from pathlib import Path, PurePosixPath
 
 from codecov_cli.helpers.folder_searcher import globs_to_regex, search_files
 from codecov_cli.services.staticanalysis.types import FileAnalysisRequest
 
+logger = logging.getLogger("codecovcli")
+
 
 class FileFinder(object):
     def find_files(self, root_folder, pattern, exclude_folders):
@@ -28,20 +32,121 @@ class FileFinder(object):
 
 
 class GitFileFinder(object):
+    """
+    Finds the files in the git index, so files ignored by git (build output,
+    virtualenvs, ...) are never analyzed.
+
+    Falls back to walking the folder if it isn't in a git repository.
+    """
+
     def find_files(self, folder_name, pattern, exclude_folders):
-        res = subprocess.run(
-            ["git", "-C", str(folder_name), "ls-files"], capture_output=True
-        )
-        return [
-            FileAnalysisRequest(
-                actual_filepath=f"{Path(folder_name) / x}", result_filename=x
+        filenames = self._list_files(folder_name)
+        if filenames is None:
+            logger.warning(
+                "Unable to list the files in the git index. Searching the folder instead."
             )
-            for x in res.stdout.decode().split()
-        ]
+            return FileFinder().find_files(folder_name, pattern, exclude_folders)
+        return self._filter_files(folder_name, filenames, pattern, exclude_folders)
 
     def find_configuration_file(self, folder_name):
         return None
 
+    def _list_files(self, folder_name) -> typing.Optional[typing.List[str]]:
+        return _run_git(folder_name, ["ls-files", "-z"])
+
+    def _filter_files(self, folder_name, filenames, pattern, exclude_folders):
+        filename_include_regex = globs_to_regex([pattern])
+        exclude_folders = [PurePosixPath(Path(f).as_posix()) for f in exclude_folders]
+        files = []
+        for filename in filenames:
+            path = PurePosixPath(filename)
+            if not filename_include_regex.match(path.name):
+                continue
+            if any(
+                _is_excluded_by_folder(path, exclude_folder)
+                for exclude_folder in exclude_folders
+            ):
+                continue
+            actual_filepath = Path(folder_name) / filename
+            # Files deleted from the working tree, and submodules
+            if not actual_filepath.is_file():
+                continue
+            files.append(
+                FileAnalysisRequest(
+                    actual_filepath=actual_filepath, result_filename=filename
+                )
+            )
+        return files
+
+
+class ChangedFilesFinder(GitFileFinder):
+    """
+    Finds the files changed between `base_commit` and HEAD, so only those are
+    analyzed.
+
+    Falls back to all the files in the git index if the diff can't be
+    computed (e.g. the base commit isn't in a shallow clone).
+    """
+
+    def __init__(self, base_commit: str):
+        self.base_commit = base_commit
+
+    def _list_files(self, folder_name) -> typing.Optional[typing.List[str]]:
+        filenames = _run_git(
+            folder_name,
+            [
+                "diff",
+                "--name-only",
+                "--relative",
+                "--no-renames",
+                "--diff-filter=d",
+                "-z",
+                self.base_commit,
+                "HEAD",
+            ],
+        )
+        if filenames is None:
+            logger.warning(
+                f"Unable to find the files changed since {self.base_commit}. Analyzing all files instead."
+            )
+            return super()._list_files(folder_name)
+        logger.info(f"{len(filenames)} files changed since {self.base_commit}")
+        return filenames
+
+
+def _is_excluded_by_folder(path: PurePosixPath, exclude_folder: PurePosixPath):
+    # Like FileFinder, a folder name excludes the folders with that name
+    # anywhere in the tree
+    if len(exclude_folder.parts) == 1:
+        return exclude_folder.name in path.parent.parts
+    return exclude_folder in path.parents
+
+
+def _run_git(folder_name, args: typing.List[str]) -> typing.Optional[typing.List[str]]:
+    try:
+        res = subprocess.run(
+            ["git", "-C", str(folder_name), *args], capture_output=True
+        )
+    except OSError:
+        return None
+    if res.returncode != 0:
+        logger.debug(
+            "git command failed",
+            extra=dict(
+                extra_log_attributes=dict(
+                    args=args, stderr=res.stderr.decode(errors="replace")
+                )
+            ),
+        )
+        return None
+    return [x for x in res.stdout.decode().split("\0") if x]
+
 
-def select_file_finder(config):
+def select_file_finder(
+    config, file_finder: str = "walk", base_commit: typing.Optional[str] = None
+):
+    if base_commit is not None:
+        return ChangedFilesFinder(base_commit)
+    if file_finder == "git":
+        return GitFileFinder()
     return FileFinder()
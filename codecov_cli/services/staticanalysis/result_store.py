@@ -0,0 +1,51 @@
+import json
+import pathlib
+import tempfile
+import threading
+import typing
+
+
+class AnalysisResultStore(object):
+    """
+    Analyzer output of the files analyzed in this run, by result filename.
+
+    Results are written to a temporary directory as they arrive and read back
+    when they are uploaded, so memory use doesn't grow with the number of
+    files analyzed. The directory is deleted on close.
+    """
+
+    def __init__(self, directory: typing.Optional[pathlib.Path] = None):
+        self._tmpdir = tempfile.TemporaryDirectory(
+            prefix="codecov-static-analysis-", dir=directory
+        )
+        self.path = pathlib.Path(self._tmpdir.name)
+        self._paths: typing.Dict[str, pathlib.Path] = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._tmpdir.cleanup()
+
+    def __setitem__(self, filename: str, result: dict):
+        with self._lock:
+            path = self._paths.get(filename)
+            if path is None:
+                path = self.path / f"{len(self._paths)}.json"
+                self._paths[filename] = path
+        with open(path, "w") as f:
+            json.dump(result, f)
+
+    def __getitem__(self, filename: str) -> dict:
+        with open(self._paths[filename], "r") as f:
+            return json.load(f)
+
+    def __contains__(self, filename: str) -> bool:
+        return filename in self._paths
+
+    def __len__(self) -> int:
+        return len(self._paths)
@@ -0,0 +1,137 @@
+import logging
+import os
+import typing
+from dataclasses import dataclass, field
+
+from codecov_cli.services.staticanalysis.types import (
+    FileAnalysisRequest,
+    FileAnalysisResult,
+)
+
+logger = logging.getLogger("codecovcli")
+
+# Batches each worker should get on average, so a slow batch can be balanced
+# by the other workers picking up the remaining ones
+BATCHES_PER_WORKER = 4
+# Upper limit of files in a batch, so the progress bar keeps moving
+MAX_BATCH_FILES = 64
+
+EXECUTORS = ["auto", "inline", "thread", "process"]
+# Up to this many files and this much code, "auto" analyzes the files in the
+# main process. Starting a pool of processes takes about 20ms and each file
+# adds about 0.25ms of pickling and IPC, while analyzing takes about 1.2us
+# per byte, so on 2 to 4 cores the pool catches up at 20 to 35 files of
+# typical size, or 30 to 45KB of code. Measured with
+# benchmarks/bench_static_analysis_executors.py
+INLINE_MAX_FILES = 32
+INLINE_MAX_BYTES = 32 * 1024
+
+
+@dataclass
+class BatchResult(object):
+    worker: int
+    busy_time: float
+    results: typing.List[typing.Optional[FileAnalysisResult]]
+
+
+def get_file_size(filename: FileAnalysisRequest) -> int:
+    try:
+        return os.stat(filename.actual_filepath).st_size
+    except OSError:
+        return 0
+
+
+def select_executor(
+    executor: str,
+    number_of_files: int,
+    total_size: int,
+    numberprocesses: typing.Optional[int],
+) -> str:
+    """
+    Returns how the files are analyzed: "inline" in the calling thread,
+    "thread" on a pool of threads or "process" on a pool of processes.
+
+    "auto" only picks between inline and process, going inline when both the
+    number of files and their total size are small, or when there is a
+    single worker to run them on. Tree-sitter holds the GIL while parsing, so
+    threads don't analyze faster than the calling thread; they are available
+    for platforms where starting processes is expensive.
+    """
+    if executor != "auto":
+        return executor
+    workers = numberprocesses or os.cpu_count() or 1
+    if workers == 1 or (
+        number_of_files <= INLINE_MAX_FILES and total_size <= INLINE_MAX_BYTES
+    ):
+        return "inline"
+    return "process"
+
+
+def schedule_files(
+    files_to_analyze: typing.List[FileAnalysisRequest],
+    numberprocesses: typing.Optional[int],
+    file_sizes: typing.Optional[typing.List[int]] = None,
+) -> typing.List[typing.List[FileAnalysisRequest]]:
+    """
+    Splits the files into the batches sent to the workers, largest files first.
+
+    Parsing time grows with file size, so starting with the largest files
+    keeps a huge file from being the last one everyone waits on. Files larger
+    than the batch target go alone; the small ones are grouped together to
+    cut the pickling and IPC cost of one task per file.
+    """
+    workers = numberprocesses or os.cpu_count() or 1
+    if file_sizes is None:
+        file_sizes = [get_file_size(f) for f in files_to_analyze]
+    sized_files = sorted(
+        zip(file_sizes, files_to_analyze),
+        key=lambda x: x[0],
+        reverse=True,
+    )
+    total_size = sum(size for size, _ in sized_files)
+    target_size = max(total_size // (workers * BATCHES_PER_WORKER), 1)
+    batches = []
+    current_batch = []
+    current_size = 0
+    for size, filename in sized_files:
+        current_batch.append(filename)
+        current_size += size
+        if current_size >= target_size or len(current_batch) >= MAX_BATCH_FILES:
+            batches.append(current_batch)
+            current_batch = []
+            current_size = 0
+    if current_batch:
+        batches.append(current_batch)
+    return batches
+
+
+@dataclass
+class WorkerUtilisation(object):
+    busy_time: typing.Dict[int, float] = field(default_factory=dict)
+    batches: typing.Dict[int, int] = field(default_factory=dict)
+    files: typing.Dict[int, int] = field(default_factory=dict)
+
+    def add(self, batch_result: BatchResult):
+        worker = batch_result.worker
+        self.busy_time[worker] = (
+            self.busy_time.get(worker, 0.0) + batch_result.busy_time
+        )
+        self.batches[worker] = self.batches.get(worker, 0) + 1
+        self.files[worker] = self.files.get(worker, 0) + len(batch_result.results)
+
+    def log(self, elapsed_time: float):
+        for worker, busy_time in sorted(self.busy_time.items()):
+            logger.debug(
+                "Static analysis worker utilisation",
+                extra=dict(
+                    extra_log_attributes=dict(
+                        worker=worker,
+                        batches=self.batches[worker],
+                        files=self.files[worker],
+                        busy_time=round(busy_time, 3),
+                        utilisation=(
+                            round(busy_time / elapsed_time, 3) if elapsed_time else None
+                        ),
+                    )
+                ),
+            )
@@ -1,6 +1,9 @@
+import json
 import logging
 import typing
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from sys import exit
 
 import click
 
@@ -10,16 +13,58 @@ from codecov_cli.helpers.request import log_warnings_and_errors_if_any
 from codecov_cli.helpers.versioning_systems import VersioningSystemInterface
 from codecov_cli.helpers.upload_type import ReportType
 from codecov_cli.plugins import select_preparation_plugins
+from codecov_cli.services.upload.dry_run_report import (
+    StageTimings,
+    generate_dry_run_report,
+)
 from codecov_cli.services.upload.file_finder import select_file_finder
 from codecov_cli.services.upload.legacy_upload_sender import LegacyUploadSender
-from codecov_cli.services.upload.network_finder import select_network_finder
-from codecov_cli.services.upload.upload_collector import UploadCollector
-from codecov_cli.services.upload.upload_sender import UploadSender
+from codecov_cli.services.upload.network_finder import (
+    NetworkFinder,
+    select_network_finder,
+)
+from codecov_cli.services.upload.payload_splitter import split_upload_data
+from codecov_cli.services.upload.upload_collector import (
+    CollectionCache,
+    UploadCollector,
+)
+from codecov_cli.services.upload.upload_manifest import (
+    UploadManifest,
+    hash_file,
+    skip_uploaded_files,
+)
+from codecov_cli.services.upload.upload_sender import (
+    DEFAULT_PAYLOAD_FORMAT,
+    UploadSender,
+)
+from codecov_cli.services.upload.upload_spool import UploadSpool, should_spool
 from codecov_cli.services.upload_completion import upload_completion_logic
-from codecov_cli.types import RequestResult
+from codecov_cli.types import RequestError, RequestResult, UploadSpec
 
 logger = logging.getLogger("codecovcli")
 
+MAX_CONCURRENT_UPLOADS = 8
+
+
+def _get_plugin_config(
+    files_search_exclude_folders: typing.List[Path],
+    files_search_root_folder: Path,
+    gcov_args: typing.Optional[str],
+    gcov_executable: typing.Optional[str],
+    gcov_ignore: typing.Optional[str],
+    gcov_include: typing.Optional[str],
+    swift_project: typing.Optional[str],
+) -> typing.Dict:
+    return {
+        "folders_to_ignore": files_search_exclude_folders,
+        "gcov_args": gcov_args,
+        "gcov_executable": gcov_executable,
+        "gcov_ignore": gcov_ignore,
+        "gcov_include": gcov_include,
+        "project_root": files_search_root_folder,
+        "swift_project": swift_project,
+    }
+
 
 def do_upload_logic(
     cli_config: typing.Dict,
@@ -28,13 +73,18 @@ def do_upload_logic(
     upload_coverage: bool = False,
     *,
     args: dict = None,
+    before_send: typing.Optional[typing.Callable[[], None]] = None,
     branch: typing.Optional[str],
     build_code: typing.Optional[str],
     build_url: typing.Optional[str],
+    chunked_transfer: bool = False,
     commit_sha: str,
+    compression_level: typing.Optional[int] = None,
+    compression_workers: int = 1,
     disable_file_fixes: bool = False,
     disable_search: bool = False,
     dry_run: bool = False,
+    dry_run_report: typing.Optional[Path] = None,
     enterprise_url: typing.Optional[str],
     env_vars: typing.Dict[str, str],
     fail_on_error: bool = False,
@@ -42,6 +92,7 @@ def do_upload_logic(
     files_search_explicitly_listed_files: typing.List[Path],
     files_search_root_folder: Path,
     flags: typing.List[str],
+    force: bool = False,
     gcov_args: typing.Optional[str],
     gcov_executable: typing.Optional[str],
     gcov_ignore: typing.Optional[str],
@@ -49,30 +100,37 @@ def do_upload_logic(
     git_service: typing.Optional[str],
     handle_no_reports_found: bool = False,
     job_code: typing.Optional[str],
+    max_payload_size: typing.Optional[int] = None,
     name: typing.Optional[str],
     network_filter: typing.Optional[str],
     network_prefix: typing.Optional[str],
     network_root_folder: Path,
     parent_sha: typing.Optional[str] = None,
+    payload_format: str = DEFAULT_PAYLOAD_FORMAT,
     plugin_names: typing.List[str],
     pull_request_number: typing.Optional[str],
     recurse_submodules: bool = False,
     report_code: str,
     slug: typing.Optional[str],
+    spool_dir: typing.Optional[Path] = None,
     swift_project: typing.Optional[str],
     token: typing.Optional[str],
     report_type: ReportType = ReportType.COVERAGE,
+    upload_chunk_size: typing.Optional[int] = None,
+    upload_manifest: typing.Optional[Path] = None,
     use_legacy_uploader: bool = False,
+    network_finder: typing.Optional[NetworkFinder] = None,
+    collection_cache: typing.Optional[CollectionCache] = None,
 ):
-    plugin_config = {
-        "folders_to_ignore": files_search_exclude_folders,
-        "gcov_args": gcov_args,
-        "gcov_executable": gcov_executable,
-        "gcov_ignore": gcov_ignore,
-        "gcov_include": gcov_include,
-        "project_root": files_search_root_folder,
-        "swift_project": swift_project,
-    }
+    plugin_config = _get_plugin_config(
+        files_search_exclude_folders,
+        files_search_root_folder,
+        gcov_args,
+        gcov_executable,
+        gcov_ignore,
+        gcov_include,
+        swift_project,
+    )
     if report_type == ReportType.COVERAGE:
         preparation_plugins = select_preparation_plugins(
             cli_config, plugin_names, plugin_config
@@ -86,19 +144,23 @@ def do_upload_logic(
         disable_search,
         report_type,
     )
-    network_finder = select_network_finder(
-        versioning_system,
-        recurse_submodules=recurse_submodules,
-        network_filter=network_filter,
-        network_prefix=network_prefix,
-        network_root_folder=network_root_folder,
-    )
+    if network_finder is None:
+        network_finder = select_network_finder(
+            versioning_system,
+            recurse_submodules=recurse_submodules,
+            network_filter=network_filter,
+            network_prefix=network_prefix,
+            network_root_folder=network_root_folder,
+        )
+    stage_timings = StageTimings() if dry_run_report else None
     collector = UploadCollector(
         preparation_plugins,
         network_finder,
         file_selector,
         disable_file_fixes,
         plugin_config,
+        collection_cache=collection_cache,
+        stage_timings=stage_timings,
     )
     try:
         upload_data = collector.generate_upload_data(report_type)
@@ -107,6 +169,8 @@ def do_upload_logic(
             logger.info(
                 "No coverage reports found. Triggering notifications without uploading."
             )
+            if before_send is not None:
+                before_send()
             upload_completion_logic(
                 commit_sha=commit_sha,
                 slug=slug,
@@ -123,10 +187,43 @@ def do_upload_logic(
             )
         else:
             raise exp
+
+    manifest = None
+    file_hashes = {}
+    all_files_uploaded = False
+    if upload_manifest is not None:
+        manifest = UploadManifest(upload_manifest)
+        manifest_key = UploadManifest.get_key(
+            commit_sha, report_code, report_type.value, flags
+        )
+        if force:
+            file_hashes = {
+                file.get_filename(): hash_file(file) for file in upload_data.files
+            }
+        else:
+            number_of_files = len(upload_data.files)
+            upload_data.files, file_hashes, skipped_bytes = skip_uploaded_files(
+                upload_data.files, manifest.get_uploaded_hashes(manifest_key)
+            )
+            number_of_skipped_files = number_of_files - len(upload_data.files)
+            if number_of_skipped_files:
+                logger.info(
+                    f"Skipped {number_of_skipped_files} report file(s) ({skipped_bytes} bytes) with content already uploaded for this commit and report code. Use --force to upload them anyway."
+                )
+                all_files_uploaded = not upload_data.files
+
     if use_legacy_uploader:
-        sender = LegacyUploadSender()
+        sender = LegacyUploadSender(chunked_transfer=chunked_transfer)
     else:
-        sender = UploadSender()
+        sender = UploadSender(
+            compression_workers=compression_workers,
+            compression_level=compression_level,
+            payload_format=payload_format,
+            chunked_transfer=chunked_transfer,
+            upload_chunk_size=(
+                upload_chunk_size * 1024 * 1024 if upload_chunk_size else None
+            ),
+        )
     logger.debug(f"Selected uploader to use: {type(sender)}")
     ci_service = (
         ci_adapter.get_fallback_value(FallbackFieldEnum.service)
@@ -134,31 +231,101 @@ def do_upload_logic(
         else None
     )
 
-    if not dry_run:
-        sending_result = sender.send_upload_data(
-            upload_data=upload_data,
-            commit_sha=commit_sha,
-            token=token,
-            env_vars=env_vars,
-            report_code=report_code,
-            report_type=report_type,
-            name=name,
-            branch=branch,
-            slug=slug,
-            pull_request_number=pull_request_number,
-            build_code=build_code,
-            build_url=build_url,
-            job_code=job_code,
-            flags=flags,
-            ci_service=ci_service,
-            git_service=git_service,
-            enterprise_url=enterprise_url,
-            parent_sha=parent_sha,
-            upload_coverage=upload_coverage,
-            args=args,
+    upload_parts = [] if all_files_uploaded else [upload_data]
+    if max_payload_size and upload_parts:
+        upload_parts = split_upload_data(
+            upload_data, max_payload_size * 1024 * 1024, sender.get_encoded_sizes
         )
+        if len(upload_parts) > 1:
+            logger.info(
+                f"Splitting upload into {len(upload_parts)} parts of at most {max_payload_size} MB"
+            )
+
+    spool = None
+    if spool_dir is not None:
+        if use_legacy_uploader:
+            logger.warning("Uploads can't be spooled with the legacy uploader")
+        else:
+            spool = UploadSpool(spool_dir)
+
+    if not dry_run:
+        if before_send is not None:
+            before_send()
+        sending_result = None
+        for upload_part in upload_parts:
+            send_args = dict(
+                upload_data=upload_part,
+                commit_sha=commit_sha,
+                token=token,
+                env_vars=env_vars,
+                report_code=report_code,
+                report_type=report_type,
+                name=name,
+                branch=branch,
+                slug=slug,
+                pull_request_number=pull_request_number,
+                build_code=build_code,
+                build_url=build_url,
+                job_code=job_code,
+                flags=flags,
+                ci_service=ci_service,
+                git_service=git_service,
+                enterprise_url=enterprise_url,
+                parent_sha=parent_sha,
+                upload_coverage=upload_coverage,
+                args=args,
+            )
+            spooled = False
+            try:
+                part_result = sender.send_upload_data(**send_args)
+            except Exception as exp:
+                if spool is None:
+                    raise
+                part_result = RequestResult(
+                    error=RequestError(
+                        code="Upload Error",
+                        params={},
+                        description=getattr(exp, "message", str(exp)),
+                    ),
+                    warnings=[],
+                    status_code=0,
+                    text="",
+                )
+            if spool is not None and should_spool(part_result):
+                part_result = _spool_upload(sender, spool, part_result, send_args)
+                spooled = part_result.error is None
+            part_hashes = [
+                file_hashes[file.get_filename()]
+                for file in upload_part.files
+                if file.get_filename() in file_hashes
+            ]
+            # Spooled files aren't uploaded yet
+            if part_hashes and part_result.error is None and not spooled:
+                manifest.record_uploaded_hashes(manifest_key, part_hashes)
+            # The first failed part, if any, is the result of the upload
+            if sending_result is None or (
+                sending_result.error is None and part_result.error is not None
+            ):
+                sending_result = part_result
+        if all_files_uploaded:
+            sending_result = RequestResult(
+                error=None,
+                warnings=None,
+                status_code=200,
+                text="All report files were already uploaded. Nothing to upload.",
+            )
     else:
         logger.info("dry-run option activated. NOT sending data to Codecov.")
+        if dry_run_report:
+            with open(dry_run_report, "w") as f:
+                json.dump(
+                    generate_dry_run_report(
+                        sender, upload_parts, report_type, stage_timings
+                    ),
+                    f,
+                    indent=2,
+                )
+            logger.info(f"Dry-run report written to {dry_run_report}")
         sending_result = RequestResult(
             error=None,
             warnings=None,
@@ -167,3 +334,126 @@ def do_upload_logic(
         )
     log_warnings_and_errors_if_any(sending_result, "Upload", fail_on_error)
     return sending_result
+
+
+def _spool_upload(
+    sender: UploadSender,
+    spool: UploadSpool,
+    failed_result: RequestResult,
+    send_args: typing.Dict,
+) -> RequestResult:
+    try:
+        path = sender.spool_upload_data(spool, **send_args)
+    except OSError as exp:
+        logger.warning(f"Unable to spool the upload to {spool.path}: {exp}")
+        return failed_result
+    logger.warning(
+        f"Upload failed: {failed_result.error.description}. Saved it to {path}, send it later with `codecovcli flush-spool --spool-dir {spool.path}`"
+    )
+    return RequestResult(
+        error=None,
+        warnings=None,
+        status_code=200,
+        text=f"Upload saved to {path}",
+    )
+
+
+def do_multi_upload_logic(
+    cli_config: typing.Dict,
+    versioning_system: VersioningSystemInterface,
+    ci_adapter: CIAdapterBase,
+    upload_specs: typing.List[UploadSpec],
+    upload_coverage: bool = False,
+    **upload_args,
+) -> typing.List[RequestResult]:
+    """
+    Makes one upload per spec, collecting and sending them concurrently.
+
+    Preparation plugins run once, and the network listing and file fixes are
+    computed once and shared by all uploads. A spec's flags and name replace
+    the ones from `upload_args`. A spec that lists files only uploads those
+    files.
+    """
+    report_type = upload_args.get("report_type", ReportType.COVERAGE)
+    if report_type == ReportType.COVERAGE:
+        plugin_config = _get_plugin_config(
+            upload_args["files_search_exclude_folders"],
+            upload_args["files_search_root_folder"],
+            upload_args["gcov_args"],
+            upload_args["gcov_executable"],
+            upload_args["gcov_ignore"],
+            upload_args["gcov_include"],
+            upload_args["swift_project"],
+        )
+        for prep in select_preparation_plugins(
+            cli_config, upload_args["plugin_names"], plugin_config
+        ):
+            logger.debug(f"Running preparation plugin: {type(prep)}")
+            prep.run_preparation(None)
+
+    network_finder = select_network_finder(
+        versioning_system,
+        recurse_submodules=upload_args.get("recurse_submodules", False),
+        network_filter=upload_args["network_filter"],
+        network_prefix=upload_args["network_prefix"],
+        network_root_folder=upload_args["network_root_folder"],
+    )
+    collection_cache = CollectionCache()
+
+    def upload(index: int, spec: UploadSpec) -> RequestResult:
+        spec_args = dict(
+            upload_args,
+            fail_on_error=False,
+            plugin_names=[],
+            network_finder=network_finder,
+            collection_cache=collection_cache,
+        )
+        if spec.name:
+            spec_args["name"] = spec.name
+        if spec.flags:
+            spec_args["flags"] = spec.flags
+        if spec.files:
+            spec_args["files_search_explicitly_listed_files"] = spec.files
+            spec_args["disable_search"] = True
+        dry_run_report = upload_args.get("dry_run_report")
+        if dry_run_report:
+            # One report per upload
+            spec_args["dry_run_report"] = dry_run_report.with_name(
+                f"{dry_run_report.stem}-{index + 1}{dry_run_report.suffix}"
+            )
+        try:
+            return do_upload_logic(
+                cli_config,
+                versioning_system,
+                ci_adapter,
+                upload_coverage,
+                **spec_args,
+            )
+        except Exception as exp:
+            return RequestResult(
+                error=RequestError(
+                    code="Upload Error",
+                    params={},
+                    description=getattr(exp, "message", str(exp)),
+                ),
+                warnings=[],
+                status_code=0,
+                text="",
+            )
+
+    logger.info(f"Starting {len(upload_specs)} uploads")
+    max_workers = min(len(upload_specs), MAX_CONCURRENT_UPLOADS)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(upload, range(len(upload_specs)), upload_specs))
+
+    for index, (spec, result) in enumerate(zip(upload_specs, results)):
+        label = spec.name or ",".join(spec.flags) or f"#{index + 1}"
+        if result.error is None:
+            logger.info(f"Upload {label} succeeded")
+        else:
+            logger.error(f"Upload {label} failed: {result.error.description}")
+    if upload_args.get("fail_on_error") and any(
+        result.error is not None for result in results
+    ):
+        exit(1)
+    return results
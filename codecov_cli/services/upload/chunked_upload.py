@@ -0,0 +1,302 @@
+import contextlib
+import hashlib
+import json
+import logging
+import math
+import os
+import pathlib
+import tempfile
+import threading
+import time
+import typing
+from concurrent.futures import ThreadPoolExecutor
+
+from codecov_cli.helpers.config import get_user_cache_dir
+from codecov_cli.helpers.request import put, retry_request, send_post_request
+from codecov_cli.types import RequestError, RequestResult
+
+logger = logging.getLogger("codecovcli")
+
+MAX_CONCURRENT_PARTS = 4
+# Presigned part URLs expire, progress older than this is discarded. No
+# upload takes longer, so payloads this old were left by a crashed run
+MAX_PROGRESS_AGE = 24 * 60 * 60
+
+
+def get_default_progress_folder() -> pathlib.Path:
+    return get_user_cache_dir() / "upload_progress"
+
+
+@retry_request("PUT")
+def _send_part(url: str, data: bytes):
+    return put(url=url, data=data)
+
+
+class ChunkedUpload(object):
+    """
+    Sends a payload to storage as fixed-size parts.
+
+    The payload is spooled to disk first, then parts are sent concurrently
+    and each part is retried on its own. Completed parts are saved to a
+    progress file, keyed by the upload request sent to Codecov and the part
+    size. When the same upload runs again, `get_progress` finds it, and
+    `resume` sends the parts that are still missing to the multipart upload
+    of the previous run, without requesting a new upload from Codecov.
+
+    The `multipart_url` given to `send` starts the multipart upload and
+    answers with `upload_id`, one `part_urls` entry per part and a
+    `complete_url`, which receives the ETags of all parts once they were
+    sent.
+    """
+
+    def __init__(
+        self,
+        upload_key: str,
+        chunk_size: int,
+        workers: int = MAX_CONCURRENT_PARTS,
+        progress_folder: typing.Optional[pathlib.Path] = None,
+    ):
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.progress_folder = progress_folder or get_default_progress_folder()
+        self.progress_path = self.progress_folder / f"{upload_key}-{chunk_size}.json"
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_key(url: str, data: dict) -> str:
+        """
+        Key of the upload request sent to Codecov, which is the same when an
+        upload runs again.
+        """
+        request = json.dumps([url, data], sort_keys=True, default=str)
+        return hashlib.sha256(request.encode()).hexdigest()
+
+    def get_progress(self) -> typing.Optional[dict]:
+        """
+        Progress of an earlier run of this upload, if it can be resumed.
+        """
+        if not self.progress_folder.is_dir():
+            return None
+        self._remove_stale_files()
+        return self._load_progress()
+
+    def send(
+        self, chunks: typing.Iterable[bytes], multipart_url: str, payload_format: str
+    ) -> RequestResult:
+        """
+        Starts a new multipart upload and sends the payload to it.
+        """
+        self.progress_folder.mkdir(parents=True, exist_ok=True)
+        self._remove_stale_files()
+        self._remove_progress()
+        with self._spool_payload(chunks) as (payload_path, payload_hash):
+            size = os.path.getsize(payload_path)
+            number_of_parts = max(1, math.ceil(size / self.chunk_size))
+            resp = send_post_request(
+                url=multipart_url,
+                data={
+                    "size": size,
+                    "part_size": self.chunk_size,
+                    "parts": number_of_parts,
+                    "sha256": payload_hash,
+                },
+            )
+            if resp.error is not None:
+                return resp
+            try:
+                session = json.loads(resp.text)
+                progress = {
+                    "created_at": time.time(),
+                    "payload_format": payload_format,
+                    "sha256": payload_hash,
+                    "upload_id": session["upload_id"],
+                    "part_urls": list(session["part_urls"]),
+                    "complete_url": session["complete_url"],
+                    "etags": {},
+                }
+            except (ValueError, TypeError, KeyError) as exp:
+                return _chunked_upload_error(
+                    f"Invalid multipart upload response: {type(exp).__name__}: {exp}"
+                )
+            if len(progress["part_urls"]) < number_of_parts:
+                return _chunked_upload_error(
+                    f"Invalid multipart upload response: {len(progress['part_urls'])} part URLs for {number_of_parts} parts"
+                )
+            self._save_progress(progress)
+            return self._send_parts(payload_path, progress, resuming=False)
+
+    def resume(
+        self, chunks: typing.Iterable[bytes], progress: dict
+    ) -> typing.Optional[RequestResult]:
+        """
+        Sends the parts missing from the multipart upload of `progress`.
+
+        Returns None, discarding the progress, if the payload isn't the one
+        of the earlier run, so a new upload has to be requested.
+        """
+        with self._spool_payload(chunks) as (payload_path, payload_hash):
+            if payload_hash != progress.get("sha256"):
+                logger.info(
+                    "The reports changed since the upload was started. Starting a new upload."
+                )
+                self._remove_progress()
+                return None
+            logger.info(
+                f"Resuming upload, {len(progress['etags'])} of {self._number_of_parts(payload_path)} parts were already sent"
+            )
+            return self._send_parts(payload_path, progress, resuming=True)
+
+    @contextlib.contextmanager
+    def _spool_payload(self, chunks: typing.Iterable[bytes]):
+        fd, payload_path = tempfile.mkstemp(
+            dir=self.progress_folder, prefix="payload-", suffix=".tmp"
+        )
+        try:
+            sha = hashlib.sha256()
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    sha.update(chunk)
+                    f.write(chunk)
+            yield payload_path, sha.hexdigest()
+        finally:
+            os.remove(payload_path)
+
+    def _number_of_parts(self, payload_path: str) -> int:
+        return max(1, math.ceil(os.path.getsize(payload_path) / self.chunk_size))
+
+    def _send_parts(
+        self, payload_path: str, progress: dict, resuming: bool
+    ) -> RequestResult:
+        number_of_parts = self._number_of_parts(payload_path)
+        missing_parts = [
+            part
+            for part in range(number_of_parts)
+            if str(part) not in progress["etags"]
+        ]
+
+        expired = threading.Event()
+
+        def send_part(part: int) -> bool:
+            with open(payload_path, "rb") as f:
+                f.seek(part * self.chunk_size)
+                data = f.read(self.chunk_size)
+            try:
+                resp = _send_part(progress["part_urls"][part], data)
+            except Exception as exp:
+                logger.warning(f"Unable to send part {part + 1}: {exp}")
+                return False
+            if resp.status_code >= 400:
+                logger.warning(
+                    f"Unable to send part {part + 1}. Status code {resp.status_code}"
+                )
+                if resuming and resp.status_code in (403, 404):
+                    # The part URLs of the previous run expired
+                    expired.set()
+                return False
+            with self._lock:
+                progress["etags"][str(part)] = resp.headers.get("ETag", "")
+                self._save_progress(progress)
+            return True
+
+        logger.debug(
+            f"Sending {len(missing_parts)} of {number_of_parts} parts of {os.path.getsize(payload_path)} bytes"
+        )
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            sent_parts = list(executor.map(send_part, missing_parts))
+        failed_parts = [
+            part for part, sent in zip(missing_parts, sent_parts) if not sent
+        ]
+        if failed_parts:
+            logger.debug(f"Parts that failed to upload: {failed_parts}")
+            if expired.is_set():
+                self._remove_progress()
+                return _chunked_upload_error(
+                    "The upload resumed from a previous run expired. Run the upload again to start over."
+                )
+            return _chunked_upload_error(
+                f"{len(failed_parts)} of {number_of_parts} parts failed to upload. Run the upload again to resume."
+            )
+
+        resp = send_post_request(
+            url=progress["complete_url"],
+            data={
+                "upload_id": progress["upload_id"],
+                "parts": [
+                    {"part_number": part + 1, "etag": progress["etags"][str(part)]}
+                    for part in range(number_of_parts)
+                ],
+            },
+        )
+        if resp.error is None:
+            self._remove_progress()
+        return resp
+
+    def _load_progress(self) -> typing.Optional[dict]:
+        try:
+            with open(self.progress_path, "r") as f:
+                progress = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            logger.warning(f"Ignoring unreadable upload progress {self.progress_path}")
+            self._remove_progress()
+            return None
+        if not isinstance(progress, dict):
+            self._remove_progress()
+            return None
+        return progress
+
+    def _remove_progress(self):
+        _remove_file(self.progress_path)
+
+    def _remove_stale_files(self):
+        """
+        Removes the progress of uploads that were never completed, once their
+        part URLs can't be used anymore, and the payloads of crashed runs.
+        """
+        now = time.time()
+        for path in self.progress_folder.glob("*.tmp"):
+            try:
+                modified_at = path.stat().st_mtime
+            except OSError:
+                continue
+            if now - modified_at > MAX_PROGRESS_AGE:
+                logger.debug(f"Removing stale upload file {path}")
+                _remove_file(path)
+        for progress_path in self.progress_folder.glob("*.json"):
+            try:
+                with open(progress_path, "r") as f:
+                    created_at = json.load(f)["created_at"]
+            except FileNotFoundError:
+                continue
+            except (OSError, ValueError, TypeError, KeyError):
+                created_at = 0
+            if not isinstance(created_at, (int, float)):
+                created_at = 0
+            if now - created_at > MAX_PROGRESS_AGE:
+                logger.debug(f"Removing stale upload progress {progress_path}")
+                _remove_file(progress_path)
+
+    def _save_progress(self, progress: dict):
+        fd, tmp_path = tempfile.mkstemp(dir=self.progress_folder, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(progress, f)
+        os.replace(tmp_path, self.progress_path)
+
+
+def _remove_file(path: pathlib.Path):
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def _chunked_upload_error(description: str) -> RequestResult:
+    return RequestResult(
+        error=RequestError(
+            code="Chunked upload error", params={}, description=description
+        ),
+        warnings=[],
+        status_code=0,
+        text="",
+    )
@@ -0,0 +1,169 @@
+import contextlib
+import json
+import sys
+import threading
+import typing
+from time import perf_counter
+
+from codecov_cli.helpers.upload_type import ReportType
+from codecov_cli.services.upload.legacy_upload_sender import LegacyUploadSender
+from codecov_cli.types import UploadCollectionResult, UploadCollectionResultFile
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class StageTimings(object):
+    """
+    Wall time spent in each stage of an upload. A stage entered several times
+    accumulates its time.
+    """
+
+    def __init__(self):
+        self.seconds: typing.Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = perf_counter() - start
+            with self._lock:
+                self.seconds[name] = self.seconds.get(name, 0.0) + elapsed
+
+
+def get_peak_rss_bytes() -> typing.Optional[int]:
+    if resource is None:
+        return None
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    return peak_rss if sys.platform == "darwin" else peak_rss * 1024
+
+
+def _record_files(
+    formatted_files: typing.Iterable[dict],
+    files: typing.List[UploadCollectionResultFile],
+    report_files: typing.List[dict],
+) -> typing.Iterator[dict]:
+    for file, formatted_file in zip(files, formatted_files):
+        report_files.append(
+            {
+                "filename": file.get_filename(),
+                "raw_bytes": file.get_size(),
+                "encoded_bytes": len(formatted_file["data"]),
+                "format": formatted_file["format"],
+            }
+        )
+        yield formatted_file
+
+
+def _count_bytes(chunks: typing.Iterable[bytes], counter: typing.List[int]):
+    for chunk in chunks:
+        counter[0] += len(chunk)
+        yield chunk
+
+
+def _generate_legacy_chunks(
+    sender: LegacyUploadSender,
+    upload_part: UploadCollectionResult,
+    report_files: typing.List[dict],
+) -> typing.Iterator[bytes]:
+    yield sender._generate_network_section(upload_part)
+    for file in upload_part.files:
+        file_bytes = [0]
+        yield from _count_bytes(sender._generate_coverage_file_chunks(file), file_bytes)
+        report_files.append(
+            {
+                "filename": file.get_filename(),
+                "raw_bytes": file.get_size(),
+                "encoded_bytes": file_bytes[0],
+                "format": "text",
+            }
+        )
+
+
+def generate_dry_run_report(
+    sender,
+    upload_parts: typing.List[UploadCollectionResult],
+    report_type: ReportType,
+    stage_timings: StageTimings,
+) -> dict:
+    """
+    Generates the storage payload of each upload the way `sender` streams it,
+    with the same compression workers and payload format, and discards it.
+    Reports how long each stage took and how large each part is.
+
+    The legacy uploader sends a plain text payload, with no compression and
+    no file fixes.
+    """
+    legacy = isinstance(sender, LegacyUploadSender)
+    files = []
+    parts = []
+    for upload_part in upload_parts:
+        part_files = []
+        document_bytes = [0]
+        with stage_timings.stage("payload"):
+            if legacy:
+                chunks = _count_bytes(
+                    _generate_legacy_chunks(sender, upload_part, part_files),
+                    document_bytes,
+                )
+            else:
+                formatted_files = _record_files(
+                    sender._format_files(upload_part.files, sender.inline_files),
+                    upload_part.files,
+                    part_files,
+                )
+                chunks = _count_bytes(
+                    sender._generate_json_chunks(
+                        upload_part, report_type, sender.inline_files, formatted_files
+                    ),
+                    document_bytes,
+                )
+                if sender.inline_files:
+                    chunks = sender._compress_chunks(chunks, sender.payload_format)
+            payload_bytes = sum(len(chunk) for chunk in chunks)
+        files.extend(part_files)
+        parts.append(
+            {
+                "files": len(part_files),
+                "document_bytes": document_bytes[0],
+                "payload_bytes": payload_bytes,
+            }
+        )
+
+    # Every part carries the network and the file fixes of its reports
+    if legacy:
+        sections_bytes = {
+            "network": sum(
+                len(sender._generate_network_section(part)) for part in upload_parts
+            ),
+            "file_fixes": 0,
+        }
+    else:
+        sections_bytes = {
+            "network": sum(
+                len(json.dumps(part.network or [])) for part in upload_parts
+            ),
+            "file_fixes": sum(
+                len(json.dumps(sender._get_file_fixers(part))) for part in upload_parts
+            ),
+        }
+    return {
+        "report_type": report_type.value,
+        "payload_format": "legacy" if legacy else sender.payload_format,
+        "compression_workers": None if legacy else sender.compression_workers,
+        "stages_seconds": {
+            name: round(seconds, 6) for name, seconds in stage_timings.seconds.items()
+        },
+        "files": files,
+        "sections_bytes": sections_bytes,
+        "parts": parts,
+        "document_bytes": sum(part["document_bytes"] for part in parts),
+        "payload_bytes": sum(part["payload_bytes"] for part in parts),
+        "peak_rss_bytes": get_peak_rss_bytes(),
+    }
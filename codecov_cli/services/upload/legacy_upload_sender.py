@@ -6,7 +6,11 @@ import sentry_sdk
 
 from codecov_cli import __version__ as codecov_cli_version
 from codecov_cli.helpers.config import LEGACY_CODECOV_API_URL
-from codecov_cli.helpers.request import send_post_request, send_put_request
+from codecov_cli.helpers.request import (
+    StreamingPayload,
+    send_post_request,
+    send_put_request,
+)
 from codecov_cli.types import UploadCollectionResult, UploadCollectionResultFile
 
 logger = logging.getLogger("codecovcli")
@@ -34,6 +38,9 @@ class UploadSendingResult(object):
 
 
 class LegacyUploadSender(object):
+    def __init__(self, chunked_transfer: bool = False):
+        self.chunked_transfer = chunked_transfer
+
     def send_upload_data(
         self,
         upload_data: UploadCollectionResult,
@@ -82,22 +89,40 @@ class LegacyUploadSender(object):
             resp = send_post_request(
                 f"{upload_url}/upload/v4", data=data, headers=headers, params=params
             )
-            if resp.status_code >= 400:
+            if resp.error is not None:
                 return resp
             result_url, put_url = resp.text.split("\n")
 
-            reports_payload = self._generate_payload(upload_data, env_vars)
+            # Report files are read from disk while the payload is being sent
+            reports_payload = StreamingPayload(
+                lambda: self._generate_payload_chunks(upload_data, env_vars)
+            )
+            if not self.chunked_transfer:
+                reports_payload = reports_payload.buffered()
             resp = send_put_request(put_url, data=reports_payload)
             return resp
 
+    def get_encoded_sizes(
+        self, files: typing.List[UploadCollectionResultFile]
+    ) -> typing.Dict[UploadCollectionResultFile, int]:
+        # Files are sent as they are
+        return {file: file.get_size() for file in files}
+
     def _generate_payload(
         self, upload_data: UploadCollectionResult, env_vars: typing.Dict[str, str]
     ) -> bytes:
-        env_vars_section = self._generate_env_vars_section(env_vars)
-        network_section = self._generate_network_section(upload_data)
-        coverage_files_section = self._generate_coverage_files_section(upload_data)
+        return b"".join(self._generate_payload_chunks(upload_data, env_vars))
 
-        return b"".join([env_vars_section, network_section, coverage_files_section])
+    def _generate_payload_chunks(
+        self, upload_data: UploadCollectionResult, env_vars: typing.Dict[str, str]
+    ) -> typing.Iterator[bytes]:
+        for section in (
+            self._generate_env_vars_section(env_vars),
+            self._generate_network_section(upload_data),
+        ):
+            if section:
+                yield section
+        yield from self._generate_coverage_files_chunks(upload_data)
 
     def _generate_env_vars_section(self, env_vars) -> bytes:
         filtered_env_vars = {
@@ -122,11 +147,20 @@ class LegacyUploadSender(object):
         return network_files_section.encode() + b"<<<<<< network\n"
 
     def _generate_coverage_files_section(self, upload_data: UploadCollectionResult):
-        return b"".join(self._format_coverage_file(file) for file in upload_data.files)
+        return b"".join(self._generate_coverage_files_chunks(upload_data))
 
-    def _format_coverage_file(self, file: UploadCollectionResultFile) -> bytes:
-        header = b"# path=" + file.get_filename().encode() + b"\n"
-        file_content = file.get_content() + b"\n"
-        file_end = b"<<<<<< EOF\n"
+    def _generate_coverage_files_chunks(
+        self, upload_data: UploadCollectionResult
+    ) -> typing.Iterator[bytes]:
+        for file in upload_data.files:
+            yield from self._generate_coverage_file_chunks(file)
 
-        return header + file_content + file_end
+    def _format_coverage_file(self, file: UploadCollectionResultFile) -> bytes:
+        return b"".join(self._generate_coverage_file_chunks(file))
+
+    def _generate_coverage_file_chunks(
+        self, file: UploadCollectionResultFile
+    ) -> typing.Iterator[bytes]:
+        yield b"# path=" + file.get_filename().encode() + b"\n"
+        yield from file.iter_content()
+        yield b"\n<<<<<< EOF\n"
@@ -1,4 +1,5 @@
 import pathlib
+import threading
 import typing
 
 from codecov_cli.helpers.versioning_systems import VersioningSystemInterface
@@ -18,11 +19,21 @@ class NetworkFinder(object):
         self.network_filter = network_filter
         self.network_prefix = network_prefix
         self.network_root_folder = network_root_folder
+        self._files = None
+        self._lock = threading.Lock()
+
+    def _list_relevant_files(self) -> typing.Optional[typing.List[str]]:
+        # The network is only listed once, even if the finder is shared by
+        # several uploads
+        with self._lock:
+            if self._files is None:
+                self._files = self.versioning_system.list_relevant_files(
+                    self.network_root_folder, self.recurse_submodules
+                )
+            return self._files
 
     def find_files(self, ignore_filters=False) -> typing.List[str]:
-        files = self.versioning_system.list_relevant_files(
-            self.network_root_folder, self.recurse_submodules
-        )
+        files = self._list_relevant_files()
 
         if files and not ignore_filters:
             if self.network_filter:
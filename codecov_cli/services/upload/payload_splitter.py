@@ -0,0 +1,137 @@
+import json
+import logging
+import re
+import typing
+
+from codecov_cli.types import (
+    UploadCollectionResult,
+    UploadCollectionResultFile,
+    UploadCollectionResultFileFixer,
+)
+
+logger = logging.getLogger("codecovcli")
+
+# Characters around the paths and file names in report formats
+_PATH_DELIMITERS = re.compile(rb"[\s/\\\"'<>:=,;()\[\]{}|]")
+MAX_FILE_NAME_LENGTH = 255
+
+
+def _estimate_file_fix_size(file_fix: UploadCollectionResultFileFixer) -> int:
+    # Roughly its path plus a few characters per line number
+    return (
+        len(file_fix.path.as_posix())
+        + 8 * len(file_fix.fixed_lines_without_reason)
+        + 8 * len(file_fix.fixed_lines_with_reason or [])
+    )
+
+
+def match_file_fixes(
+    files: typing.List[UploadCollectionResultFile],
+    file_fixes: typing.List[UploadCollectionResultFileFixer],
+) -> typing.Dict[
+    UploadCollectionResultFile, typing.List[UploadCollectionResultFileFixer]
+]:
+    """
+    Returns the file fixes each report file needs: the ones of the source
+    files whose name appears in the report. Report formats refer to source
+    files by path or by file name, so the name is in the report either way.
+
+    Names are found by searching for their extensions. Source files without
+    an extension can't be found that way, so every report gets their fixes.
+    """
+    fixes_by_name = {}
+    unmatched_fixes = []
+    for file_fix in file_fixes:
+        name = file_fix.path.name
+        if "." not in name.strip("."):
+            unmatched_fixes.append(file_fix)
+        else:
+            fixes_by_name.setdefault(name.encode(), []).append(file_fix)
+    if not fixes_by_name:
+        return {file: list(unmatched_fixes) for file in files}
+
+    extensions = sorted({name.rsplit(b".", 1)[1] for name in fixes_by_name})
+    extension_regex = re.compile(
+        rb"\.(?:" + b"|".join(re.escape(e) for e in extensions) + rb")(?!\w)"
+    )
+    fixes_by_file = {}
+    for file in files:
+        names = set()
+        with file.open_view() as content:
+            for match in extension_regex.finditer(content):
+                start = max(0, match.end() - MAX_FILE_NAME_LENGTH)
+                name = _PATH_DELIMITERS.split(bytes(content[start : match.end()]))[-1]
+                if name in fixes_by_name:
+                    names.add(name)
+        fixes_by_file[file] = unmatched_fixes + [
+            file_fix for name in sorted(names) for file_fix in fixes_by_name[name]
+        ]
+    return fixes_by_file
+
+
+def split_upload_data(
+    upload_data: UploadCollectionResult,
+    max_payload_size: int,
+    get_encoded_sizes: typing.Callable[
+        [typing.List[UploadCollectionResultFile]],
+        typing.Dict[UploadCollectionResultFile, int],
+    ],
+) -> typing.List[UploadCollectionResult]:
+    """
+    Splits the report files into as few uploads as possible that each stay
+    under `max_payload_size` bytes, packing the largest files first.
+
+    `get_encoded_sizes` returns the size of each file in the payload. Every
+    upload is processed on its own, so each one carries the network, which
+    Codecov resolves the paths in its reports against. The fixes of a
+    source file only go with the uploads whose reports name it (see
+    `match_file_fixes`). Files keep their original order within an upload.
+    A file that exceeds the budget on its own gets an upload to itself.
+    """
+    sizes = get_encoded_sizes(upload_data.files)
+    fixes_by_file = match_file_fixes(upload_data.files, upload_data.file_fixes)
+    # A file brings its file fixes along
+    costs = {
+        file: sizes[file]
+        + sum(_estimate_file_fix_size(file_fix) for file_fix in fixes_by_file[file])
+        for file in upload_data.files
+    }
+    upload_budget = max_payload_size - len(json.dumps(upload_data.network or []))
+    # Remaining budget and files of each upload
+    budgets = []
+    files_by_upload = []
+    for file in sorted(upload_data.files, key=lambda f: costs[f], reverse=True):
+        if costs[file] > upload_budget:
+            logger.warning(
+                f"{file.get_filename()} is larger than the maximum payload size, uploading it on its own"
+            )
+        for index, budget in enumerate(budgets):
+            if costs[file] <= budget:
+                break
+        else:
+            index = len(budgets)
+            budgets.append(upload_budget)
+            files_by_upload.append([])
+        budgets[index] -= costs[file]
+        files_by_upload[index].append(file)
+    if len(files_by_upload) <= 1:
+        return [upload_data]
+
+    order = {file: index for index, file in enumerate(upload_data.files)}
+    parts = []
+    for files in files_by_upload:
+        needed_fixes = set(
+            id(file_fix) for file in files for file_fix in fixes_by_file[file]
+        )
+        parts.append(
+            UploadCollectionResult(
+                network=upload_data.network,
+                files=sorted(files, key=lambda f: order[f]),
+                file_fixes=[
+                    file_fix
+                    for file_fix in upload_data.file_fixes
+                    if id(file_fix) in needed_fixes
+                ],
+            )
+        )
+    return parts
@@ -1,6 +1,8 @@
+import contextlib
 import logging
 import pathlib
 import re
+import threading
 import typing
 import uuid
 from collections import namedtuple
@@ -10,6 +12,7 @@ import click
 import sentry_sdk
 
 from codecov_cli.helpers.upload_type import ReportType
+from codecov_cli.services.upload.dry_run_report import StageTimings
 from codecov_cli.services.upload.file_finder import FileFinder
 from codecov_cli.services.upload.network_finder import NetworkFinder
 from codecov_cli.types import (
@@ -25,6 +28,27 @@ fix_patterns_to_apply = namedtuple(
 )
 
 
+class CollectionCache(object):
+    """
+    Results shared by the collectors of several uploads made in one invocation.
+    """
+
+    def __init__(self):
+        self._file_fixes = None
+        self._lock = threading.Lock()
+
+    def get_file_fixes(
+        self,
+        produce_file_fixes: typing.Callable[
+            [], typing.List[UploadCollectionResultFileFixer]
+        ],
+    ) -> typing.List[UploadCollectionResultFileFixer]:
+        with self._lock:
+            if self._file_fixes is None:
+                self._file_fixes = produce_file_fixes()
+            return self._file_fixes
+
+
 class UploadCollector(object):
     def __init__(
         self,
@@ -33,12 +57,21 @@ class UploadCollector(object):
         file_finder: FileFinder,
         plugin_config: dict,
         disable_file_fixes: bool = False,
+        collection_cache: typing.Optional[CollectionCache] = None,
+        stage_timings: typing.Optional[StageTimings] = None,
     ):
         self.preparation_plugins = preparation_plugins
         self.network_finder = network_finder
         self.file_finder = file_finder
         self.disable_file_fixes = disable_file_fixes
         self.plugin_config = plugin_config
+        self.collection_cache = collection_cache
+        self.stage_timings = stage_timings
+
+    def _stage(self, name: str) -> typing.ContextManager:
+        if self.stage_timings is None:
+            return contextlib.nullcontext()
+        return self.stage_timings.stage(name)
 
     def _produce_file_fixes(
         self, files: typing.List[str]
@@ -154,14 +187,17 @@ class UploadCollector(object):
         self, report_type: ReportType = ReportType.COVERAGE
     ) -> UploadCollectionResult:
         with sentry_sdk.start_span(name="upload_collector"):
-            for prep in self.preparation_plugins:
-                logger.debug(f"Running preparation plugin: {type(prep)}")
-                prep.run_preparation(self)
+            with self._stage("plugins"):
+                for prep in self.preparation_plugins:
+                    logger.debug(f"Running preparation plugin: {type(prep)}")
+                    prep.run_preparation(self)
             logger.debug("Collecting relevant files")
             with sentry_sdk.start_span(name="file_collector"):
-                network = self.network_finder.find_files()
-                unfiltered_network = self.network_finder.find_files(True)
-                report_files = self.file_finder.find_files()
+                with self._stage("network"):
+                    network = self.network_finder.find_files()
+                    unfiltered_network = self.network_finder.find_files(True)
+                with self._stage("discovery"):
+                    report_files = self.file_finder.find_files()
             logger.info(
                 f"Found {len(report_files)} {report_type.value} files to report"
             )
@@ -187,12 +223,23 @@ class UploadCollector(object):
                 )
             for file in report_files:
                 logger.info(f"> {file}")
+            with self._stage("file_fixes"):
+                file_fixes = (
+                    self._get_or_produce_file_fixes(unfiltered_network)
+                    if report_type == ReportType.COVERAGE
+                    else []
+                )
             return UploadCollectionResult(
                 network=network,
                 files=report_files,
-                file_fixes=(
-                    self._produce_file_fixes(unfiltered_network)
-                    if report_type == ReportType.COVERAGE
-                    else []
-                ),
+                file_fixes=file_fixes,
             )
+
+    def _get_or_produce_file_fixes(
+        self, files: typing.List[str]
+    ) -> typing.List[UploadCollectionResultFileFixer]:
+        if self.collection_cache is None:
+            return self._produce_file_fixes(files)
+        return self.collection_cache.get_file_fixes(
+            lambda: self._produce_file_fixes(files)
+        )
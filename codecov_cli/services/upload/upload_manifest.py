@@ -0,0 +1,107 @@
+import json
+import logging
+import os
+import pathlib
+import tempfile
+import threading
+import typing
+
+from codecov_cli.types import UploadCollectionResultFile
+
+logger = logging.getLogger("codecovcli")
+
+# Only the most recent uploads are remembered, so the manifest can't grow
+# forever in long-lived workspaces.
+MAX_MANIFEST_ENTRIES = 50
+
+
+def hash_file(file: UploadCollectionResultFile) -> str:
+    return file.get_sha256()
+
+
+class UploadManifest(object):
+    """
+    Content hashes of report files already uploaded successfully, grouped by
+    commit, report code, report type and flags.
+
+    The manifest is only kept when a path is given with --upload-manifest,
+    e.g. in a folder the CI caches between the runs of a job.
+    """
+
+    # Uploads made concurrently in one invocation share the manifest file
+    _lock = threading.Lock()
+
+    def __init__(self, path: pathlib.Path):
+        self.path = path
+
+    @staticmethod
+    def get_key(
+        commit_sha: str,
+        report_code: str,
+        report_type: str,
+        flags: typing.Optional[typing.List[str]],
+    ) -> str:
+        return "/".join(
+            [commit_sha, report_code, report_type, ",".join(sorted(flags or []))]
+        )
+
+    def _load(self) -> typing.Dict[str, typing.List[str]]:
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f).get("uploads", {})
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError, AttributeError):
+            logger.warning(f"Ignoring unreadable upload manifest {self.path}")
+            return {}
+
+    def get_uploaded_hashes(self, key: str) -> typing.Set[str]:
+        return set(self._load().get(key, []))
+
+    def record_uploaded_hashes(self, key: str, hashes: typing.Iterable[str]):
+        with self._lock:
+            self._record_uploaded_hashes(key, hashes)
+
+    def _record_uploaded_hashes(self, key: str, hashes: typing.Iterable[str]):
+        uploads = self._load()
+        recorded = uploads.pop(key, [])
+        uploads[key] = sorted(set(recorded).union(hashes))
+        while len(uploads) > MAX_MANIFEST_ENTRIES:
+            uploads.pop(next(iter(uploads)))
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Write atomically, other jobs may share this workspace
+            fd, tmp_path = tempfile.mkstemp(dir=self.path.parent)
+            with os.fdopen(fd, "w") as f:
+                json.dump({"version": 1, "uploads": uploads}, f)
+            os.replace(tmp_path, self.path)
+        except OSError as exp:
+            logger.warning(f"Unable to save upload manifest {self.path}: {exp}")
+
+
+def skip_uploaded_files(
+    files: typing.List[UploadCollectionResultFile], uploaded_hashes: typing.Set[str]
+) -> typing.Tuple[typing.List[UploadCollectionResultFile], typing.Dict[str, str], int]:
+    """
+    Removes files whose content was already uploaded, as well as duplicates
+    among `files`.
+
+    Returns the remaining files, the hashes of the remaining files by filename
+    and the number of bytes skipped.
+    """
+    seen_hashes = set(uploaded_hashes)
+    files_to_upload = []
+    hashes_by_filename = {}
+    skipped_bytes = 0
+    for file in files:
+        file_hash = hash_file(file)
+        if file_hash in seen_hashes:
+            skipped_bytes += file.get_size()
+            logger.debug(
+                f"Skipping {file.get_filename()}, identical content was already uploaded"
+            )
+            continue
+        seen_hashes.add(file_hash)
+        hashes_by_filename[file.get_filename()] = file_hash
+        files_to_upload.append(file)
+    return files_to_upload, hashes_by_filename, skipped_bytes
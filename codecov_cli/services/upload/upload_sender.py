@@ -1,21 +1,28 @@
 import base64
 import json
 import logging
+import pathlib
 import typing
 import zlib
-from typing import Any, Dict
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator
 
 import sentry_sdk
 
 from codecov_cli import __version__ as codecov_cli_version
+from codecov_cli.helpers.compression import compress_chunks, is_zstd_available
 from codecov_cli.helpers.config import CODECOV_INGEST_URL
 from codecov_cli.helpers.encoder import encode_slug
 from codecov_cli.helpers.upload_type import ReportType
 from codecov_cli.helpers.request import (
+    StreamingPayload,
     get_token_header,
     send_post_request,
     send_put_request,
 )
+from codecov_cli.services.upload.chunked_upload import ChunkedUpload
+from codecov_cli.services.upload.upload_spool import UploadSpool
 from codecov_cli.types import (
     RequestResult,
     UploadCollectionResult,
@@ -24,8 +31,41 @@ from codecov_cli.types import (
 
 logger = logging.getLogger("codecovcli")
 
+DEFAULT_PAYLOAD_FORMAT = "base64+compressed"
+# Formats where the whole payload is compressed as a single stream and report
+# files are inlined without encoding.
+STREAM_PAYLOAD_FORMATS = ["gzip", "zstd"]
+PAYLOAD_FORMATS = [DEFAULT_PAYLOAD_FORMAT, *STREAM_PAYLOAD_FORMATS]
+
 
 class UploadSender(object):
+    def __init__(
+        self,
+        compression_workers: int = 1,
+        compression_level: typing.Optional[int] = None,
+        payload_format: str = DEFAULT_PAYLOAD_FORMAT,
+        upload_chunk_size: typing.Optional[int] = None,
+        chunked_transfer: bool = False,
+    ):
+        if payload_format == "zstd" and not is_zstd_available():
+            logger.warning(
+                "zstd compression is not available. Using gzip payload format instead."
+            )
+            payload_format = "gzip"
+        self.payload_format = payload_format
+        self.compression_workers = compression_workers
+        self.upload_chunk_size = upload_chunk_size
+        self.chunked_transfer = chunked_transfer
+        # Files encoded by `get_encoded_sizes`, until they are sent
+        self._encoded_files: Dict[
+            UploadCollectionResultFile, typing.Tuple[str, str]
+        ] = {}
+        self.compression_level = (
+            compression_level
+            if compression_level is not None
+            else zlib.Z_DEFAULT_COMPRESSION
+        )
+
     def send_upload_data(
         self,
         upload_data: UploadCollectionResult,
@@ -56,46 +96,55 @@ class UploadSender(object):
 
         with sentry_sdk.start_span(name="upload_sender"):
             with sentry_sdk.start_span(name="upload_sender_preparation"):
-                file_not_found = False
-                if report_type == ReportType.TEST_RESULTS and not upload_data.files:
-                    file_not_found = True
-
-                data = {
-                    "ci_service": ci_service,
-                    "ci_url": build_url,
-                    "cli_args": args,
-                    "env": env_vars,
-                    "flags": flags,
-                    "job_code": job_code,
-                    "name": name,
-                    "version": codecov_cli_version,
-                    "file_not_found": file_not_found,
-                }
-
-                if upload_coverage:
-                    data["branch"] = branch
-                    data["code"] = report_code
-                    data["commitid"] = commit_sha
-                    data["parent_commit_id"] = parent_sha
-                    data["pullid"] = pull_request_number
-                headers = get_token_header(token)
-                encoded_slug = encode_slug(slug)
-                upload_url = enterprise_url or CODECOV_INGEST_URL
-                url, data = self.get_url_and_possibly_update_data(
-                    data,
-                    report_type,
-                    upload_url,
-                    git_service,
-                    branch,
-                    encoded_slug,
-                    commit_sha,
-                    report_code,
-                    upload_coverage,
+                url, data, file_not_found = self._get_upload_request(
+                    upload_data=upload_data,
+                    commit_sha=commit_sha,
+                    env_vars=env_vars,
+                    report_code=report_code,
+                    report_type=report_type,
+                    name=name,
+                    branch=branch,
+                    slug=slug,
+                    pull_request_number=pull_request_number,
+                    build_url=build_url,
+                    job_code=job_code,
+                    flags=flags,
+                    ci_service=ci_service,
+                    git_service=git_service,
+                    enterprise_url=enterprise_url,
+                    parent_sha=parent_sha,
+                    upload_coverage=upload_coverage,
+                    args=args,
                 )
-                # Data that goes to storage
-                reports_payload = self._generate_payload(
-                    upload_data, env_vars, report_type
+                headers = get_token_header(token)
+                if self.payload_format != DEFAULT_PAYLOAD_FORMAT:
+                    data["payload_format"] = self.payload_format
+                if self.upload_chunk_size:
+                    data["upload_chunk_size"] = self.upload_chunk_size
+
+            chunked_upload = None
+            if self.upload_chunk_size and not file_not_found:
+                chunked_upload = ChunkedUpload(
+                    ChunkedUpload.get_key(url, data), self.upload_chunk_size
                 )
+                progress = chunked_upload.get_progress()
+                if progress is not None:
+                    # The upload was already requested by an earlier run,
+                    # requesting it again would leave that one without data
+                    with sentry_sdk.start_span(name="upload_sender_storage"):
+                        resp_from_storage = chunked_upload.resume(
+                            StreamingPayload(
+                                lambda: self._generate_payload_chunks(
+                                    upload_data,
+                                    env_vars,
+                                    report_type,
+                                    progress["payload_format"],
+                                )
+                            ),
+                            progress,
+                        )
+                    if resp_from_storage is not None:
+                        return resp_from_storage
 
             with sentry_sdk.start_span(name="upload_sender_storage_request"):
                 logger.debug("Sending upload request to Codecov")
@@ -111,7 +160,7 @@ class UploadSender(object):
                     )
                     return resp_from_codecov
 
-                if resp_from_codecov.status_code >= 400:
+                if resp_from_codecov.error is not None:
                     return resp_from_codecov
                 resp_json_obj = json.loads(resp_from_codecov.text)
                 if resp_json_obj.get("url"):
@@ -123,37 +172,239 @@ class UploadSender(object):
                     extra=dict(extra_log_attributes=dict(response=resp_json_obj)),
                 )
                 put_url = resp_json_obj["raw_upload_location"]
+                payload_format = self._negotiate_payload_format(resp_json_obj)
+                multipart_url = self._negotiate_multipart_upload(resp_json_obj)
 
             with sentry_sdk.start_span(name="upload_sender_storage"):
-                logger.debug("Sending upload to storage")
-                resp_from_storage = send_put_request(put_url, data=reports_payload)
+                # Data that goes to storage. Files are only read and encoded
+                # while the storage request is being sent.
+                reports_payload = StreamingPayload(
+                    lambda: self._generate_payload_chunks(
+                        upload_data, env_vars, report_type, payload_format
+                    )
+                )
+                if multipart_url:
+                    logger.debug("Sending upload to storage in parts")
+                    resp_from_storage = chunked_upload.send(
+                        reports_payload, multipart_url, payload_format
+                    )
+                else:
+                    logger.debug("Sending upload to storage")
+                    if not self.chunked_transfer:
+                        reports_payload = reports_payload.buffered()
+                    resp_from_storage = send_put_request(put_url, data=reports_payload)
 
             return resp_from_storage
 
+    def spool_upload_data(
+        self,
+        spool: UploadSpool,
+        upload_data: UploadCollectionResult,
+        env_vars: typing.Dict[str, str],
+        report_type: ReportType = ReportType.COVERAGE,
+        token: typing.Optional[str] = None,
+        build_code: typing.Optional[str] = None,
+        **kwargs,
+    ) -> pathlib.Path:
+        """
+        Saves the upload request and the storage payload in `spool`, to be sent
+        later. Takes the same arguments as `send_upload_data`.
+
+        The payload is saved in the default format, which Codecov always
+        accepts, and is sent in a single request.
+        """
+        url, data, _ = self._get_upload_request(
+            upload_data=upload_data,
+            env_vars=env_vars,
+            report_type=report_type,
+            **kwargs,
+        )
+        return spool.add(
+            url,
+            data,
+            self._generate_payload_chunks(upload_data, env_vars, report_type),
+        )
+
+    def _get_upload_request(
+        self,
+        upload_data: UploadCollectionResult,
+        commit_sha: str,
+        env_vars: typing.Dict[str, str],
+        report_code: str,
+        report_type: ReportType = ReportType.COVERAGE,
+        name: typing.Optional[str] = None,
+        branch: typing.Optional[str] = None,
+        slug: typing.Optional[str] = None,
+        pull_request_number: typing.Optional[str] = None,
+        build_url: typing.Optional[str] = None,
+        job_code: typing.Optional[str] = None,
+        flags: typing.List[str] = None,
+        ci_service: typing.Optional[str] = None,
+        git_service: typing.Optional[str] = None,
+        enterprise_url: typing.Optional[str] = None,
+        parent_sha: typing.Optional[str] = None,
+        upload_coverage: bool = False,
+        args: dict = None,
+    ) -> typing.Tuple[str, dict, bool]:
+        """
+        Returns the URL and data of the upload request to Codecov, and whether
+        there are no test results files to upload.
+        """
+        file_not_found = False
+        if report_type == ReportType.TEST_RESULTS and not upload_data.files:
+            file_not_found = True
+
+        data = {
+            "ci_service": ci_service,
+            "ci_url": build_url,
+            "cli_args": args,
+            "env": env_vars,
+            "flags": flags,
+            "job_code": job_code,
+            "name": name,
+            "version": codecov_cli_version,
+            "file_not_found": file_not_found,
+        }
+
+        if upload_coverage:
+            data["branch"] = branch
+            data["code"] = report_code
+            data["commitid"] = commit_sha
+            data["parent_commit_id"] = parent_sha
+            data["pullid"] = pull_request_number
+        encoded_slug = encode_slug(slug)
+        upload_url = enterprise_url or CODECOV_INGEST_URL
+        url, data = self.get_url_and_possibly_update_data(
+            data,
+            report_type,
+            upload_url,
+            git_service,
+            branch,
+            encoded_slug,
+            commit_sha,
+            report_code,
+            upload_coverage,
+        )
+        return url, data, file_not_found
+
+    def _negotiate_payload_format(self, resp_json_obj: dict) -> str:
+        """
+        Codecov echoes `payload_format` back when it accepts the requested
+        format. Otherwise the default format is used.
+        """
+        if self.payload_format == DEFAULT_PAYLOAD_FORMAT:
+            return DEFAULT_PAYLOAD_FORMAT
+        accepted_format = resp_json_obj.get("payload_format")
+        if accepted_format != self.payload_format:
+            logger.info(
+                f"Codecov did not accept the {self.payload_format} payload format. Using {DEFAULT_PAYLOAD_FORMAT} instead."
+            )
+            return DEFAULT_PAYLOAD_FORMAT
+        return accepted_format
+
+    def _negotiate_multipart_upload(self, resp_json_obj: dict) -> typing.Optional[str]:
+        """
+        Codecov answers with `raw_upload_multipart_location` when it supports
+        sending the payload in parts. Otherwise it is sent in one request.
+        """
+        if not self.upload_chunk_size:
+            return None
+        multipart_url = resp_json_obj.get("raw_upload_multipart_location")
+        if not multipart_url:
+            logger.info(
+                "Codecov did not accept a chunked upload. Sending the upload in a single request instead."
+            )
+        return multipart_url
+
     def _generate_payload(
         self,
         upload_data: UploadCollectionResult,
         env_vars: typing.Dict[str, str],
         report_type: ReportType = ReportType.COVERAGE,
+        payload_format: str = DEFAULT_PAYLOAD_FORMAT,
     ) -> bytes:
+        return b"".join(
+            self._generate_payload_chunks(
+                upload_data, env_vars, report_type, payload_format
+            )
+        )
+
+    def _generate_payload_chunks(
+        self,
+        upload_data: UploadCollectionResult,
+        env_vars: typing.Dict[str, str],
+        report_type: ReportType = ReportType.COVERAGE,
+        payload_format: str = DEFAULT_PAYLOAD_FORMAT,
+    ) -> Iterator[bytes]:
+        """
+        Yields the storage payload, encoding one file at a time.
+
+        With the default format the output is byte-identical to `json.dumps` of
+        the full payload dict. With a stream format, files are inlined as plain
+        text and the whole JSON document is compressed as one stream.
+        """
+        if payload_format in STREAM_PAYLOAD_FORMATS:
+            return self._compress_chunks(
+                self._generate_json_chunks(upload_data, report_type, inline=True),
+                payload_format,
+            )
+        return self._generate_json_chunks(upload_data, report_type)
+
+    @property
+    def inline_files(self) -> bool:
+        return self.payload_format in STREAM_PAYLOAD_FORMATS
+
+    def _compress_chunks(
+        self, chunks: typing.Iterable[bytes], payload_format: str
+    ) -> Iterator[bytes]:
+        return compress_chunks(
+            chunks,
+            payload_format,
+            level=(
+                None
+                if self.compression_level == zlib.Z_DEFAULT_COMPRESSION
+                else self.compression_level
+            ),
+        )
+
+    def _generate_json_chunks(
+        self,
+        upload_data: UploadCollectionResult,
+        report_type: ReportType,
+        inline: bool = False,
+        formatted_files: typing.Optional[typing.Iterable[Dict[str, Any]]] = None,
+    ) -> Iterator[bytes]:
         network_files = upload_data.network
         if report_type == ReportType.COVERAGE:
-            payload = {
-                "report_fixes": {
-                    "format": "legacy",
-                    "value": self._get_file_fixers(upload_data),
-                },
-                "network_files": network_files if network_files is not None else [],
-                "coverage_files": self._get_files(upload_data),
-                "metadata": {},
+            report_fixes = {
+                "format": "legacy",
+                "value": self._get_file_fixers(upload_data),
             }
+            network_files = network_files if network_files is not None else []
+            yield b'{"report_fixes": ' + json.dumps(report_fixes).encode()
+            yield b', "network_files": ' + json.dumps(network_files).encode()
+            yield b', "coverage_files": '
+            yield from self._generate_files_chunks(upload_data, inline, formatted_files)
+            yield b', "metadata": {}}'
         elif report_type == ReportType.TEST_RESULTS:
-            payload = {
-                "test_results_files": self._get_files(upload_data),
-            }
+            yield b'{"test_results_files": '
+            yield from self._generate_files_chunks(upload_data, inline, formatted_files)
+            yield b"}"
 
-        json_data = json.dumps(payload)
-        return json_data.encode()
+    def _generate_files_chunks(
+        self,
+        upload_data: UploadCollectionResult,
+        inline: bool = False,
+        formatted_files: typing.Optional[typing.Iterable[Dict[str, Any]]] = None,
+    ) -> Iterator[bytes]:
+        yield b"["
+        if formatted_files is None:
+            formatted_files = self._format_files(upload_data.files, inline)
+        for index, formatted_file in enumerate(formatted_files):
+            if index:
+                yield b", "
+            yield json.dumps(formatted_file).encode()
+        yield b"]"
 
     def _get_file_fixers(
         self, upload_data: UploadCollectionResult
@@ -184,10 +435,45 @@ class UploadSender(object):
         return file_fixers
 
     def _get_files(self, upload_data: UploadCollectionResult):
-        return [self._format_file(file) for file in upload_data.files]
+        return list(self._format_files(upload_data.files))
 
-    def _format_file(self, file: UploadCollectionResultFile):
-        format, formatted_content = self._get_format_info(file)
+    def _format_files(
+        self, files: typing.List[UploadCollectionResultFile], inline: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Formats files in their original order.
+
+        With more than one compression worker, files are compressed on a thread
+        pool (zlib releases the GIL). Only a bounded number of files is read
+        ahead, so memory stays proportional to the number of workers.
+        """
+        if inline:
+            # Nothing to compress per file
+            for file in files:
+                yield self._format_file(file, inline)
+            return
+        if self.compression_workers <= 1 or len(files) <= 1:
+            for file in files:
+                yield self._format_file(file)
+            return
+
+        logger.debug(
+            f"Compressing {len(files)} files using {self.compression_workers} workers"
+        )
+        with ThreadPoolExecutor(max_workers=self.compression_workers) as executor:
+            pending = deque()
+            for file in files:
+                pending.append(executor.submit(self._format_file, file))
+                if len(pending) >= 2 * self.compression_workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def _format_file(self, file: UploadCollectionResultFile, inline: bool = False):
+        if inline:
+            format, formatted_content = self._get_inline_format_info(file)
+        else:
+            format, formatted_content = self._get_format_info(file)
         return {
             "filename": file.get_filename(),
             "format": format,
@@ -195,10 +481,45 @@ class UploadSender(object):
             "labels": "",
         }
 
+    def get_encoded_sizes(
+        self, files: typing.List[UploadCollectionResultFile]
+    ) -> Dict[UploadCollectionResultFile, int]:
+        """
+        Returns the size of each file in the payload. Encoding a file is the
+        only way to know it, so the encoded content is kept and used by the
+        payload instead of encoding the file again.
+        """
+        if self.inline_files:
+            # Compressed together with the rest of the payload
+            return {file: file.get_size() for file in files}
+        sizes = {}
+        for file, formatted_file in zip(files, self._format_files(files)):
+            self._encoded_files[file] = (
+                formatted_file["format"],
+                formatted_file["data"],
+            )
+            sizes[file] = len(formatted_file["data"])
+        return sizes
+
     def _get_format_info(self, file: UploadCollectionResultFile):
+        encoded = self._encoded_files.pop(file, None)
+        if encoded is not None:
+            return encoded
+        with file.open_view() as content:
+            return self._encode_content(content)
+
+    def _get_inline_format_info(self, file: UploadCollectionResultFile):
+        with file.open_view() as content:
+            try:
+                return "plain", str(content, "utf-8")
+            except UnicodeDecodeError:
+                # Binary reports can't be inlined in JSON
+                return self._encode_content(content)
+
+    def _encode_content(self, content: typing.Union[bytes, memoryview]):
         format = "base64+compressed"
         formatted_content = (
-            base64.b64encode(zlib.compress((file.get_content())))
+            base64.b64encode(zlib.compress(content, self.compression_level))
         ).decode()
         return format, formatted_content
 
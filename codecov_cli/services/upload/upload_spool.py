@@ -0,0 +1,191 @@
+import json
+import logging
+import os
+import pathlib
+import tempfile
+import time
+import typing
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from sys import exit
+
+from codecov_cli.helpers.request import (
+    SizedPayload,
+    get_retry_policy,
+    get_token_header,
+    send_post_request,
+    send_put_request,
+)
+from codecov_cli.types import RequestError, RequestResult
+
+logger = logging.getLogger("codecovcli")
+
+DEFAULT_SPOOL_PATH = pathlib.Path(".codecov") / "spool"
+DEFAULT_FLUSH_CONCURRENCY = 8
+DEFAULT_FLUSH_BATCH_SIZE = 32
+PAYLOAD_READ_SIZE = 1024 * 1024
+
+
+def should_spool(result: RequestResult) -> bool:
+    """
+    Whether a failed upload might succeed later: the server couldn't be
+    reached, or answered with a status that is worth retrying.
+    """
+    return result.error is not None and (
+        result.status_code == 0
+        or get_retry_policy().should_retry_status(result.status_code)
+    )
+
+
+class SpooledUpload(object):
+    """
+    An upload saved in an `UploadSpool`: the upload request for Codecov and
+    the payload for storage.
+    """
+
+    def __init__(self, metadata_path: pathlib.Path):
+        self.metadata_path = metadata_path
+        self.payload_path = metadata_path.with_suffix(".payload")
+        with open(metadata_path, "r") as f:
+            metadata = json.load(f)
+        self.url: str = metadata["url"]
+        self.data: dict = metadata["data"]
+
+    @property
+    def name(self) -> str:
+        return self.metadata_path.stem
+
+    def read_payload(self) -> typing.Iterator[bytes]:
+        with open(self.payload_path, "rb") as f:
+            while chunk := f.read(PAYLOAD_READ_SIZE):
+                yield chunk
+
+
+class UploadSpool(object):
+    """
+    Folder of uploads that could not be sent, to be sent later with
+    `flush_spool_logic`.
+
+    Each upload is saved as a metadata file and a payload file. The metadata
+    file is written last, so an upload is only listed once it's complete.
+    Tokens are not saved, they are given again when flushing.
+    """
+
+    def __init__(self, path: pathlib.Path = DEFAULT_SPOOL_PATH):
+        self.path = path
+
+    def add(
+        self, url: str, data: dict, payload_chunks: typing.Iterable[bytes]
+    ) -> pathlib.Path:
+        self.path.mkdir(parents=True, exist_ok=True)
+        # Names sort in the order uploads were added
+        name = f"{time.time_ns():020d}-{uuid.uuid4().hex}"
+        metadata_path = self.path / f"{name}.json"
+        self._write_atomically(metadata_path.with_suffix(".payload"), payload_chunks)
+        metadata = {"version": 1, "url": url, "data": data}
+        self._write_atomically(metadata_path, [json.dumps(metadata).encode()])
+        return metadata_path
+
+    def _write_atomically(self, path: pathlib.Path, chunks: typing.Iterable[bytes]):
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def list(self) -> typing.List[SpooledUpload]:
+        uploads = []
+        for metadata_path in sorted(self.path.glob("*.json")):
+            try:
+                uploads.append(SpooledUpload(metadata_path))
+            except (OSError, ValueError, KeyError):
+                logger.warning(f"Ignoring unreadable spooled upload {metadata_path}")
+        return uploads
+
+    def remove(self, upload: SpooledUpload):
+        upload.metadata_path.unlink(missing_ok=True)
+        upload.payload_path.unlink(missing_ok=True)
+
+
+def send_spooled_upload(
+    upload: SpooledUpload, token: typing.Optional[str]
+) -> RequestResult:
+    try:
+        resp_from_codecov = send_post_request(
+            url=upload.url, data=upload.data, headers=get_token_header(token)
+        )
+        if resp_from_codecov.error is not None or upload.data.get("file_not_found"):
+            return resp_from_codecov
+        put_url = json.loads(resp_from_codecov.text)["raw_upload_location"]
+        payload = SizedPayload(upload.read_payload, upload.payload_path.stat().st_size)
+        return send_put_request(put_url, data=payload)
+    except Exception as exp:
+        return RequestResult(
+            error=RequestError(
+                code="Upload Error",
+                params={},
+                description=getattr(exp, "message", str(exp)),
+            ),
+            warnings=[],
+            status_code=0,
+            text="",
+        )
+
+
+def flush_spool_logic(
+    spool_path: pathlib.Path,
+    token: typing.Optional[str],
+    concurrency: int = DEFAULT_FLUSH_CONCURRENCY,
+    batch_size: int = DEFAULT_FLUSH_BATCH_SIZE,
+    fail_on_error: bool = False,
+) -> typing.List[RequestResult]:
+    """
+    Sends the uploads in the spool, oldest first, `concurrency` at a time.
+    Uploads that were sent are removed from the spool.
+
+    Uploads are sent in batches of `batch_size`. If no upload of a batch could
+    be sent for a reason worth retrying, Codecov is most likely still
+    unavailable, and the remaining uploads are left for the next flush.
+    """
+    spool = UploadSpool(spool_path)
+    uploads = spool.list()
+    if not uploads:
+        logger.info(f"No spooled uploads found in {spool_path}")
+        return []
+    logger.info(f"Sending {len(uploads)} spooled upload(s) from {spool_path}")
+
+    def flush(upload: SpooledUpload) -> RequestResult:
+        result = send_spooled_upload(upload, token)
+        if result.error is None:
+            spool.remove(upload)
+            logger.info(f"Spooled upload {upload.name} sent")
+        else:
+            logger.error(
+                f"Spooled upload {upload.name} failed: {result.error.description}"
+            )
+        return result
+
+    results = []
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(uploads))) as executor:
+        for start in range(0, len(uploads), batch_size):
+            batch_results = list(
+                executor.map(flush, uploads[start : start + batch_size])
+            )
+            results.extend(batch_results)
+            if start + batch_size < len(uploads) and all(
+                should_spool(result) for result in batch_results
+            ):
+                logger.warning(
+                    f"Codecov seems unavailable, leaving {len(uploads) - len(results)} spooled upload(s) for later"
+                )
+                break
+
+    sent = sum(1 for result in results if result.error is None)
+    logger.info(f"Sent {sent} of {len(uploads)} spooled upload(s)")
+    if fail_on_error and sent < len(uploads):
+        exit(1)
+    return results
@@ -4,6 +4,7 @@ import typing
 from codecov_cli.helpers.ci_adapters.base import CIAdapterBase
 from codecov_cli.helpers.versioning_systems import VersioningSystemInterface
 from codecov_cli.services.upload import do_upload_logic
+from codecov_cli.services.upload.upload_sender import DEFAULT_PAYLOAD_FORMAT
 from codecov_cli.helpers.upload_type import ReportType
 
 
@@ -15,11 +16,15 @@ def upload_coverage_logic(
     branch: typing.Optional[str],
     build_code: typing.Optional[str],
     build_url: typing.Optional[str],
+    chunked_transfer: bool = False,
     commit_sha: str,
     recurse_submodules: bool,
+    compression_level: typing.Optional[int] = None,
+    compression_workers: int = 1,
     disable_file_fixes: bool,
     disable_search: bool,
     dry_run: bool,
+    dry_run_report: typing.Optional[pathlib.Path] = None,
     enterprise_url: typing.Optional[str],
     env_vars: typing.Dict[str, str],
     fail_on_error: bool,
@@ -27,6 +32,7 @@ def upload_coverage_logic(
     files_search_explicitly_listed_files: typing.List[pathlib.Path],
     files_search_root_folder: pathlib.Path,
     flags: typing.List[str],
+    force: bool = False,
     gcov_args: typing.Optional[str],
     gcov_executable: typing.Optional[str],
     gcov_ignore: typing.Optional[str],
@@ -34,17 +40,22 @@ def upload_coverage_logic(
     git_service: typing.Optional[str],
     handle_no_reports_found: bool,
     job_code: typing.Optional[str],
+    max_payload_size: typing.Optional[int] = None,
     name: typing.Optional[str],
     network_filter: typing.Optional[str],
     network_prefix: typing.Optional[str],
     network_root_folder: pathlib.Path,
     parent_sha: typing.Optional[str],
+    payload_format: str = DEFAULT_PAYLOAD_FORMAT,
     plugin_names: typing.List[str],
     pull_request_number: typing.Optional[str],
     report_code: str,
     slug: typing.Optional[str],
+    spool_dir: typing.Optional[pathlib.Path] = None,
     swift_project: typing.Optional[str],
     token: typing.Optional[str],
+    upload_chunk_size: typing.Optional[int] = None,
+    upload_manifest: typing.Optional[pathlib.Path] = None,
     use_legacy_uploader: bool,
     report_type: ReportType = ReportType.COVERAGE,
     args: dict = None,
@@ -58,11 +69,15 @@ def upload_coverage_logic(
         branch=branch,
         build_code=build_code,
         build_url=build_url,
+        chunked_transfer=chunked_transfer,
         commit_sha=commit_sha,
         recurse_submodules=recurse_submodules,
+        compression_level=compression_level,
+        compression_workers=compression_workers,
         disable_file_fixes=disable_file_fixes,
         disable_search=disable_search,
         dry_run=dry_run,
+        dry_run_report=dry_run_report,
         enterprise_url=enterprise_url,
         env_vars=env_vars,
         fail_on_error=fail_on_error,
@@ -70,6 +85,7 @@ def upload_coverage_logic(
         files_search_explicitly_listed_files=files_search_explicitly_listed_files,
         files_search_root_folder=files_search_root_folder,
         flags=flags,
+        force=force,
         gcov_args=gcov_args,
         gcov_executable=gcov_executable,
         gcov_ignore=gcov_ignore,
@@ -77,17 +93,22 @@ def upload_coverage_logic(
         git_service=git_service,
         handle_no_reports_found=handle_no_reports_found,
         job_code=job_code,
+        max_payload_size=max_payload_size,
         name=name,
         network_filter=network_filter,
         network_prefix=network_prefix,
         network_root_folder=network_root_folder,
         parent_sha=parent_sha,
+        payload_format=payload_format,
         plugin_names=plugin_names,
         pull_request_number=pull_request_number,
         report_code=report_code,
         slug=slug,
+        spool_dir=spool_dir,
         swift_project=swift_project,
         token=token,
+        upload_chunk_size=upload_chunk_size,
+        upload_manifest=upload_manifest,
         use_legacy_uploader=use_legacy_uploader,
         report_type=report_type,
     )
@@ -1,3 +1,7 @@
+import contextlib
+import hashlib
+import mmap
+import os
 import pathlib
 import typing as t
 from dataclasses import dataclass
@@ -20,8 +24,13 @@ class CommandContext(click.Context):
 
 
 class UploadCollectionResultFile(object):
+    # Size of the blocks yielded by `iter_content`
+    READ_BLOCK_SIZE = 1024 * 1024
+
     def __init__(self, path: pathlib.Path):
         self.path = path
+        self._size = None
+        self._sha256 = None
 
     def get_filename(self) -> str:
         return self.path.as_posix()
@@ -30,6 +39,38 @@ class UploadCollectionResultFile(object):
         with open(self.path, "rb") as f:
             return f.read()
 
+    def iter_content(self) -> t.Iterator[bytes]:
+        """Yields the content in blocks, without reading the whole file."""
+        with open(self.path, "rb") as f:
+            yield from iter(lambda: f.read(self.READ_BLOCK_SIZE), b"")
+
+    @contextlib.contextmanager
+    def open_view(self) -> t.Iterator[memoryview]:
+        """
+        Memory-maps the file and yields a read-only view of its content, so
+        it can be consumed without being copied. The view is released on
+        exit, so it can't be used (or sliced) past the `with` block.
+        """
+        with open(self.path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                # Empty files can't be mapped
+                yield memoryview(b"")
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                with memoryview(mapped) as view:
+                    yield view
+
+    def get_size(self) -> int:
+        if self._size is None:
+            self._size = os.path.getsize(self.path)
+        return self._size
+
+    def get_sha256(self) -> str:
+        if self._sha256 is None:
+            with self.open_view() as content:
+                self._sha256 = hashlib.sha256(content).hexdigest()
+        return self._sha256
+
     def __repr__(self) -> str:
         return str(self.path)
 
@@ -60,6 +101,14 @@ class UploadCollectionResult(object):
     file_fixes: t.List[UploadCollectionResultFileFixer]
 
 
+@dataclass
+class UploadSpec(object):
+    __slots__ = ["name", "flags", "files"]
+    name: t.Optional[str]
+    flags: t.List[str]
+    files: t.List[pathlib.Path]
+
+
 class PreparationPluginInterface(object):
     def run_preparation(self) -> None:
         pass
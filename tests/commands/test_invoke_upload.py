@@ -1,9 +1,11 @@
+from pathlib import Path
+
 from click.testing import CliRunner
 
 from codecov_cli.fallbacks import FallbackFieldEnum
 from codecov_cli.main import cli
 from codecov_cli.services.upload import UploadCollector, UploadSender
-from codecov_cli.types import RequestError, RequestResult
+from codecov_cli.types import RequestError, RequestResult, UploadSpec
 from tests.factory import FakeProvider, FakeVersioningSystem
 from tests.test_helpers import parse_outstreams_into_log_lines
 
@@ -44,3 +46,50 @@ def test_upload_raise_Z_option(mocker):
         result.output
     )
     assert str(result) == "<Result SystemExit(1)>"
+
+
+def test_upload_with_upload_specs(mocker):
+    mocked_multi_upload = mocker.patch(
+        "codecov_cli.commands.upload.do_multi_upload_logic"
+    )
+    mocked_upload = mocker.patch("codecov_cli.commands.upload.do_upload_logic")
+    fake_ci_provider = FakeProvider({FallbackFieldEnum.commit_sha: None})
+    mocker.patch("codecov_cli.main.get_ci_adapter", return_value=fake_ci_provider)
+
+    runner = CliRunner()
+    result = runner.invoke(
+        cli,
+        [
+            "do-upload",
+            "-C",
+            "sha",
+            "--upload-spec",
+            "name=unit;flags=unit,py;files=unit.xml,unit-2.xml",
+            "--upload-spec",
+            "flag=e2e",
+        ],
+        obj={},
+    )
+    assert result.exit_code == 0
+    mocked_upload.assert_not_called()
+    assert mocked_multi_upload.call_args[1]["upload_specs"] == [
+        UploadSpec(
+            name="unit",
+            flags=["unit", "py"],
+            files=[Path("unit.xml"), Path("unit-2.xml")],
+        ),
+        UploadSpec(name=None, flags=["e2e"], files=[]),
+    ]
+    assert mocked_multi_upload.call_args[1]["commit_sha"] == "sha"
+
+
+def test_upload_with_invalid_upload_spec(mocker):
+    fake_ci_provider = FakeProvider({FallbackFieldEnum.commit_sha: None})
+    mocker.patch("codecov_cli.main.get_ci_adapter", return_value=fake_ci_provider)
+
+    runner = CliRunner()
+    result = runner.invoke(
+        cli, ["do-upload", "-C", "sha", "--upload-spec", "labels=x"], obj={}
+    )
+    assert result.exit_code != 0
+    assert "Unknown key 'labels' in 'labels=x'" in result.output
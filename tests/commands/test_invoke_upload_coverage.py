@@ -115,6 +115,9 @@ def test_upload_coverage_options(mocker):
             "                                  Multiple flags allowed.",
             "  --plugin TEXT",
             "  -d, --dry-run                   Don't upload files to Codecov",
+            "  --dry-run-report FILE           With --dry-run, write a JSON report with the",
+            "                                  time spent in each stage and the size of each",
+            "                                  part of the payload to this file",
             "  --legacy, --use-legacy-uploader",
             "                                  Use the legacy upload endpoint",
             "  --handle-no-reports-found       Raise no exceptions when no coverage reports",
@@ -136,6 +139,41 @@ def test_upload_coverage_options(mocker):
             "  --gcov-include TEXT             Paths to include during gcov gathering",
             "  --gcov-executable TEXT          gcov executable to run. Defaults to 'gcov'",
             "  --swift-project TEXT            Specify the swift project",
+            "  --compression-workers INTEGER RANGE",
+            "                                  Number of threads used to compress report",
+            "                                  files before uploading  [default: 1; x>=1]",
+            "  --compression-level INTEGER RANGE",
+            "                                  zlib compression level (0-9) used for report",
+            "                                  files. Defaults to zlib's default level",
+            "                                  [0<=x<=9]",
+            "  --payload-format [base64+compressed|gzip|zstd]",
+            "                                  Format of the payload sent to storage. gzip",
+            "                                  and zstd compress the whole payload as a",
+            "                                  single stream, and are only used if Codecov",
+            "                                  accepts them  [default: base64+compressed]",
+            "  --force                         Upload report files even if the upload",
+            "                                  manifest lists files with identical content as",
+            "                                  already uploaded",
+            "  --max-payload-size INTEGER RANGE",
+            "                                  Split the upload into several uploads of at",
+            "                                  most this many MB (of compressed report files)",
+            "                                  each  [x>=1]",
+            "  --spool-dir DIRECTORY           If the upload can't be sent because Codecov is",
+            "                                  unavailable, save it in this folder instead of",
+            "                                  failing. Send saved uploads later with the",
+            "                                  flush-spool command",
+            "  --upload-manifest FILE          Record the content hashes of the uploaded",
+            "                                  report files in this file, and skip report",
+            "                                  files with identical content already uploaded",
+            "                                  for the same commit and report code",
+            "  --upload-chunk-size INTEGER RANGE",
+            "                                  Send the upload to storage in parts of this",
+            "                                  many MB, concurrently and resumable, if",
+            "                                  Codecov accepts it  [x>=5]",
+            "  --chunked-transfer              Stream the upload to storage with chunked",
+            "                                  transfer encoding instead of sending its size",
+            "                                  first. Uses less memory and disk, but some",
+            "                                  storage services reject it",
             "  --parent-sha TEXT               SHA (with 40 chars) of what should be the",
             "                                  parent of this commit",
             "  -h, --help                      Show this message and exit.",
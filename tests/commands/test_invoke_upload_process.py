@@ -1,10 +1,14 @@
+import threading
 from unittest.mock import patch
 
+import click
+import pytest
 from click.testing import CliRunner
 
 from codecov_cli.fallbacks import FallbackFieldEnum
 from codecov_cli.main import cli
-from codecov_cli.types import RequestError, RequestResult
+from codecov_cli.services.upload import UploadCollector, UploadSender
+from codecov_cli.types import RequestError, RequestResult, UploadCollectionResult
 from tests.factory import FakeProvider, FakeVersioningSystem
 
 
@@ -55,6 +59,126 @@ def test_upload_process_raise_Z_option(mocker, use_verbose_option):
     assert str(result) == "<Result SystemExit(1)>"
 
 
+def test_upload_process_creates_commit_while_collecting(mocker):
+    events = []
+    collecting = threading.Event()
+    ok_result = RequestResult(error=None, warnings=[], status_code=200, text="")
+
+    def send_commit_data(**kwargs):
+        # Only finishes once the reports are being collected
+        assert collecting.wait(5)
+        events.append("commit")
+        return ok_result
+
+    def generate_upload_data(*args):
+        collecting.set()
+        events.append("collect")
+        return UploadCollectionResult(network=[], files=[], file_fixes=[])
+
+    def send_upload_data(**kwargs):
+        events.append("send")
+        return ok_result
+
+    mocker.patch(
+        "codecov_cli.services.commit.send_commit_data", side_effect=send_commit_data
+    )
+    mocker.patch(
+        "codecov_cli.services.report.send_create_report_request",
+        side_effect=lambda *args: events.append("report") or ok_result,
+    )
+    mocker.patch.object(
+        UploadCollector, "generate_upload_data", side_effect=generate_upload_data
+    )
+    mocker.patch.object(UploadSender, "send_upload_data", side_effect=send_upload_data)
+    mocker.patch("codecov_cli.services.upload.select_preparation_plugins")
+    fake_ci_provider = FakeProvider({FallbackFieldEnum.commit_sha: None})
+    mocker.patch("codecov_cli.main.get_ci_adapter", return_value=fake_ci_provider)
+
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        result = runner.invoke(
+            cli,
+            ["upload-process", "-C", "command-sha", "--slug", "owner/repo"],
+            obj={},
+        )
+    assert result.exit_code == 0, result.output
+    assert events == ["collect", "commit", "report", "send"]
+
+
+@pytest.mark.parametrize(
+    "status_code,description", [(401, "Unauthorized"), (503, "Service Unavailable")]
+)
+def test_upload_process_commit_error_exits_after_collection(
+    mocker, status_code, description
+):
+    error_result = RequestResult(
+        error=RequestError(code=status_code, params={}, description=description),
+        warnings=[],
+        status_code=status_code,
+        text=description,
+    )
+    mocker.patch(
+        "codecov_cli.services.commit.send_commit_data", return_value=error_result
+    )
+    mock_create_report = mocker.patch(
+        "codecov_cli.services.report.send_create_report_request"
+    )
+    mocker.patch.object(
+        UploadCollector,
+        "generate_upload_data",
+        return_value=UploadCollectionResult(network=[], files=[], file_fixes=[]),
+    )
+    mock_send_upload_data = mocker.patch.object(UploadSender, "send_upload_data")
+    mocker.patch("codecov_cli.services.upload.select_preparation_plugins")
+    fake_ci_provider = FakeProvider({FallbackFieldEnum.commit_sha: None})
+    mocker.patch("codecov_cli.main.get_ci_adapter", return_value=fake_ci_provider)
+
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        result = runner.invoke(
+            cli,
+            ["upload-process", "-C", "command-sha", "--slug", "owner/repo"],
+            obj={},
+        )
+    # Exits even without --fail-on-error, the reports can't be sent without
+    # their commit
+    assert str(result) == "<Result SystemExit(1)>"
+    assert f"Commit creating failed: {description}" in result.output
+    mock_create_report.assert_not_called()
+    mock_send_upload_data.assert_not_called()
+
+
+def test_upload_process_commit_error_takes_precedence(mocker):
+    error_result = RequestResult(
+        error=RequestError(code=401, params={}, description="Unauthorized"),
+        warnings=[],
+        status_code=401,
+        text="Unauthorized",
+    )
+    mocker.patch(
+        "codecov_cli.services.commit.send_commit_data", return_value=error_result
+    )
+    # The upload fails before waiting for the commit
+    mocker.patch.object(
+        UploadCollector,
+        "generate_upload_data",
+        side_effect=click.ClickException("No coverage reports found."),
+    )
+    mocker.patch("codecov_cli.services.upload.select_preparation_plugins")
+    fake_ci_provider = FakeProvider({FallbackFieldEnum.commit_sha: None})
+    mocker.patch("codecov_cli.main.get_ci_adapter", return_value=fake_ci_provider)
+
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        result = runner.invoke(
+            cli,
+            ["upload-process", "-C", "command-sha", "--slug", "owner/repo"],
+            obj={},
+        )
+    assert str(result) == "<Result SystemExit(1)>"
+    assert "Commit creating failed: Unauthorized" in result.output
+
+
 def test_upload_process_options(mocker):
     runner = CliRunner()
     fake_ci_provider = FakeProvider({FallbackFieldEnum.commit_sha: None})
@@ -115,6 +239,9 @@ def test_upload_process_options(mocker):
             "                                  Multiple flags allowed.",
             "  --plugin TEXT",
             "  -d, --dry-run                   Don't upload files to Codecov",
+            "  --dry-run-report FILE           With --dry-run, write a JSON report with the",
+            "                                  time spent in each stage and the size of each",
+            "                                  part of the payload to this file",
             "  --legacy, --use-legacy-uploader",
             "                                  Use the legacy upload endpoint",
             "  --handle-no-reports-found       Raise no exceptions when no coverage reports",
@@ -136,6 +263,47 @@ def test_upload_process_options(mocker):
             "  --gcov-include TEXT             Paths to include during gcov gathering",
             "  --gcov-executable TEXT          gcov executable to run. Defaults to 'gcov'",
             "  --swift-project TEXT            Specify the swift project",
+            "  --compression-workers INTEGER RANGE",
+            "                                  Number of threads used to compress report",
+            "                                  files before uploading  [default: 1; x>=1]",
+            "  --compression-level INTEGER RANGE",
+            "                                  zlib compression level (0-9) used for report",
+            "                                  files. Defaults to zlib's default level",
+            "                                  [0<=x<=9]",
+            "  --payload-format [base64+compressed|gzip|zstd]",
+            "                                  Format of the payload sent to storage. gzip",
+            "                                  and zstd compress the whole payload as a",
+            "                                  single stream, and are only used if Codecov",
+            "                                  accepts them  [default: base64+compressed]",
+            "  --force                         Upload report files even if the upload",
+            "                                  manifest lists files with identical content as",
+            "                                  already uploaded",
+            "  --max-payload-size INTEGER RANGE",
+            "                                  Split the upload into several uploads of at",
+            "                                  most this many MB (of compressed report files)",
+            "                                  each  [x>=1]",
+            "  --spool-dir DIRECTORY           If the upload can't be sent because Codecov is",
+            "                                  unavailable, save it in this folder instead of",
+            "                                  failing. Send saved uploads later with the",
+            "                                  flush-spool command",
+            "  --upload-manifest FILE          Record the content hashes of the uploaded",
+            "                                  report files in this file, and skip report",
+            "                                  files with identical content already uploaded",
+            "                                  for the same commit and report code",
+            "  --upload-chunk-size INTEGER RANGE",
+            "                                  Send the upload to storage in parts of this",
+            "                                  many MB, concurrently and resumable, if",
+            "                                  Codecov accepts it  [x>=5]",
+            "  --chunked-transfer              Stream the upload to storage with chunked",
+            "                                  transfer encoding instead of sending its size",
+            "                                  first. Uses less memory and disk, but some",
+            "                                  storage services reject it",
+            "  --upload-spec TEXT              Make one upload per spec, concurrently,",
+            "                                  instead of a single upload. A spec looks like",
+            "                                  'name=unit;flags=unit,py;files=a.xml,b.xml'. A",
+            "                                  spec's flags and name replace --flag and",
+            "                                  --name. A spec with files only uploads those",
+            "                                  files. Multiple specs allowed.",
             "  --parent-sha TEXT               SHA (with 40 chars) of what should be the",
             "                                  parent of this commit",
             "  -h, --help                      Show this message and exit.",
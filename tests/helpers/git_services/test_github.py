@@ -72,3 +72,12 @@ def test_get_pull_request_404(mocker):
     slug = "codecov/codecov-cli"
     response = Github().get_pull_request(slug, 1)
     assert response is None
+
+
+def test_get_pull_request_timeout(mocker):
+    mock_get = mocker.patch.object(
+        requests, "get", side_effect=requests.exceptions.ConnectTimeout()
+    )
+    response = Github().get_pull_request("codecov/codecov-cli", 1)
+    assert response is None
+    assert mock_get.call_args.kwargs["timeout"] == (10, 60)
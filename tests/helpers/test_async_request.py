@@ -0,0 +1,151 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from codecov_cli import __version__
+from codecov_cli.helpers import request_metrics
+from codecov_cli.helpers.async_request import async_client, send_with_retries
+
+
+def mock_client(handler):
+    return async_client(transport=httpx.MockTransport(handler))
+
+
+@pytest.fixture
+def mock_sleep(mocker):
+    return mocker.patch("codecov_cli.helpers.async_request.asyncio.sleep")
+
+
+@pytest.mark.asyncio
+async def test_async_client_defaults():
+    def handler(request):
+        assert request.headers["User-Agent"] == f"codecov-cli/{__version__}"
+        assert request.headers["Authorization"] == "token abc"
+        assert json.loads(request.content) == {"some": "data"}
+        return httpx.Response(201, text="created")
+
+    async with mock_client(handler) as client:
+        resp = await send_with_retries(
+            client,
+            "POST",
+            "https://codecov.io/endpoint",
+            json={"some": "data"},
+            headers={"Authorization": "token abc"},
+        )
+    assert resp.status_code == 201
+    assert resp.text == "created"
+
+
+@pytest.mark.asyncio
+async def test_send_with_retries_error_status():
+    async with mock_client(lambda request: httpx.Response(404, text="nope")) as client:
+        resp = await send_with_retries(client, "GET", "https://codecov.io/endpoint")
+    assert resp.status_code == 404
+    assert resp.text == "nope"
+
+
+@pytest.mark.asyncio
+async def test_send_with_retries(mocker, mock_sleep):
+    mocker.patch("codecov_cli.helpers.retry.random.uniform", return_value=1)
+    responses = [
+        httpx.ConnectError("refused"),
+        httpx.Response(429, headers={"Retry-After": "5"}),
+        httpx.Response(200, text="ok"),
+    ]
+
+    def handler(request):
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    async with mock_client(handler) as client:
+        resp = await send_with_retries(client, "GET", "https://codecov.io")
+    assert resp.text == "ok"
+    assert mock_sleep.call_args_list == [mocker.call(1), mocker.call(5)]
+
+
+@pytest.mark.asyncio
+async def test_send_with_retries_runs_out(mock_sleep):
+    requests_made = []
+
+    def handler(request):
+        requests_made.append(request)
+        return httpx.Response(503)
+
+    async with mock_client(handler) as client:
+        resp = await send_with_retries(client, "PUT", "https://codecov.io", data={})
+    assert resp.status_code == 503
+    assert len(requests_made) == 3
+
+
+@pytest.mark.asyncio
+async def test_send_with_retries_post_read_timeout(mock_sleep):
+    requests_made = []
+
+    def handler(request):
+        requests_made.append(request)
+        raise httpx.ReadTimeout("timed out", request=request)
+
+    async with mock_client(handler) as client:
+        with pytest.raises(httpx.ReadTimeout):
+            await send_with_retries(client, "POST", "https://codecov.io")
+    # The server might have processed the POST already
+    assert len(requests_made) == 1
+    mock_sleep.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_requests_are_sent_concurrently():
+    in_flight = 0
+    max_in_flight = 0
+
+    async def handler(request):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200)
+
+    async with mock_client(handler) as client:
+        results = await asyncio.gather(
+            *(
+                send_with_retries(client, "GET", f"https://codecov.io/{i}")
+                for i in range(3)
+            )
+        )
+    assert [result.status_code for result in results] == [200, 200, 200]
+    assert max_in_flight == 3
+
+
+@pytest.mark.asyncio
+async def test_streamed_request_is_measured():
+    request_metrics.configure_request_metrics(True)
+
+    async def body():
+        yield b"abc"
+        yield b"defg"
+
+    class DiscardingTransport(httpx.AsyncBaseTransport):
+        # Like a real transport, the body is sent without being kept
+        async def handle_async_request(self, request):
+            async for _ in request.stream:
+                pass
+            return httpx.Response(200)
+
+    try:
+        async with async_client(transport=DiscardingTransport()) as client:
+            resp = await send_with_retries(
+                client, "PUT", "https://codecov.io/file", content=body()
+            )
+        assert resp.status_code == 200
+        endpoint = request_metrics.get_request_metrics().as_dict()["endpoints"][
+            "PUT codecov.io/file"
+        ]
+        # The streamed body isn't kept, so its size is unknown
+        assert endpoint["bytes_sent"] == 0
+    finally:
+        request_metrics.configure_request_metrics(False)
@@ -0,0 +1,45 @@
+import gzip
+
+import pytest
+
+from codecov_cli.helpers import compression
+from codecov_cli.helpers.compression import (
+    compress_chunks,
+    get_stream_compressor,
+    is_zstd_available,
+)
+
+
+def test_compress_chunks_gzip():
+    chunks = [b'{"a": ', b'"' + b"x" * 10000 + b'"', b"}"]
+    compressed = b"".join(compress_chunks(iter(chunks), "gzip"))
+    assert gzip.decompress(compressed) == b"".join(chunks)
+    assert len(compressed) < 100
+
+
+def test_compress_chunks_logs_ratio(mocker):
+    mock_log_debug = mocker.patch.object(compression.logger, "debug")
+    compressed = b"".join(compress_chunks([b"a" * 1000], "gzip", level=9))
+    mock_log_debug.assert_called_once()
+    assert mock_log_debug.call_args[0][0] == "Compressed payload with gzip"
+    log_attributes = mock_log_debug.call_args[1]["extra"]["extra_log_attributes"]
+    assert log_attributes["raw_bytes"] == 1000
+    assert log_attributes["compressed_bytes"] == len(compressed)
+    assert log_attributes["ratio"] == round(1000 / len(compressed), 2)
+    assert "compression_seconds" in log_attributes
+
+
+def test_compress_chunks_empty():
+    assert gzip.decompress(b"".join(compress_chunks([], "gzip"))) == b""
+
+
+def test_zstd_not_available(mocker):
+    mocker.patch.object(compression, "_import_zstd", return_value=None)
+    assert not is_zstd_available()
+    with pytest.raises(ValueError, match="zstd compression is not available"):
+        get_stream_compressor("zstd")
+
+
+def test_invalid_compression():
+    with pytest.raises(ValueError, match="Invalid compression: brotli"):
+        get_stream_compressor("brotli")
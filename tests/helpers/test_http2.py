@@ -0,0 +1,149 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+import requests
+
+from codecov_cli.helpers import request
+from codecov_cli.helpers.http2 import HTTP2Adapter, is_http2_available
+from codecov_cli.helpers.request import StreamingPayload, configure_session
+
+
+@pytest.fixture
+def server():
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            if self.headers.get("Transfer-Encoding") == "chunked":
+                body = b""
+                while size := int(self.rfile.readline(), 16):
+                    body += self.rfile.read(size)
+                    self.rfile.readline()
+                self.rfile.readline()
+            else:
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+            if self.path == "/slow":
+                time.sleep(0.5)
+            content = json.dumps(
+                {"body": body.decode(), "user_agent": self.headers["User-Agent"]}
+            ).encode()
+            try:
+                self.send_response(201)
+                self.send_header("Content-Length", str(len(content)))
+                self.send_header("ETag", "abc")
+                self.end_headers()
+                self.wfile.write(content)
+            except OSError:
+                pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def session(mocker):
+    if not is_http2_available():
+        # Without h2 the client can't be created with HTTP/2 enabled. The
+        # local server only speaks HTTP/1.1 either way.
+        client_class = httpx.Client
+        mocker.patch(
+            "codecov_cli.helpers.http2.httpx.Client",
+            side_effect=lambda **kwargs: client_class(**{**kwargs, "http2": False}),
+        )
+    session = requests.Session()
+    session.mount("http://", HTTP2Adapter(pool_size=2))
+    yield session
+    session.close()
+
+
+def test_http2_adapter(server, session):
+    resp = session.post(server, json={"some": "data"}, headers={"User-Agent": "me"})
+    assert resp.status_code == 201
+    assert resp.headers["etag"] == "abc"
+    assert resp.json() == {"body": '{"some": "data"}', "user_agent": "me"}
+    # No TLS, so HTTP/2 can't be negotiated
+    assert resp.http_version == "HTTP/1.1"
+
+
+def test_http2_adapter_streaming_body(server, session):
+    payload = StreamingPayload(lambda: iter([b"first ", b"second"]))
+    resp = session.post(server, data=payload)
+    assert resp.json()["body"] == "first second"
+
+
+def test_http2_adapter_errors(server, session):
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        session.post(f"{server}/slow", data=b"", timeout=(1, 0.1))
+    with pytest.raises(requests.exceptions.ConnectionError):
+        session.post("http://127.0.0.1:1", data=b"")
+
+
+def test_http2_adapter_ssl_and_proxy_settings(mocker):
+    mock_client = mocker.patch("codecov_cli.helpers.http2.httpx.Client")
+    mock_client.return_value.request.return_value = httpx.Response(
+        200, request=httpx.Request("GET", "https://codecov.io")
+    )
+    adapter = HTTP2Adapter(pool_size=2)
+    session = requests.Session()
+    session.trust_env = False
+    session.mount("https://", adapter)
+
+    session.get("https://codecov.io")
+    session.get(
+        "https://codecov.io",
+        verify="/path/to/ca.pem",
+        cert=("/path/to/cert.pem", "/path/to/key.pem"),
+        proxies={"https": "http://proxy:3128"},
+    )
+    session.get("https://codecov.io")
+
+    # One client per combination of settings, reused by later requests
+    assert mock_client.call_count == 2
+    first, second = [call.kwargs for call in mock_client.call_args_list]
+    assert (first["verify"], first["cert"], first["proxy"]) == (True, None, None)
+    assert second["verify"] == "/path/to/ca.pem"
+    assert second["cert"] == ("/path/to/cert.pem", "/path/to/key.pem")
+    assert second["proxy"] == "http://proxy:3128"
+    assert not second["trust_env"]
+
+    adapter.close()
+    assert mock_client.return_value.close.call_count == 2
+
+
+def test_configure_session_http2(mocker):
+    mocker.patch("codecov_cli.helpers.request.is_http2_available", return_value=True)
+    mock_adapter = mocker.patch("codecov_cli.helpers.request.HTTP2Adapter")
+    try:
+        configure_session(pool_size=4, http2=True)
+        session = request.get_session()
+        assert session.get_adapter("https://codecov.io") is mock_adapter.return_value
+        assert session.get_adapter("http://localhost") is not mock_adapter.return_value
+        mock_adapter.assert_called_with(4)
+        assert request.is_http2_enabled()
+    finally:
+        configure_session()
+
+
+def test_configure_session_http2_unavailable(mocker):
+    mocker.patch("codecov_cli.helpers.request.is_http2_available", return_value=False)
+    mock_warning = mocker.patch.object(request.logger, "warning")
+    try:
+        configure_session(http2=True)
+        assert not request.is_http2_enabled()
+        assert not isinstance(
+            request.get_session().get_adapter("https://codecov.io"), HTTP2Adapter
+        )
+        assert "Using HTTP/1.1" in mock_warning.call_args.args[0]
+    finally:
+        configure_session()
@@ -6,7 +6,7 @@ from responses import matchers
 
 from codecov_cli import __version__ as codecov_cli_version
 from codecov_cli.services.upload.legacy_upload_sender import LegacyUploadSender
-from codecov_cli.types import UploadCollectionResult
+from codecov_cli.types import UploadCollectionResult, UploadCollectionResultFile
 from tests.data import reports_examples
 
 upload_collection = UploadCollectionResult(["1", "apple.py", "3"], [], [])
@@ -177,6 +177,61 @@ class TestUploadSender(object):
         assert "HTTP Error 400" in sender.error.code
         assert "Invalid request parameters" in sender.error.description
 
+    def test_upload_sender_streams_payload(
+        self,
+        mocker,
+        tmp_path,
+        mocked_responses,
+        mocked_legacy_upload_endpoint,
+        mocked_storage_server,
+    ):
+        mocker.patch.object(UploadCollectionResultFile, "READ_BLOCK_SIZE", 10)
+        path = tmp_path / "coverage.xml"
+        path.write_bytes(b"<coverage>" * 10)
+        upload_data = UploadCollectionResult(
+            ["apple.py"], [UploadCollectionResultFile(path)], []
+        )
+        sending_result = LegacyUploadSender(chunked_transfer=True).send_upload_data(
+            upload_data, random_sha, random_token, {"A": "b"}, **named_upload_data
+        )
+        assert sending_result.error is None
+
+        put_req_made = mocked_responses.calls[1].request
+        assert put_req_made.headers["Transfer-Encoding"] == "chunked"
+        chunks = list(put_req_made.body)
+        assert b"".join(chunks) == (
+            b"A=b\n<<<<<< ENV\napple.py\n<<<<<< network\n"
+            + b"# path="
+            + path.as_posix().encode()
+            + b"\n"
+            + b"<coverage>" * 10
+            + b"\n<<<<<< EOF\n"
+        )
+        assert chunks.count(b"<coverage>") == 10
+
+    def test_upload_sender_sends_payload_size(
+        self,
+        tmp_path,
+        mocked_responses,
+        mocked_legacy_upload_endpoint,
+        mocked_storage_server,
+    ):
+        path = tmp_path / "coverage.xml"
+        path.write_bytes(b"<coverage>" * 10)
+        upload_data = UploadCollectionResult(
+            ["apple.py"], [UploadCollectionResultFile(path)], []
+        )
+        sending_result = LegacyUploadSender().send_upload_data(
+            upload_data, random_sha, random_token, {"A": "b"}, **named_upload_data
+        )
+        assert sending_result.error is None
+
+        put_req_made = mocked_responses.calls[1].request
+        body = b"".join(put_req_made.body)
+        assert body.endswith(b"<coverage>" * 10 + b"\n<<<<<< EOF\n")
+        assert "Transfer-Encoding" not in put_req_made.headers
+        assert put_req_made.headers["Content-Length"] == str(len(body))
+
 
 class TestPayloadGeneration(object):
     def test_generate_env_vars_section(self):
@@ -270,8 +325,8 @@ class TestPayloadGeneration(object):
         fake_result_file.get_filename.return_value = (
             coverage_file_seperated[0][len(b"# path=") :].strip().decode()
         )
-        fake_result_file.get_content.return_value = coverage_file_seperated[1][
-            : -len(b"\n<<<<<< EOF\n")
+        fake_result_file.iter_content.return_value = [
+            coverage_file_seperated[1][: -len(b"\n<<<<<< EOF\n")]
         ]
         actual_coverage_file_section = LegacyUploadSender()._format_coverage_file(
             fake_result_file
@@ -284,8 +339,8 @@ class TestPayloadGeneration(object):
 
     def test_generate_coverage_files_section(self, mocker):
         mocker.patch(
-            "codecov_cli.services.upload.LegacyUploadSender._format_coverage_file",
-            side_effect=lambda file_bytes: file_bytes,
+            "codecov_cli.services.upload.LegacyUploadSender._generate_coverage_file_chunks",
+            side_effect=lambda file_bytes: [file_bytes],
         )
 
         coverage_files = [
@@ -313,8 +368,8 @@ class TestPayloadGeneration(object):
             return_value=reports_examples.network_section,
         )
         mocker.patch(
-            "codecov_cli.services.upload.LegacyUploadSender._generate_coverage_files_section",
-            return_value=reports_examples.coverage_file_section_simple,
+            "codecov_cli.services.upload.LegacyUploadSender._generate_coverage_files_chunks",
+            return_value=[reports_examples.coverage_file_section_simple],
         )
 
         actual_report = LegacyUploadSender()._generate_payload(None, None)
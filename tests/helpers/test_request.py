@@ -1,4 +1,7 @@
+import threading
+import time
 import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 import pytest
 import requests
@@ -6,7 +9,10 @@ from requests import Response
 
 from codecov_cli import __version__
 from codecov_cli.helpers.request import (
+    configure_retry_policy,
+    configure_session,
     get,
+    get_session,
     get_token_header,
     get_token_header_or_fail,
     log_warnings_and_errors_if_any,
@@ -15,9 +21,12 @@ from codecov_cli.helpers.request import logger as req_log
 from codecov_cli.helpers.request import (
     patch,
     request_result,
+    send_get_request,
     send_post_request,
     send_put_request,
 )
+from codecov_cli.helpers.retry import RetryPolicy
+from codecov_cli.helpers.timeouts import RequestTimeouts, configure_timeouts
 from codecov_cli.types import RequestError, RequestResult
 
 
@@ -123,7 +132,7 @@ def test_request_retry(mocker, valid_response):
     expected_response = request_result(valid_response)
     mock_sleep = mocker.patch("codecov_cli.helpers.request.sleep")
     mocker.patch.object(
-        requests,
+        requests.Session,
         "post",
         side_effect=[
             requests.exceptions.ConnectionError(),
@@ -139,7 +148,7 @@ def test_request_retry(mocker, valid_response):
 def test_request_retry_too_many_errors(mocker):
     _ = mocker.patch("codecov_cli.helpers.request.sleep")
     mocker.patch.object(
-        requests,
+        requests.Session,
         "post",
         side_effect=[
             requests.exceptions.ConnectionError(),
@@ -154,35 +163,206 @@ def test_request_retry_too_many_errors(mocker):
     assert str(exp.value) == "Request failed after too many retries. URL: my_url"
 
 
+def test_request_retry_honors_retry_after(mocker, valid_response):
+    mock_sleep = mocker.patch("codecov_cli.helpers.request.sleep")
+    too_many_requests = Response()
+    too_many_requests.status_code = 429
+    too_many_requests.headers["Retry-After"] = "20"
+    mocker.patch.object(
+        requests.Session,
+        "get",
+        side_effect=[too_many_requests, valid_response],
+    )
+    resp = send_get_request("my_url")
+    assert resp == request_result(valid_response)
+    mock_sleep.assert_called_once_with(20)
+
+
+def test_request_retry_read_timeout_by_method(mocker, valid_response):
+    mocker.patch("codecov_cli.helpers.request.sleep")
+    mocker.patch.object(
+        requests.Session,
+        "post",
+        side_effect=[requests.exceptions.ReadTimeout(), valid_response],
+    )
+    # The server might have processed the POST already
+    resp = send_post_request("my_url")
+    assert resp.error.code == "Timeout"
+    assert requests.Session.post.call_count == 1
+
+    mocker.patch.object(
+        requests.Session,
+        "put",
+        side_effect=[requests.exceptions.ReadTimeout(), valid_response],
+    )
+    assert send_put_request("my_url") == request_result(valid_response)
+
+
+def test_request_retry_configured_policy(mocker):
+    mock_sleep = mocker.patch("codecov_cli.helpers.request.sleep")
+    mock_post = mocker.patch.object(
+        requests.Session,
+        "post",
+        side_effect=requests.exceptions.ConnectionError(),
+    )
+    configure_retry_policy(RetryPolicy(max_attempts=5))
+    try:
+        with pytest.raises(Exception, match="too many retries"):
+            send_post_request("my_url")
+    finally:
+        configure_retry_policy(RetryPolicy())
+    assert mock_post.call_count == 5
+    assert mock_sleep.call_count == 4
+
+
 def test_user_agent(mocker):
     def mock_request(*args, headers={}, **kwargs):
         assert headers["User-Agent"] == f"codecov-cli/{__version__}"
         return RequestResult(status_code=200, error=None, warnings=[], text="")
 
     mocker.patch.object(
-        requests,
+        requests.Session,
         "post",
         side_effect=mock_request,
     )
     send_post_request("my_url")
 
     mocker.patch.object(
-        requests,
+        requests.Session,
         "get",
         side_effect=mock_request,
     )
     get("my_url")
 
     mocker.patch.object(
-        requests,
+        requests.Session,
         "put",
         side_effect=mock_request,
     )
     send_put_request("my_url")
 
     mocker.patch.object(
-        requests,
+        requests.Session,
         "patch",
         side_effect=mock_request,
     )
     patch("my_url")
+
+
+class TestSession(object):
+    @pytest.fixture(autouse=True)
+    def reset_session(self):
+        configure_session()
+        yield
+        configure_session()
+
+    @pytest.fixture
+    def keep_alive_server(self):
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"ok")
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        thread = threading.Thread(
+            target=server.serve_forever, args=(0.05,), daemon=True
+        )
+        thread.start()
+        yield f"http://127.0.0.1:{server.server_port}"
+        server.shutdown()
+        server.server_close()
+
+    def test_session_is_shared(self):
+        session = get_session()
+        assert get_session() is session
+        assert session.get_adapter("https://codecov.io")._pool_maxsize == 10
+
+        configure_session(pool_size=3)
+        assert get_session() is not session
+        assert get_session().get_adapter("https://codecov.io")._pool_maxsize == 3
+
+    def test_connection_is_reused(self, mocker, keep_alive_server):
+        mock_log_debug = mocker.patch.object(req_log, "debug")
+        assert get(keep_alive_server).text == "ok"
+        assert get(keep_alive_server).text == "ok"
+        assert [call.args[0] for call in mock_log_debug.call_args_list] == [
+            "Opened new connection to 127.0.0.1",
+            "Reused connection to 127.0.0.1",
+        ]
+
+
+class TestTimeouts(object):
+    @pytest.fixture(autouse=True)
+    def reset_timeouts(self):
+        yield
+        configure_timeouts(RequestTimeouts())
+
+    @pytest.fixture
+    def slow_server(self):
+        received = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def respond(self):
+                received.append(self.command)
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                time.sleep(0.5)
+                try:
+                    self.send_response(200)
+                    self.end_headers()
+                    self.wfile.write(b"ok")
+                except OSError:
+                    # The client gave up already
+                    pass
+
+            do_GET = do_POST = respond
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        thread = threading.Thread(
+            target=server.serve_forever, args=(0.05,), daemon=True
+        )
+        thread.start()
+        yield f"http://127.0.0.1:{server.server_port}", received
+        server.shutdown()
+        server.server_close()
+
+    def test_read_timeout(self, slow_server):
+        url, received = slow_server
+        configure_timeouts(RequestTimeouts(read=0.1))
+        resp = send_post_request(url, data={"some": "data"})
+        assert resp.error.code == "Timeout"
+        assert resp.error.description.startswith(f"Request to {url} timed out")
+        # The POST isn't sent again, it may have been processed
+        assert received == ["POST"]
+
+    def test_command_deadline(self, mocker, slow_server):
+        mock_sleep = mocker.patch("codecov_cli.helpers.request.sleep")
+        url, received = slow_server
+        configure_timeouts(RequestTimeouts(read=0.1, total=0.5))
+        resp = send_get_request(url)
+        assert resp.error.code == "Timeout"
+        # Retrying would go past the deadline
+        assert received == ["GET"]
+        mock_sleep.assert_not_called()
+
+        mocker.patch("codecov_cli.helpers.timeouts.monotonic", return_value=1e9)
+        resp = send_get_request(url)
+        assert "did not finish within 0.5 seconds" in resp.error.description
+        assert received == ["GET"]
+
+    def test_timeout_honors_fail_on_error(self, slow_server):
+        url, _ = slow_server
+        configure_timeouts(RequestTimeouts(read=0.1))
+        resp = send_post_request(url)
+        log_warnings_and_errors_if_any(resp, "Upload")
+        with pytest.raises(SystemExit):
+            log_warnings_and_errors_if_any(resp, "Upload", fail_on_error=True)
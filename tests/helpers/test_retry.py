@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from codecov_cli.helpers.retry import RetryPolicy, parse_retry_after
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [(None, None), ("", None), ("120", 120.0), ("soon", None)],
+)
+def test_parse_retry_after(value, expected):
+    assert parse_retry_after(value) == expected
+
+
+def test_parse_retry_after_http_date():
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=60)
+    assert 55 < parse_retry_after(format_datetime(retry_at, usegmt=True)) <= 60
+    past = datetime.now(timezone.utc) - timedelta(seconds=60)
+    assert parse_retry_after(format_datetime(past, usegmt=True)) == 0
+
+
+def test_retry_policy_statuses_and_methods():
+    policy = RetryPolicy()
+    assert policy.should_retry_status(429)
+    assert policy.should_retry_status(503)
+    assert not policy.should_retry_status(404)
+    assert policy.should_retry_error("POST", request_sent=False)
+    assert not policy.should_retry_error("POST", request_sent=True)
+    assert policy.should_retry_error("put", request_sent=True)
+
+
+def test_retry_state_delays_are_jittered_and_capped(mocker):
+    mocker.patch("codecov_cli.helpers.retry.random.uniform", side_effect=max)
+    retry_state = RetryPolicy(max_attempts=5, base_delay=1, max_delay=20).start()
+    assert [retry_state.next_delay() for _ in range(5)] == [3, 9, 20, 20, None]
+    assert retry_state.retry == 4
+
+
+def test_retry_state_honors_retry_after(mocker):
+    mocker.patch("codecov_cli.helpers.retry.random.uniform", side_effect=min)
+    retry_state = RetryPolicy(max_attempts=5, max_delay=30).start()
+    assert retry_state.next_delay(retry_after=10) == 10
+    assert retry_state.next_delay(retry_after=600) == 30
+    assert retry_state.next_delay() == 1
+
+
+def test_retry_state_deadline(mocker):
+    mocker.patch("codecov_cli.helpers.retry.monotonic", side_effect=[0, 1, 9])
+    mocker.patch("codecov_cli.helpers.retry.random.uniform", return_value=2)
+    retry_state = RetryPolicy(max_attempts=10, deadline=10).start()
+    assert retry_state.next_delay() == 2
+    assert retry_state.next_delay() is None
+
+
+def test_retry_deadline_is_shared_by_requests(mocker):
+    monotonic = mocker.patch("codecov_cli.helpers.retry.monotonic", return_value=0)
+    mocker.patch("codecov_cli.helpers.retry.random.uniform", return_value=2)
+    policy = RetryPolicy(max_attempts=10, deadline=10)
+    assert policy.start().next_delay() == 2
+
+    # A request started later has less time left to retry
+    monotonic.return_value = 9
+    assert policy.start().next_delay() is None
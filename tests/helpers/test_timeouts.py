@@ -0,0 +1,27 @@
+import pytest
+
+from codecov_cli.helpers.timeouts import DeadlineExceeded, RequestTimeouts
+
+
+def test_timeouts_without_deadline():
+    timeouts = RequestTimeouts(connect=5, read=None, write=30)
+    assert timeouts.remaining() is None
+    assert timeouts.for_requests() == (5, None)
+    httpx_timeout = timeouts.for_httpx()
+    assert (httpx_timeout.connect, httpx_timeout.read) == (5, None)
+    assert (httpx_timeout.write, httpx_timeout.pool) == (30, None)
+
+
+def test_timeouts_limited_by_deadline(mocker):
+    mock_monotonic = mocker.patch(
+        "codecov_cli.helpers.timeouts.monotonic", return_value=100
+    )
+    timeouts = RequestTimeouts(connect=5, read=60, total=30)
+    mock_monotonic.return_value = 110
+    assert timeouts.remaining() == 20
+    assert timeouts.for_requests() == (5, 20)
+    assert timeouts.for_httpx().pool == 20
+
+    mock_monotonic.return_value = 130
+    with pytest.raises(DeadlineExceeded, match="within 30 seconds"):
+        timeouts.for_requests()
@@ -1,5 +1,8 @@
+import base64
+import gzip
 import json
 import re
+import zlib
 from pathlib import Path
 
 from copy import deepcopy
@@ -11,6 +14,7 @@ from codecov_cli import __version__ as codecov_cli_version
 from codecov_cli.helpers.encoder import encode_slug
 from codecov_cli.services.upload.upload_sender import UploadSender
 from codecov_cli.types import (
+    RequestResult,
     UploadCollectionResult,
     UploadCollectionResultFileFixer,
     UploadCollectionResultFile,
@@ -145,9 +149,9 @@ def mocked_coverage_file(mocker):
     fake_result_file.get_filename.return_value = (
         coverage_file_seperated[0][len(b"# path=") :].strip().decode()
     )
-    fake_result_file.get_content.return_value = coverage_file_seperated[1][
-        : -len(b"\n<<<<<< EOF\n")
-    ]
+    content = coverage_file_seperated[1][: -len(b"\n<<<<<< EOF\n")]
+    fake_result_file.get_content.return_value = content
+    fake_result_file.open_view.return_value.__enter__.return_value = memoryview(content)
     return fake_result_file
 
 
@@ -299,7 +303,7 @@ class TestUploadSender(object):
 
         put_req_made = mocked_responses.calls[1].request
         assert put_req_made.url == "https://puturl.com/"
-        assert "test_results_files" in put_req_made.body.decode("utf-8")
+        assert "test_results_files" in b"".join(put_req_made.body).decode("utf-8")
 
     def test_upload_sender_post_called_with_right_parameters_test_results_file_not_found(
         self,
@@ -384,6 +388,47 @@ class TestUploadSender(object):
         put_req_mad = mocked_responses.calls[1].request
         assert put_req_mad.url == "https://puturl.com/"
 
+    def test_upload_sender_put_streams_payload(
+        self,
+        mocked_responses,
+        mocked_legacy_upload_endpoint,
+        mocked_storage_server,
+        mocked_coverage_file,
+    ):
+        upload_data = get_fake_upload_collection_result(mocked_coverage_file)
+        sending_result = UploadSender().send_upload_data(
+            upload_data, random_sha, random_token, **named_upload_data
+        )
+        assert sending_result.error is None
+
+        put_req_made = mocked_responses.calls[1].request
+        expected_payload = UploadSender()._generate_payload(upload_data, {})
+        # Storage rejects chunked bodies, the size is sent first
+        assert "Transfer-Encoding" not in put_req_made.headers
+        assert put_req_made.headers["Content-Length"] == str(len(expected_payload))
+        # The body can be iterated again, e.g. when the request is retried
+        assert b"".join(put_req_made.body) == expected_payload
+        assert b"".join(put_req_made.body) == expected_payload
+
+    def test_upload_sender_put_chunked_transfer(
+        self,
+        mocked_responses,
+        mocked_legacy_upload_endpoint,
+        mocked_storage_server,
+        mocked_coverage_file,
+    ):
+        upload_data = get_fake_upload_collection_result(mocked_coverage_file)
+        sending_result = UploadSender(chunked_transfer=True).send_upload_data(
+            upload_data, random_sha, random_token, **named_upload_data
+        )
+        assert sending_result.error is None
+
+        put_req_made = mocked_responses.calls[1].request
+        assert put_req_made.headers["Transfer-Encoding"] == "chunked"
+        assert "Content-Length" not in put_req_made.headers
+        expected_payload = UploadSender()._generate_payload(upload_data, {})
+        assert b"".join(put_req_made.body) == expected_payload
+
     def test_upload_sender_result_success(
         self, mocked_responses, mocked_legacy_upload_endpoint, mocked_storage_server
     ):
@@ -531,6 +576,31 @@ class TestPayloadGeneration(object):
         }
         assert actual_report == json.dumps(expected_report).encode()
 
+    @pytest.mark.parametrize(
+        "report_type", [ReportType.COVERAGE, ReportType.TEST_RESULTS]
+    )
+    def test_generate_payload_chunks_match_json_dumps(
+        self, mocked_coverage_file, report_type
+    ):
+        sender = UploadSender()
+        upload_data = get_fake_upload_collection_result(mocked_coverage_file)
+        if report_type == ReportType.COVERAGE:
+            expected_payload = {
+                "report_fixes": {
+                    "format": "legacy",
+                    "value": sender._get_file_fixers(upload_data),
+                },
+                "network_files": upload_data.network,
+                "coverage_files": sender._get_files(upload_data),
+                "metadata": {},
+            }
+        else:
+            expected_payload = {"test_results_files": sender._get_files(upload_data)}
+
+        chunks = list(sender._generate_payload_chunks(upload_data, {}, report_type))
+        assert len(chunks) > len(upload_data.files)
+        assert b"".join(chunks) == json.dumps(expected_payload).encode()
+
     def test_generate_empty_payload_overall(self):
         actual_report = UploadSender()._generate_payload(
             UploadCollectionResult([], [], []), None
@@ -569,3 +639,225 @@ class TestPayloadGeneration(object):
             "data": "encoded_file_data",
             "labels": "",
         }
+
+
+class TestParallelCompression(object):
+    @pytest.fixture
+    def report_files(self, tmp_path):
+        files = []
+        for i in range(10):
+            path = tmp_path / f"coverage_{i}.xml"
+            path.write_bytes(f"<coverage index='{i}'/>\n".encode() * (i + 1) * 100)
+            files.append(UploadCollectionResultFile(path))
+        return files
+
+    @pytest.mark.parametrize("compression_workers", [2, 4, 16])
+    def test_parallel_payload_is_identical_to_serial(
+        self, report_files, compression_workers
+    ):
+        upload_data = UploadCollectionResult(["a.py"], report_files, [])
+        serial_payload = UploadSender()._generate_payload(upload_data, {})
+        parallel_payload = UploadSender(
+            compression_workers=compression_workers
+        )._generate_payload(upload_data, {})
+        assert parallel_payload == serial_payload
+
+    def test_files_keep_their_order(self, report_files):
+        formatted_files = list(
+            UploadSender(compression_workers=4)._format_files(report_files)
+        )
+        assert [f["filename"] for f in formatted_files] == [
+            f.get_filename() for f in report_files
+        ]
+
+    def test_compression_level(self, report_files):
+        sender = UploadSender(compression_level=1)
+        _, formatted_content = sender._get_format_info(report_files[-1])
+        assert (
+            zlib.decompress(base64.b64decode(formatted_content))
+            == report_files[-1].get_content()
+        )
+        assert base64.b64decode(formatted_content) == zlib.compress(
+            report_files[-1].get_content(), 1
+        )
+
+
+class TestStreamPayloadFormat(object):
+    @pytest.fixture
+    def report_file(self, tmp_path):
+        path = tmp_path / "coverage.xml"
+        path.write_bytes(b"<coverage/>\n" * 100)
+        return UploadCollectionResultFile(path)
+
+    def test_payload_format_accepted(
+        self,
+        mocked_responses,
+        mocked_legacy_upload_endpoint,
+        mocked_storage_server,
+        report_file,
+    ):
+        mocked_legacy_upload_endpoint.match = [
+            matchers.json_params_matcher({**request_data, "payload_format": "gzip"})
+        ]
+        mocked_legacy_upload_endpoint.body = json.dumps(
+            {"raw_upload_location": "https://puturl.com", "payload_format": "gzip"}
+        )
+        upload_data = UploadCollectionResult(["a.py"], [report_file], [])
+        sending_result = UploadSender(payload_format="gzip").send_upload_data(
+            upload_data, random_sha, random_token, **named_upload_data
+        )
+        assert sending_result.error is None
+
+        put_req_made = mocked_responses.calls[1].request
+        payload = json.loads(gzip.decompress(b"".join(put_req_made.body)))
+        assert payload["network_files"] == ["a.py"]
+        assert payload["coverage_files"] == [
+            {
+                "filename": report_file.get_filename(),
+                "format": "plain",
+                "data": "<coverage/>\n" * 100,
+                "labels": "",
+            }
+        ]
+
+    def test_payload_format_not_accepted(
+        self,
+        mocked_responses,
+        mocked_legacy_upload_endpoint,
+        mocked_storage_server,
+        report_file,
+    ):
+        upload_data = UploadCollectionResult(["a.py"], [report_file], [])
+        sending_result = UploadSender(payload_format="gzip").send_upload_data(
+            upload_data, random_sha, random_token, **named_upload_data
+        )
+        assert sending_result.error is None
+
+        put_req_made = mocked_responses.calls[1].request
+        assert b"".join(put_req_made.body) == UploadSender()._generate_payload(
+            upload_data, {}
+        )
+
+    def test_binary_file_is_not_inlined(self, tmp_path):
+        path = tmp_path / "coverage.bin"
+        path.write_bytes(b"\xff\xfe\x00binary")
+        format, formatted_content = UploadSender()._get_inline_format_info(
+            UploadCollectionResultFile(path)
+        )
+        assert format == "base64+compressed"
+        assert zlib.decompress(base64.b64decode(formatted_content)) == (
+            b"\xff\xfe\x00binary"
+        )
+
+    def test_zstd_falls_back_to_gzip_when_not_available(self, mocker):
+        mocker.patch(
+            "codecov_cli.services.upload.upload_sender.is_zstd_available",
+            return_value=False,
+        )
+        assert UploadSender(payload_format="zstd").payload_format == "gzip"
+
+
+class TestChunkedUpload(object):
+    @pytest.fixture(autouse=True)
+    def cache_dir(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+
+    def test_chunked_upload_accepted(
+        self, mocker, mocked_responses, mocked_legacy_upload_endpoint
+    ):
+        mocked_legacy_upload_endpoint.match = [
+            matchers.json_params_matcher(
+                {**request_data, "upload_chunk_size": 8 * 1024 * 1024}
+            )
+        ]
+        mocked_legacy_upload_endpoint.body = json.dumps(
+            {
+                "raw_upload_location": "https://puturl.com",
+                "raw_upload_multipart_location": "https://multipart.com",
+            }
+        )
+        mock_send = mocker.patch(
+            "codecov_cli.services.upload.upload_sender.ChunkedUpload.send",
+            return_value=RequestResult(
+                error=None, warnings=None, status_code=200, text=""
+            ),
+        )
+        sending_result = UploadSender(
+            upload_chunk_size=8 * 1024 * 1024
+        ).send_upload_data(
+            upload_collection, random_sha, random_token, **named_upload_data
+        )
+        assert sending_result.error is None
+        assert len(mocked_responses.calls) == 1
+        assert b"".join(mock_send.call_args[0][0]) == UploadSender()._generate_payload(
+            upload_collection, {}
+        )
+
+    def test_chunked_upload_resumed_without_new_upload(self, mocker, mocked_responses):
+        mocker.patch(
+            "codecov_cli.services.upload.upload_sender.ChunkedUpload.get_progress",
+            return_value={"payload_format": "base64+compressed"},
+        )
+        mock_resume = mocker.patch(
+            "codecov_cli.services.upload.upload_sender.ChunkedUpload.resume",
+            return_value=RequestResult(
+                error=None, warnings=None, status_code=200, text=""
+            ),
+        )
+        sending_result = UploadSender(
+            upload_chunk_size=8 * 1024 * 1024
+        ).send_upload_data(
+            upload_collection, random_sha, random_token, **named_upload_data
+        )
+        assert sending_result.error is None
+        # The upload requested by the earlier run gets the data
+        assert len(mocked_responses.calls) == 0
+        assert b"".join(mock_resume.call_args[0][0]) == (
+            UploadSender()._generate_payload(upload_collection, {})
+        )
+
+    def test_chunked_upload_changed_payload_requests_new_upload(
+        self, mocker, mocked_responses, mocked_legacy_upload_endpoint
+    ):
+        mocked_legacy_upload_endpoint.body = json.dumps(
+            {
+                "raw_upload_location": "https://puturl.com",
+                "raw_upload_multipart_location": "https://multipart.com",
+            }
+        )
+        mocker.patch(
+            "codecov_cli.services.upload.upload_sender.ChunkedUpload.get_progress",
+            return_value={"payload_format": "base64+compressed"},
+        )
+        mocker.patch(
+            "codecov_cli.services.upload.upload_sender.ChunkedUpload.resume",
+            return_value=None,
+        )
+        mock_send = mocker.patch(
+            "codecov_cli.services.upload.upload_sender.ChunkedUpload.send",
+            return_value=RequestResult(
+                error=None, warnings=None, status_code=200, text=""
+            ),
+        )
+        sending_result = UploadSender(
+            upload_chunk_size=8 * 1024 * 1024
+        ).send_upload_data(
+            upload_collection, random_sha, random_token, **named_upload_data
+        )
+        assert sending_result.error is None
+        assert len(mocked_responses.calls) == 1
+        assert mock_send.call_args[0][1:] == (
+            "https://multipart.com",
+            "base64+compressed",
+        )
+
+    def test_chunked_upload_not_accepted(
+        self, mocked_responses, mocked_legacy_upload_endpoint, mocked_storage_server
+    ):
+        sending_result = UploadSender(
+            upload_chunk_size=8 * 1024 * 1024
+        ).send_upload_data(
+            upload_collection, random_sha, random_token, **named_upload_data
+        )
+        assert sending_result.error is None
+        assert mocked_responses.calls[1].request.url == "https://puturl.com/"
@@ -101,7 +101,7 @@ def test_commit_command_with_error(mocker):
 
 def test_commit_sender_200(mocker):
     mocked_response = mocker.patch(
-        "codecov_cli.helpers.request.requests.post",
+        "codecov_cli.helpers.request.requests.Session.post",
         return_value=mocker.MagicMock(status_code=200),
     )
     token = uuid.uuid4()
@@ -123,7 +123,7 @@ def test_commit_sender_200(mocker):
 
 def test_commit_sender_403(mocker):
     mocked_response = mocker.patch(
-        "codecov_cli.helpers.request.requests.post",
+        "codecov_cli.helpers.request.requests.Session.post",
         return_value=mocker.MagicMock(status_code=403, text="Permission denied"),
     )
     token = uuid.uuid4()
@@ -84,7 +84,7 @@ def test_empty_upload_200(mocker):
         "non_ignored_files": [],
     }
     mocked_response = mocker.patch(
-        "codecov_cli.helpers.request.requests.post",
+        "codecov_cli.helpers.request.requests.Session.post",
         return_value=RequestResult(
             status_code=200, error=None, warnings=[], text=json.dumps(res)
         ),
@@ -108,7 +108,7 @@ def test_empty_upload_200(mocker):
 
 def test_empty_upload_403(mocker):
     mocked_response = mocker.patch(
-        "codecov_cli.helpers.request.requests.post",
+        "codecov_cli.helpers.request.requests.Session.post",
         return_value=mocker.MagicMock(status_code=403, text="Permission denied"),
     )
     token = uuid.uuid4()
@@ -129,7 +129,7 @@ def test_empty_upload_force(mocker):
         "non_ignored_files": [],
     }
     mocked_response = mocker.patch(
-        "codecov_cli.helpers.request.requests.post",
+        "codecov_cli.helpers.request.requests.Session.post",
         return_value=RequestResult(
             status_code=200, error=None, warnings=[], text=json.dumps(res)
         ),
@@ -157,7 +157,7 @@ def test_empty_upload_no_token(mocker):
         "non_ignored_files": [],
     }
     mocked_response = mocker.patch(
-        "codecov_cli.helpers.request.requests.post",
+        "codecov_cli.helpers.request.requests.Session.post",
         return_value=RequestResult(
             status_code=200, error=None, warnings=[], text=json.dumps(res)
         ),
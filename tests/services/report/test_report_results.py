@@ -98,7 +98,7 @@ def test_report_results_command_with_error(mocker):
 
 def test_report_results_request_200(mocker):
     mocked_response = mocker.patch(
-        "codecov_cli.helpers.request.requests.post",
+        "codecov_cli.helpers.request.requests.Session.post",
         return_value=mocker.MagicMock(status_code=200),
     )
     token = uuid.uuid4()
@@ -112,7 +112,7 @@ def test_report_results_request_200(mocker):
 
 def test_report_results_request_no_token(mocker):
     mocked_response = mocker.patch(
-        "codecov_cli.helpers.request.requests.post",
+        "codecov_cli.helpers.request.requests.Session.post",
         return_value=mocker.MagicMock(status_code=200),
     )
     res = send_reports_result_request(
@@ -125,7 +125,7 @@ def test_report_results_request_no_token(mocker):
 
 def test_report_results_403(mocker):
     mocked_response = mocker.patch(
-        "codecov_cli.helpers.request.requests.post",
+        "codecov_cli.helpers.request.requests.Session.post",
         return_value=mocker.MagicMock(status_code=403, text="Permission denied"),
     )
     token = uuid.uuid4()
@@ -142,7 +142,7 @@ def test_report_results_403(mocker):
 
 def test_get_report_results_200_completed(mocker, capsys):
     mocked_response = mocker.patch(
-        "codecov_cli.helpers.request.requests.get",
+        "codecov_cli.helpers.request.requests.Session.get",
         return_value=mocker.MagicMock(
             status_code=200,
             text='{"state": "completed", "result": {"state": "failure","message": "33.33% of diff hit (target 77.77%)"}}',
@@ -164,7 +164,7 @@ def test_get_report_results_200_completed(mocker, capsys):
 
 def test_get_report_results_no_token(mocker, capsys):
     mocked_response = mocker.patch(
-        "codecov_cli.helpers.request.requests.get",
+        "codecov_cli.helpers.request.requests.Session.get",
         return_value=mocker.MagicMock(
             status_code=200,
             text='{"state": "completed", "result": {"state": "failure","message": "33.33% of diff hit (target 77.77%)"}}',
@@ -182,7 +182,7 @@ def test_get_report_results_no_token(mocker, capsys):
 def test_get_report_results_200_pending(mocker, capsys):
     mocker.patch("codecov_cli.services.report.time.sleep")
     mocked_response = mocker.patch(
-        "codecov_cli.helpers.request.requests.get",
+        "codecov_cli.helpers.request.requests.Session.get",
         return_value=mocker.MagicMock(
             status_code=200, text='{"state": "pending", "result": {}}'
         ),
@@ -200,7 +200,7 @@ def test_get_report_results_200_pending(mocker, capsys):
 
 def test_get_report_results_200_error(mocker, capsys):
     mocked_response = mocker.patch(
-        "codecov_cli.helpers.request.requests.get",
+        "codecov_cli.helpers.request.requests.Session.get",
         return_value=mocker.MagicMock(
             status_code=200, text='{"state": "error", "result": {}}'
         ),
@@ -221,7 +221,7 @@ def test_get_report_results_200_error(mocker, capsys):
 
 def test_get_report_results_200_undefined_state(mocker, capsys):
     mocked_response = mocker.patch(
-        "codecov_cli.helpers.request.requests.get",
+        "codecov_cli.helpers.request.requests.Session.get",
         return_value=mocker.MagicMock(
             status_code=200, text='{"state": "undefined_state", "result": {}}'
         ),
@@ -239,7 +239,7 @@ def test_get_report_results_200_undefined_state(mocker, capsys):
 
 def test_get_report_results_401(mocker, capsys):
     mocked_response = mocker.patch(
-        "codecov_cli.helpers.request.requests.get",
+        "codecov_cli.helpers.request.requests.Session.get",
         return_value=mocker.MagicMock(
             status_code=401, text='{"detail": "Invalid token."}'
         ),
@@ -9,7 +9,7 @@ from tests.test_helpers import parse_outstreams_into_log_lines
 
 def test_send_create_report_request_200(mocker):
     mocked_response = mocker.patch(
-        "codecov_cli.helpers.request.requests.post",
+        "codecov_cli.helpers.request.requests.Session.post",
         return_value=mocker.MagicMock(status_code=200),
     )
     res = send_create_report_request(
@@ -29,7 +29,7 @@ def test_send_create_report_request_200(mocker):
 
 def test_send_create_report_request_no_token(mocker):
     mocked_response = mocker.patch(
-        "codecov_cli.helpers.request.requests.post",
+        "codecov_cli.helpers.request.requests.Session.post",
         return_value=mocker.MagicMock(status_code=200),
     )
     res = send_create_report_request(
@@ -49,7 +49,7 @@ def test_send_create_report_request_no_token(mocker):
 
 def test_send_create_report_request_403(mocker):
     mocked_response = mocker.patch(
-        "codecov_cli.helpers.request.requests.post",
+        "codecov_cli.helpers.request.requests.Session.post",
         return_value=mocker.MagicMock(status_code=403, text="Permission denied"),
     )
     res = send_create_report_request(
@@ -4,8 +4,15 @@ from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
+from tree_sitter import Language
 
 from codecov_cli.services.staticanalysis import analyze_file
+from codecov_cli.services.staticanalysis.analyzers import (
+    ANALYZER_CLASSES,
+    PythonAnalyzer,
+    general,
+    load_analyzers,
+)
 from codecov_cli.services.staticanalysis.types import FileAnalysisRequest
 
 here = Path(__file__)
@@ -60,3 +67,41 @@ def test_analyse_file_no_analyzer(mock_get_analyzer, mock_open):
     assert res is None
     mock_open.assert_called_with("filepath", "rb")
     mock_get_analyzer.assert_called_with(file_name, fake_contents)
+
+
+def test_analyzers_share_language_context(mocker):
+    general._language_contexts.clear()
+    mock_query = mocker.spy(Language, "query")
+    load_analyzers()
+    number_of_queries = mock_query.call_count
+    assert number_of_queries == sum(
+        len(analyzer_class.queries) for analyzer_class in ANALYZER_CLASSES
+    )
+
+    for input_filename in [
+        "samples/inputs/sample_001.py",
+        "samples/inputs/sample_003.js",
+    ]:
+        for _ in range(2):
+            analyze_file({}, FileAnalysisRequest(input_filename, Path(input_filename)))
+    assert mock_query.call_count == number_of_queries
+    assert (
+        PythonAnalyzer.get_language_context() is PythonAnalyzer.get_language_context()
+    )
+
+
+def test_analysis_of_deeply_nested_code(tmp_path):
+    # Nested parentheses rather than blocks, the tree-sitter scanner can't
+    # track that many indentation levels
+    depth = sys.getrecursionlimit() + 100
+    expression = "(x if x else " * depth + "x" + ")" * depth
+    path = tmp_path / "nested.py"
+    path.write_text(f"def f(x):\n    return {expression}\n")
+    res = analyze_file({}, FileAnalysisRequest("nested.py", path))
+    (function,) = res.result["functions"]
+    assert function["complexity_metrics"] == {
+        "conditions": depth,
+        "mccabe_cyclomatic_complexity": depth + 1,
+        "returns": 1,
+        "max_nested_conditional": depth,
+    }
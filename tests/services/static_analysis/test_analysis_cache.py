@@ -0,0 +1,142 @@
+import json
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from codecov_cli.services.staticanalysis import analyze_file, process_files
+from codecov_cli.services.staticanalysis.analyzers import PythonAnalyzer
+from codecov_cli.services.staticanalysis.cache import (
+    AnalysisCache,
+    get_default_cache_path,
+)
+from codecov_cli.services.staticanalysis.types import FileAnalysisRequest
+
+
+def request(path):
+    return FileAnalysisRequest(path, Path(path))
+
+
+def sent_files(serial_pool):
+    batches = serial_pool.call_args.args[1]
+    return set(f.result_filename for batch in batches for f in batch)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return AnalysisCache(tmp_path / "cache")
+
+
+@pytest.fixture
+def serial_pool(mocker):
+    mock_pool = mocker.patch("codecov_cli.services.staticanalysis.Pool")
+    imap = mock_pool.return_value.__enter__.return_value.imap_unordered
+    imap.side_effect = lambda func, files: [func(file) for file in files]
+    return imap
+
+
+def test_get_key(mocker):
+    python_file = request("a.py")
+    key = AnalysisCache.get_key(python_file, b"x = 1")
+    assert key == AnalysisCache.get_key(request("a.py"), b"x = 1")
+    assert key != AnalysisCache.get_key(request("b/a.py"), b"x = 1")
+    assert key != AnalysisCache.get_key(python_file, b"x = 2")
+    assert key != AnalysisCache.get_key(request("a.js"), b"x = 1")
+    assert AnalysisCache.get_key(request("a.txt"), b"x = 1") is None
+    mocker.patch.object(PythonAnalyzer, "version", PythonAnalyzer.version + 1)
+    assert key != AnalysisCache.get_key(python_file, b"x = 1")
+
+
+def test_get_set(cache):
+    assert cache.get("ab12") is None
+    cache.set("ab12", {"hash": "abc"})
+    assert cache.get("ab12") == {"hash": "abc"}
+    (cache.path / "ab" / "ab12.json").write_text("{")
+    assert cache.get("ab12") is None
+
+
+def test_get_updates_last_use(cache):
+    cache.set("ab12", {"hash": "abc"})
+    path = cache.path / "ab" / "ab12.json"
+    os.utime(path, (0, 0))
+    cache.get("ab12")
+    assert path.stat().st_mtime > time.time() - 60
+
+
+def test_evict_old_results(cache):
+    cache.set("ab12", {"hash": "abc"})
+    cache.set("cd34", {"hash": "cde"})
+    old_use = time.time() - cache.max_age - 60
+    os.utime(cache.path / "ab" / "ab12.json", (old_use, old_use))
+    cache.evict()
+    assert cache.get("ab12") is None
+    assert cache.get("cd34") == {"hash": "cde"}
+
+
+def test_evict_least_recently_used_past_max_size(tmp_path):
+    cache = AnalysisCache(tmp_path / "cache", max_size=50)
+    now = time.time()
+    for i, key in enumerate(["ab12", "cd34", "ef56"]):
+        cache.set(key, {"hash": "x" * 10})
+        path = cache.path / key[:2] / f"{key}.json"
+        os.utime(path, (now - 10 + i, now - 10 + i))
+    cache.evict()
+    assert cache.get("ab12") is None
+    assert cache.get("cd34") is not None
+    assert cache.get("ef56") is not None
+
+
+def test_evict_missing_folder(cache):
+    cache.evict()
+    assert not cache.path.exists()
+
+
+def test_default_cache_path(monkeypatch, tmp_path):
+    monkeypatch.setattr("sys.platform", "linux")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert get_default_cache_path() == tmp_path / "codecov-cli" / "static_analysis"
+
+
+@pytest.mark.asyncio
+async def test_process_files_reuses_cached_results(cache, serial_pool, tmp_path):
+    files = [
+        request("samples/inputs/sample_001.py"),
+        request("samples/inputs/sample_003.js"),
+        request("samples/example_cli_config.yml"),
+    ]
+
+    first = await process_files(files, 1, {}, cache, "process")
+    assert sorted(f["filepath"] for f in first["file_metadata"]) == [
+        "samples/inputs/sample_001.py",
+        "samples/inputs/sample_003.js",
+    ]
+    assert sent_files(serial_pool) == set(f.result_filename for f in files)
+
+    second = await process_files(files, 1, {}, cache, "process")
+    # Only the file no analyzer handles is sent to the workers
+    assert sent_files(serial_pool) == {"samples/example_cli_config.yml"}
+    # Results are sent to Codecov as JSON
+    for results in (first, second):
+        results["file_metadata"].sort(key=lambda f: f["filepath"])
+    assert json.dumps(second, sort_keys=True) == json.dumps(first, sort_keys=True)
+    assert json.dumps(second["all_data"]["samples/inputs/sample_001.py"]) == (
+        json.dumps(analyze_file({}, files[0]).result)
+    )
+
+
+@pytest.mark.asyncio
+async def test_changed_file_is_analyzed_again(cache, serial_pool, tmp_path):
+    source = tmp_path / "module.py"
+    source.write_text("def f():\n    return 1\n")
+    files = [FileAnalysisRequest("module.py", source)]
+    first = await process_files(files, 1, {}, cache, "process")
+
+    source.write_text("def f():\n    return 2\n")
+    second = await process_files(files, 1, {}, cache, "process")
+
+    assert sent_files(serial_pool) == {"module.py"}
+    assert (
+        first["file_metadata"][0]["file_hash"]
+        != second["file_metadata"][0]["file_hash"]
+    )
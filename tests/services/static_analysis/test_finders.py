@@ -0,0 +1,111 @@
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from codecov_cli.services.staticanalysis.finders import (
+    ChangedFilesFinder,
+    FileFinder,
+    GitFileFinder,
+    select_file_finder,
+)
+
+
+def git(folder, *args):
+    subprocess.run(
+        [
+            "git",
+            "-C",
+            str(folder),
+            "-c",
+            "user.name=test",
+            "-c",
+            "user.email=test@example.com",
+            *args,
+        ],
+        check=True,
+        capture_output=True,
+    )
+
+
+def write(folder, filename, content="x = 1\n"):
+    path = folder / filename
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    git(tmp_path, "init")
+    write(tmp_path, ".gitignore", "build/\n")
+    write(tmp_path, "a.py")
+    write(tmp_path, "src/b.py")
+    write(tmp_path, "src/c.js")
+    write(tmp_path, "vendor/d.py")
+    write(tmp_path, "src/vendor/e.py")
+    write(tmp_path, "build/generated.py")
+    git(tmp_path, "add", ".")
+    git(tmp_path, "commit", "-m", "first")
+    return tmp_path
+
+
+def result_filenames(files):
+    return sorted(f.result_filename for f in files)
+
+
+def test_git_file_finder(repo):
+    write(repo, "untracked.py")
+    files = GitFileFinder().find_files(repo, "*.py", [Path("vendor")])
+    assert result_filenames(files) == ["a.py", "src/b.py"]
+    assert all(f.actual_filepath == repo / f.result_filename for f in files)
+
+
+def test_git_file_finder_exclude_path(repo):
+    files = GitFileFinder().find_files(repo, "*", [Path("src/vendor")])
+    assert result_filenames(files) == [
+        ".gitignore",
+        "a.py",
+        "src/b.py",
+        "src/c.js",
+        "vendor/d.py",
+    ]
+
+
+def test_git_file_finder_skips_deleted_files(repo):
+    (repo / "a.py").unlink()
+    files = GitFileFinder().find_files(repo, "*.py", [])
+    assert "a.py" not in result_filenames(files)
+
+
+def test_git_file_finder_not_a_repo(tmp_path):
+    write(tmp_path, "a.py")
+    files = GitFileFinder().find_files(tmp_path, "*.py", [])
+    assert result_filenames(files) == ["a.py"]
+
+
+def test_changed_files_finder(repo):
+    git(repo, "checkout", "-b", "feature")
+    write(repo, "a.py", "x = 2\n")
+    write(repo, "src/new.py")
+    write(repo, "src/new.txt")
+    (repo / "src" / "b.py").unlink()
+    git(repo, "add", "-A")
+    git(repo, "commit", "-m", "second")
+    files = ChangedFilesFinder("HEAD~1").find_files(repo, "*.py", [])
+    assert result_filenames(files) == ["a.py", "src/new.py"]
+    # Paths are relative to the folder searched
+    files = ChangedFilesFinder("HEAD~1").find_files(repo / "src", "*", [])
+    assert result_filenames(files) == ["new.py", "new.txt"]
+
+
+def test_changed_files_finder_unknown_base(repo):
+    files = ChangedFilesFinder("0" * 40).find_files(repo, "*.js", [])
+    assert result_filenames(files) == ["src/c.js"]
+
+
+def test_select_file_finder():
+    assert isinstance(select_file_finder({}), FileFinder)
+    assert isinstance(select_file_finder({}, "git"), GitFileFinder)
+    finder = select_file_finder({}, "walk", "abc123")
+    assert isinstance(finder, ChangedFilesFinder)
+    assert finder.base_commit == "abc123"
@@ -0,0 +1,19 @@
+import pytest
+
+from codecov_cli.services.staticanalysis.result_store import AnalysisResultStore
+
+
+def test_result_store(tmp_path):
+    with AnalysisResultStore(tmp_path) as store:
+        store["a.py"] = {"hash": "abc"}
+        store["b/a.py"] = {"hash": "def"}
+        store["a.py"] = {"hash": "ghi"}
+        assert len(store) == 2
+        assert "a.py" in store
+        assert "c.py" not in store
+        assert store["a.py"] == {"hash": "ghi"}
+        assert store["b/a.py"] == {"hash": "def"}
+        assert len(list(store.path.iterdir())) == 2
+        with pytest.raises(KeyError):
+            store["c.py"]
+    assert not store.path.exists()
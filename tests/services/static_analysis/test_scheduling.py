@@ -0,0 +1,83 @@
+from codecov_cli.services.staticanalysis.scheduling import (
+    INLINE_MAX_BYTES,
+    INLINE_MAX_FILES,
+    MAX_BATCH_FILES,
+    BatchResult,
+    WorkerUtilisation,
+    schedule_files,
+    select_executor,
+)
+from codecov_cli.services.staticanalysis.types import FileAnalysisRequest
+
+
+def make_files(tmp_path, sizes):
+    files = []
+    for index, size in enumerate(sizes):
+        path = tmp_path / f"file_{index}.py"
+        path.write_bytes(b"x" * size)
+        files.append(FileAnalysisRequest(path.name, path))
+    return files
+
+
+def test_schedule_files_largest_first(tmp_path):
+    files = make_files(tmp_path, [10, 10, 5000, 10, 3000, 10])
+    batches = schedule_files(files, 2)
+    assert [[f.result_filename for f in batch] for batch in batches] == [
+        ["file_2.py"],
+        ["file_4.py"],
+        ["file_0.py", "file_1.py", "file_3.py", "file_5.py"],
+    ]
+
+
+def test_schedule_files_limits_batch_length(tmp_path):
+    files = make_files(tmp_path, [0] * (MAX_BATCH_FILES + 1))
+    batches = schedule_files(files, 1)
+    assert [len(batch) for batch in batches] == [MAX_BATCH_FILES, 1]
+
+
+def test_schedule_files_missing_file(tmp_path):
+    files = [FileAnalysisRequest("missing.py", tmp_path / "missing.py")]
+    assert schedule_files(files, 4) == [files]
+
+
+def test_worker_utilisation(mocker):
+    mock_log_debug = mocker.patch(
+        "codecov_cli.services.staticanalysis.scheduling.logger.debug"
+    )
+    utilisation = WorkerUtilisation()
+    utilisation.add(BatchResult(worker=10, busy_time=1.0, results=[None, None]))
+    utilisation.add(BatchResult(worker=10, busy_time=2.0, results=[None]))
+    utilisation.add(BatchResult(worker=11, busy_time=1.5, results=[None]))
+    utilisation.log(4.0)
+    logged = [
+        call[1]["extra"]["extra_log_attributes"]
+        for call in mock_log_debug.call_args_list
+    ]
+    assert [(x["worker"], x["utilisation"]) for x in logged] == [
+        (10, 0.75),
+        (11, 0.375),
+    ]
+    assert utilisation.files == {10: 3, 11: 1}
+
+
+def test_select_executor(mocker):
+    mocker.patch("os.cpu_count", return_value=8)
+    many_files = INLINE_MAX_FILES + 1
+    many_bytes = INLINE_MAX_BYTES + 1
+    assert select_executor("auto", many_files, many_bytes, None) == "process"
+    assert select_executor("auto", many_files, many_bytes, 4) == "process"
+    assert select_executor("auto", many_files, many_bytes, 1) == "inline"
+    assert select_executor("auto", INLINE_MAX_FILES, INLINE_MAX_BYTES, 4) == "inline"
+    # Many tiny files, or a few large ones, are still worth a process pool
+    assert select_executor("auto", many_files, INLINE_MAX_BYTES, 4) == "process"
+    assert select_executor("auto", INLINE_MAX_FILES, many_bytes, 4) == "process"
+    assert select_executor("thread", 1, 1, 4) == "thread"
+    assert select_executor("process", 1, 1, 1) == "process"
+
+
+def test_select_executor_single_cpu(mocker):
+    mocker.patch("os.cpu_count", return_value=1)
+    many_files = INLINE_MAX_FILES + 1
+    many_bytes = INLINE_MAX_BYTES + 1
+    assert select_executor("auto", many_files, many_bytes, None) == "inline"
+    assert select_executor("auto", many_files, many_bytes, 4) == "process"
@@ -1,3 +1,7 @@
+import hashlib
+import json
+import threading
+import time
 from asyncio import CancelledError
 from pathlib import Path
 from unittest.mock import MagicMock
@@ -10,8 +14,10 @@ import responses
 from responses import matchers
 
 from codecov_cli.services.staticanalysis import (
+    analyze_file,
     process_files,
     run_analysis_entrypoint,
+    run_pipelined_analysis,
     send_single_upload_put,
 )
 from codecov_cli.services.staticanalysis.types import (
@@ -61,7 +67,7 @@ class TestStaticAnalysisService:
             imap_side_effect
         )
 
-        results = await process_files(files_found, 1, {})
+        results = await process_files(files_found, 1, {}, executor="process")
         mock_pool.return_value.__enter__.return_value.imap_unordered.assert_called()
         assert mock_analyze_function.call_count == 2
         assert results == dict(
@@ -70,6 +76,30 @@ class TestStaticAnalysisService:
             processing_errors={"error_file.py": "some error @ line 12"},
         )
 
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("executor", ["auto", "inline", "thread"])
+    async def test_process_files_without_process_pool(self, mocker, executor):
+        mock_pool = mocker.patch("codecov_cli.services.staticanalysis.Pool")
+        mocker.patch(
+            "codecov_cli.services.staticanalysis.analyze_file",
+            side_effect=lambda config, filename: FileAnalysisResult(
+                filename=filename.result_filename,
+                result={"hash": filename.result_filename},
+            ),
+        )
+        files_found = [
+            FileAnalysisRequest(filename, Path(filename))
+            for filename in ["a.py", "b.py", "c.py"]
+        ]
+        results = await process_files(files_found, 2, {}, executor=executor)
+        mock_pool.assert_not_called()
+        assert results["all_data"] == {
+            "a.py": {"hash": "a.py"},
+            "b.py": {"hash": "b.py"},
+            "c.py": {"hash": "c.py"},
+        }
+        assert results["processing_errors"] == {}
+
     @pytest.mark.asyncio
     async def test_static_analysis_service_success(self, mocker):
         mock_file_finder = mocker.patch(
@@ -138,7 +168,7 @@ class TestStaticAnalysisService:
                 enterprise_url=None,
                 args=None,
             )
-        mock_file_finder.assert_called_with({})
+        mock_file_finder.assert_called_with({}, "walk", None)
         mock_file_finder.return_value.find_files.assert_called()
         assert mock_send_upload_put.call_count == 1
         args, _ = mock_send_upload_put.call_args
@@ -215,7 +245,7 @@ class TestStaticAnalysisService:
                     args=None,
                 )
         assert "Unknown error cancelled the upload tasks." in str(exp.value)
-        mock_file_finder.assert_called_with({})
+        mock_file_finder.assert_called_with({}, "walk", None)
         mock_file_finder.return_value.find_files.assert_called()
         assert mock_send_upload_put.call_count == 2
 
@@ -311,6 +341,61 @@ class TestStaticAnalysisService:
             "succeeded": False,
         }
 
+    @pytest.mark.asyncio
+    async def test_send_single_upload_put_retries(self, mocker):
+        mock_sleep = mocker.patch("codecov_cli.services.staticanalysis.asyncio.sleep")
+        mocker.patch("codecov_cli.helpers.retry.random.uniform", return_value=1)
+        mock_client = MagicMock()
+        responses_to_send = [
+            httpx.ConnectError("Connection refused"),
+            httpx.Response(status_code=429, headers={"Retry-After": "7"}),
+            httpx.Response(status_code=204),
+        ]
+
+        async def side_effect(presigned_put, data):
+            response = responses_to_send.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        mock_client.put.side_effect = side_effect
+
+        response = await send_single_upload_put(
+            mock_client,
+            all_data={"file-001": {"some": "data"}},
+            el={"filepath": "file-001", "raw_upload_location": "http://storage"},
+        )
+        assert response == {
+            "status_code": 204,
+            "filepath": "file-001",
+            "succeeded": True,
+        }
+        assert mock_sleep.call_count == 2
+        assert mock_sleep.call_args_list[1] == mocker.call(7)
+
+    @pytest.mark.asyncio
+    async def test_send_single_upload_put_gives_up(self, mocker):
+        mocker.patch("codecov_cli.services.staticanalysis.asyncio.sleep")
+        mock_client = MagicMock()
+
+        async def side_effect(presigned_put, data):
+            return httpx.Response(status_code=503, text="unavailable")
+
+        mock_client.put.side_effect = side_effect
+
+        response = await send_single_upload_put(
+            mock_client,
+            all_data={"file-001": {"some": "data"}},
+            el={"filepath": "file-001", "raw_upload_location": "http://storage"},
+        )
+        assert response == {
+            "status_code": 503,
+            "exception": None,
+            "filepath": "file-001",
+            "succeeded": False,
+        }
+        assert mock_client.put.call_count == 3
+
     @pytest.mark.asyncio
     @pytest.mark.parametrize(
         "finish_endpoint_response,expected",
@@ -388,7 +473,7 @@ class TestStaticAnalysisService:
                     enterprise_url=None,
                     args=None,
                 )
-        mock_file_finder.assert_called_with({})
+        mock_file_finder.assert_called_with({}, "walk", None)
         mock_file_finder.return_value.find_files.assert_called()
         assert mock_send_upload_put.call_count == 1
         args, _ = mock_send_upload_put.call_args
@@ -463,7 +548,7 @@ class TestStaticAnalysisService:
                     enterprise_url=None,
                     args=None,
                 )
-        mock_file_finder.assert_called_with({})
+        mock_file_finder.assert_called_with({}, "walk", None)
         mock_file_finder.return_value.find_files.assert_called()
         assert mock_send_upload_put.call_count == 1
         args, _ = mock_send_upload_put.call_args
@@ -540,7 +625,7 @@ class TestStaticAnalysisService:
                 enterprise_url=None,
                 args=None,
             )
-        mock_file_finder.assert_called_with({})
+        mock_file_finder.assert_called_with({}, "walk", None)
         mock_file_finder.return_value.find_files.assert_called()
         assert mock_send_upload_put.call_count == 2
 
@@ -612,6 +697,211 @@ class TestStaticAnalysisService:
                 enterprise_url=None,
                 args=None,
             )
-        mock_file_finder.assert_called_with({})
+        mock_file_finder.assert_called_with({}, "walk", None)
         mock_file_finder.return_value.find_files.assert_called()
         assert mock_send_upload_put.call_count == 0
+
+    @pytest.mark.asyncio
+    async def test_pipelined_analysis(self, mocker):
+        uploaded = {}
+
+        async def upload_side_effect(client, all_data, el):
+            uploaded[el["filepath"]] = all_data[el["filepath"]]
+            return {"filepath": el["filepath"], "succeeded": True}
+
+        mocker.patch(
+            "codecov_cli.services.staticanalysis.send_single_upload_put",
+            side_effect=upload_side_effect,
+        )
+        files = [
+            FileAnalysisRequest(filename, Path(filename))
+            for filename in [
+                "samples/inputs/sample_001.py",
+                "samples/inputs/sample_002.py",
+                "samples/inputs/sample_003.js",
+            ]
+        ]
+        batches_sent = []
+
+        def analyses_callback(request):
+            body = json.loads(request.body)
+            assert body["commit"] == "COMMIT"
+            batches_sent.append([f["filepath"] for f in body["filepaths"]])
+            return (
+                200,
+                {},
+                json.dumps(
+                    {
+                        "external_id": "externalid",
+                        "filepaths": [
+                            {
+                                "state": "valid"
+                                if f["filepath"].endswith(".js")
+                                else "created",
+                                "filepath": f["filepath"],
+                                "raw_upload_location": "http://storage-url",
+                            }
+                            for f in body["filepaths"]
+                        ],
+                    }
+                ),
+            )
+
+        with responses.RequestsMock() as rsps:
+            rsps.add_callback(
+                responses.POST,
+                "https://api.codecov.io/staticanalysis/analyses",
+                callback=analyses_callback,
+            )
+            rsps.add(
+                responses.POST,
+                "https://api.codecov.io/staticanalysis/analyses/externalid/finish",
+                status=204,
+            )
+            errors = await run_pipelined_analysis(
+                files,
+                1,
+                {},
+                None,
+                "https://api.codecov.io",
+                "STATIC_TOKEN",
+                "COMMIT",
+                False,
+            )
+        assert errors == {}
+        # A single analysis is created, with the fingerprints of all files
+        assert batches_sent == [[f.result_filename for f in files]]
+        assert sorted(uploaded) == [
+            "samples/inputs/sample_001.py",
+            "samples/inputs/sample_002.py",
+        ]
+        # Results are uploaded as JSON, where tuples become lists
+        assert uploaded["samples/inputs/sample_001.py"] == json.loads(
+            json.dumps(analyze_file({}, files[0]).result)
+        )
+
+    @pytest.mark.asyncio
+    async def test_pipelined_analysis_uploads_while_analyzing(self, mocker, tmp_path):
+        files = []
+        for name in ["a.py", "b.py", "c.js", "d.txt"]:
+            (tmp_path / name).write_text(f"# {name}")
+            files.append(FileAnalysisRequest(name, tmp_path / name))
+        uploaded = []
+
+        async def upload_side_effect(client, all_data, el):
+            uploaded.append(el["filepath"])
+            return {"filepath": el["filepath"], "succeeded": True}
+
+        def fake_analyze_files(files, numberprocesses, config, on_result, *args):
+            for f in files:
+                if f.result_filename == "b.py":
+                    on_result(FileAnalysisResult(f.result_filename, error="boom"))
+                elif f.result_filename != "d.txt":
+                    code = f.actual_filepath.read_bytes()
+                    on_result(
+                        FileAnalysisResult(
+                            f.result_filename,
+                            result={"hash": hashlib.md5(code).hexdigest()},
+                        )
+                    )
+
+        mocker.patch(
+            "codecov_cli.services.staticanalysis.send_single_upload_put",
+            side_effect=upload_side_effect,
+        )
+        mocker.patch(
+            "codecov_cli.services.staticanalysis.analyze_files",
+            side_effect=fake_analyze_files,
+        )
+        fingerprints_sent = []
+
+        def analyses_callback(request):
+            body = json.loads(request.body)
+            fingerprints_sent.append(body["filepaths"])
+            return (
+                200,
+                {},
+                json.dumps(
+                    {
+                        "external_id": "externalid",
+                        "filepaths": [
+                            {
+                                "state": "created",
+                                "filepath": f["filepath"],
+                                "raw_upload_location": "http://storage-url",
+                            }
+                            for f in body["filepaths"]
+                        ],
+                    }
+                ),
+            )
+
+        with responses.RequestsMock() as rsps:
+            rsps.add_callback(
+                responses.POST,
+                "https://api.codecov.io/staticanalysis/analyses",
+                callback=analyses_callback,
+            )
+            finish = rsps.add(
+                responses.POST,
+                "https://api.codecov.io/staticanalysis/analyses/externalid/finish",
+                status=204,
+            )
+            errors = await run_pipelined_analysis(
+                files,
+                1,
+                {},
+                None,
+                "https://api.codecov.io",
+                "STATIC_TOKEN",
+                "COMMIT",
+                False,
+            )
+            assert finish.call_count == 1
+        assert errors == {"b.py": "boom"}
+        assert fingerprints_sent == [
+            [
+                {
+                    "filepath": name,
+                    "file_hash": hashlib.md5(f"# {name}".encode()).hexdigest(),
+                }
+                for name in ["a.py", "b.py", "c.js"]
+            ]
+        ]
+        assert sorted(uploaded) == ["a.py", "c.js"]
+
+    @pytest.mark.asyncio
+    async def test_pipelined_analysis_stops_analysis_on_error(self, mocker, tmp_path):
+        (tmp_path / "a.py").write_text("x = 1")
+        files = [FileAnalysisRequest("a.py", tmp_path / "a.py")]
+        analysis_finished = threading.Event()
+
+        def fake_analyze_files(files, numberprocesses, config, on_result, *args):
+            try:
+                while True:
+                    on_result(FileAnalysisResult("a.py", result={"hash": "abc"}))
+                    time.sleep(0.01)
+            finally:
+                analysis_finished.set()
+
+        mocker.patch(
+            "codecov_cli.services.staticanalysis.analyze_files",
+            side_effect=fake_analyze_files,
+        )
+        mocker.patch(
+            "codecov_cli.services.staticanalysis.send_fingerprints",
+            side_effect=click.ClickException("Sorry. Codecov is having problems"),
+        )
+        with pytest.raises(click.ClickException):
+            await run_pipelined_analysis(
+                files,
+                1,
+                {},
+                None,
+                "https://api.codecov.io",
+                "STATIC_TOKEN",
+                "COMMIT",
+                False,
+            )
+        # The analysis stopped before its results were deleted
+        assert analysis_finished.is_set()
@@ -0,0 +1,259 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from codecov_cli.services.upload.chunked_upload import (
+    MAX_PROGRESS_AGE,
+    ChunkedUpload,
+)
+
+
+class StandInStorage(object):
+    """
+    Minimal multipart storage server, keeping uploads in memory.
+    """
+
+    def __init__(self):
+        self.uploads = {}
+        self.completed = {}
+        self.part_requests = []
+        self.failing_parts = set()
+        self.failing_status = 403
+        self.session_response = None
+        self.lock = threading.Lock()
+        storage = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _read_body(self):
+                return self.rfile.read(int(self.headers["Content-Length"]))
+
+            def _reply(self, status, body=b"", headers=None):
+                self.send_response(status)
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                request = json.loads(self._read_body())
+                if self.path.startswith("/multipart"):
+                    if storage.session_response is not None:
+                        return self._reply(200, storage.session_response)
+                    with storage.lock:
+                        upload_id = str(len(storage.uploads))
+                        storage.uploads[upload_id] = {}
+                    part_urls = [
+                        f"{storage.url}/parts/{upload_id}/{part}"
+                        for part in range(request["parts"])
+                    ]
+                    body = {
+                        "upload_id": upload_id,
+                        "part_urls": part_urls,
+                        "complete_url": f"{storage.url}/complete",
+                    }
+                    return self._reply(200, json.dumps(body).encode())
+                parts = storage.uploads[request["upload_id"]]
+                for part in request["parts"]:
+                    data = parts[part["part_number"] - 1]
+                    if hashlib.md5(data).hexdigest() != part["etag"]:
+                        return self._reply(400)
+                storage.completed[request["upload_id"]] = b"".join(
+                    parts[part] for part in sorted(parts)
+                )
+                self._reply(200, b"{}")
+
+            def do_PUT(self):
+                _, _, upload_id, part = self.path.split("/")
+                data = self._read_body()
+                with storage.lock:
+                    storage.part_requests.append(int(part))
+                if int(part) in storage.failing_parts:
+                    return self._reply(storage.failing_status)
+                storage.uploads[upload_id][int(part)] = data
+                self._reply(200, headers={"ETag": hashlib.md5(data).hexdigest()})
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, args=(0.05,), daemon=True
+        )
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def storage():
+    storage = StandInStorage()
+    yield storage
+    storage.close()
+
+
+payload = bytes(range(256)) * 1000
+
+
+def payload_chunks():
+    for start in range(0, len(payload), 7000):
+        yield payload[start : start + 7000]
+
+
+def new_upload(storage, tmp_path, chunk_size=64 * 1024, key="key"):
+    return ChunkedUpload(key, chunk_size, progress_folder=tmp_path)
+
+
+def send(upload, storage):
+    return upload.send(payload_chunks(), f"{storage.url}/multipart", "default")
+
+
+def resume(upload):
+    return upload.resume(payload_chunks(), upload.get_progress())
+
+
+def test_chunked_upload(storage, tmp_path):
+    result = send(new_upload(storage, tmp_path), storage)
+    assert result.error is None
+    assert storage.completed["0"] == payload
+    assert sorted(storage.part_requests) == [0, 1, 2, 3]
+    # Spooled payload and progress are removed once the upload completes
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_chunked_upload_single_part(storage, tmp_path):
+    upload = new_upload(storage, tmp_path, chunk_size=1024 * 1024)
+    assert send(upload, storage).error is None
+    assert storage.completed["0"] == payload
+    assert storage.part_requests == [0]
+
+
+def test_chunked_upload_resumes_failed_parts(storage, tmp_path):
+    upload = new_upload(storage, tmp_path)
+    assert upload.get_progress() is None
+    storage.failing_parts = {2}
+    result = send(upload, storage)
+    assert result.error.code == "Chunked upload error"
+    assert result.error.description == (
+        "1 of 4 parts failed to upload. Run the upload again to resume."
+    )
+    assert storage.completed == {}
+    (progress_file,) = tmp_path.iterdir()
+    assert sorted(json.loads(progress_file.read_text())["etags"]) == ["0", "1", "3"]
+
+    storage.failing_parts = set()
+    storage.part_requests = []
+    progress = new_upload(storage, tmp_path).get_progress()
+    assert progress["payload_format"] == "default"
+    result = new_upload(storage, tmp_path).resume(payload_chunks(), progress)
+    assert result.error is None
+    # Only the missing part is sent again, to the same upload
+    assert storage.part_requests == [2]
+    assert list(storage.uploads) == ["0"]
+    assert storage.completed["0"] == payload
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_chunked_upload_progress_is_per_upload_and_part_size(storage, tmp_path):
+    storage.failing_parts = {0}
+    send(new_upload(storage, tmp_path), storage)
+
+    assert new_upload(storage, tmp_path, key="other").get_progress() is None
+    assert new_upload(storage, tmp_path, chunk_size=128 * 1024).get_progress() is None
+    assert new_upload(storage, tmp_path).get_progress() is not None
+
+
+def test_chunked_upload_resume_with_changed_payload(storage, tmp_path):
+    storage.failing_parts = {0}
+    upload = new_upload(storage, tmp_path)
+    send(upload, storage)
+
+    result = upload.resume([b"other payload"], upload.get_progress())
+    assert result is None
+    assert upload.get_progress() is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_chunked_upload_new_upload_replaces_progress(storage, tmp_path):
+    storage.failing_parts = {0}
+    upload = new_upload(storage, tmp_path)
+    send(upload, storage)
+
+    storage.failing_parts = set()
+    storage.part_requests = []
+    assert send(upload, storage).error is None
+    assert sorted(storage.part_requests) == [0, 1, 2, 3]
+    assert storage.completed["1"] == payload
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_chunked_upload_expired_progress_is_removed(storage, tmp_path, mocker):
+    mocker.patch("codecov_cli.helpers.request.sleep")
+    storage.failing_status = 500
+    storage.failing_parts = {1}
+    upload = new_upload(storage, tmp_path)
+    send(upload, storage)
+
+    # The part URLs of the first run are rejected when resuming
+    storage.failing_status = 403
+    result = resume(upload)
+    assert result.error.description == (
+        "The upload resumed from a previous run expired. Run the upload again to start over."
+    )
+    assert list(tmp_path.iterdir()) == []
+    assert upload.get_progress() is None
+
+
+def test_chunked_upload_removes_stale_files(storage, tmp_path):
+    storage.failing_parts = {0}
+    upload = new_upload(storage, tmp_path)
+    send(upload, storage)
+    (progress_file,) = tmp_path.iterdir()
+    progress = json.loads(progress_file.read_text())
+    progress["created_at"] = time.time() - MAX_PROGRESS_AGE - 1
+    progress_file.write_text(json.dumps(progress))
+    (tmp_path / "unreadable.json").write_text("not json")
+    # Payload left by a crashed run
+    stale_payload = tmp_path / "payload-crashed.tmp"
+    stale_payload.write_bytes(payload)
+    os.utime(stale_payload, (0, 0))
+    recent_payload = tmp_path / "payload-running.tmp"
+    recent_payload.write_bytes(payload)
+
+    assert upload.get_progress() is None
+    assert list(tmp_path.iterdir()) == [recent_payload]
+
+
+@pytest.mark.parametrize(
+    "session_response",
+    [
+        b"not json",
+        b"[]",
+        b'{"upload_id": "0"}',
+        b'{"upload_id": "0", "part_urls": [], "complete_url": ""}',
+    ],
+)
+def test_chunked_upload_invalid_session_response(storage, tmp_path, session_response):
+    storage.session_response = session_response
+    result = send(new_upload(storage, tmp_path), storage)
+    assert result.error.code == "Chunked upload error"
+    assert result.error.description.startswith("Invalid multipart upload response")
+    assert storage.part_requests == []
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_chunked_upload_default_progress_folder(monkeypatch, tmp_path):
+    monkeypatch.setattr("sys.platform", "linux")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    upload = ChunkedUpload("key", 1024)
+    assert upload.progress_folder == tmp_path / "codecov-cli" / "upload_progress"
+    assert upload.get_progress() is None
+    assert not upload.progress_folder.exists()
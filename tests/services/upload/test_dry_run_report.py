@@ -0,0 +1,219 @@
+import gzip
+import json
+from pathlib import Path
+
+import pytest
+
+from codecov_cli.helpers.upload_type import ReportType
+from codecov_cli.services.upload import do_upload_logic
+from codecov_cli.services.upload.dry_run_report import (
+    StageTimings,
+    generate_dry_run_report,
+)
+from codecov_cli.services.upload.legacy_upload_sender import LegacyUploadSender
+from codecov_cli.services.upload.upload_collector import UploadCollector
+from codecov_cli.services.upload.upload_manifest import UploadManifest
+from codecov_cli.services.upload.upload_sender import UploadSender
+from codecov_cli.types import (
+    UploadCollectionResult,
+    UploadCollectionResultFile,
+    UploadCollectionResultFileFixer,
+)
+
+
+@pytest.fixture
+def upload_data(tmp_path):
+    path = tmp_path / "coverage.xml"
+    path.write_bytes(b"<coverage/>\n" * 100)
+    return UploadCollectionResult(
+        ["a.py", "b.py"],
+        [UploadCollectionResultFile(path)],
+        [UploadCollectionResultFileFixer(Path("a.py"), {1, 2}, set(), 10)],
+    )
+
+
+def test_stage_timings_accumulate(mocker):
+    mocker.patch(
+        "codecov_cli.services.upload.dry_run_report.perf_counter",
+        side_effect=[1.0, 1.5, 2.0, 2.25, 3.0, 4.0],
+    )
+    timings = StageTimings()
+    with timings.stage("network"):
+        pass
+    with timings.stage("network"):
+        pass
+    with pytest.raises(ValueError):
+        with timings.stage("discovery"):
+            raise ValueError()
+    assert timings.seconds == {"network": 0.75, "discovery": 1.0}
+
+
+def test_generate_dry_run_report(upload_data):
+    sender = UploadSender()
+    timings = StageTimings()
+    report = generate_dry_run_report(
+        sender, [upload_data], ReportType.COVERAGE, timings
+    )
+    payload = sender._generate_payload(upload_data, {})
+    formatted_file = sender._format_file(upload_data.files[0])
+
+    assert set(report["stages_seconds"]) == {"payload"}
+    assert report["files"] == [
+        {
+            "filename": upload_data.files[0].get_filename(),
+            "raw_bytes": 1200,
+            "encoded_bytes": len(formatted_file["data"]),
+            "format": "base64+compressed",
+        }
+    ]
+    assert report["sections_bytes"] == {
+        "network": len(json.dumps(["a.py", "b.py"])),
+        "file_fixes": len(json.dumps({"a.py": {"eof": 10, "lines": [1, 2]}})),
+    }
+    assert report["document_bytes"] == report["payload_bytes"] == len(payload)
+    assert report["parts"] == [
+        {"files": 1, "document_bytes": len(payload), "payload_bytes": len(payload)}
+    ]
+    assert report["payload_format"] == "base64+compressed"
+    assert report["compression_workers"] == 1
+    assert report["peak_rss_bytes"] > 0
+    json.dumps(report)
+
+
+def test_generate_dry_run_report_stream_format(upload_data):
+    sender = UploadSender(payload_format="gzip")
+    report = generate_dry_run_report(
+        sender, [upload_data], ReportType.COVERAGE, StageTimings()
+    )
+    payload = sender._generate_payload(upload_data, {}, payload_format="gzip")
+
+    assert report["files"][0]["format"] == "plain"
+    assert report["files"][0]["encoded_bytes"] == 1200
+    assert report["document_bytes"] == len(gzip.decompress(payload))
+    assert report["payload_bytes"] == len(payload)
+    assert report["payload_bytes"] < report["document_bytes"]
+
+
+def test_generate_dry_run_report_split_upload(tmp_path, upload_data):
+    path = tmp_path / "other.xml"
+    path.write_bytes(b"<coverage/>\n" * 50)
+    other_part = UploadCollectionResult(
+        upload_data.network, [UploadCollectionResultFile(path)], []
+    )
+    sender = UploadSender(compression_workers=2)
+    report = generate_dry_run_report(
+        sender, [upload_data, other_part], ReportType.COVERAGE, StageTimings()
+    )
+
+    payloads = [
+        sender._generate_payload(part, {}) for part in [upload_data, other_part]
+    ]
+    assert report["compression_workers"] == 2
+    assert [file["raw_bytes"] for file in report["files"]] == [1200, 600]
+    assert report["parts"] == [
+        {"files": 1, "document_bytes": len(payload), "payload_bytes": len(payload)}
+        for payload in payloads
+    ]
+    assert report["payload_bytes"] == sum(len(payload) for payload in payloads)
+    assert report["sections_bytes"] == {
+        "network": 2 * len(json.dumps(["a.py", "b.py"])),
+        "file_fixes": len(json.dumps({"a.py": {"eof": 10, "lines": [1, 2]}}))
+        + len(json.dumps({})),
+    }
+
+
+def test_generate_dry_run_report_legacy_uploader(upload_data):
+    sender = LegacyUploadSender()
+    report = generate_dry_run_report(
+        sender, [upload_data], ReportType.COVERAGE, StageTimings()
+    )
+
+    payload = sender._generate_payload(upload_data, {})
+    assert report["payload_format"] == "legacy"
+    assert report["compression_workers"] is None
+    assert report["files"] == [
+        {
+            "filename": upload_data.files[0].get_filename(),
+            "raw_bytes": 1200,
+            "encoded_bytes": len(sender._format_coverage_file(upload_data.files[0])),
+            "format": "text",
+        }
+    ]
+    assert report["sections_bytes"] == {
+        "network": len(b"a.py\nb.py\n<<<<<< network\n"),
+        "file_fixes": 0,
+    }
+    assert report["parts"] == [
+        {"files": 1, "document_bytes": len(payload), "payload_bytes": len(payload)}
+    ]
+
+
+def test_upload_collector_records_stages(mocker, upload_data):
+    network_finder = mocker.MagicMock()
+    network_finder.find_files.return_value = upload_data.network
+    file_finder = mocker.MagicMock()
+    file_finder.find_files.return_value = upload_data.files
+    mocker.patch.object(UploadCollector, "_produce_file_fixes", return_value=[])
+    timings = StageTimings()
+    UploadCollector(
+        [mocker.MagicMock()], network_finder, file_finder, {}, stage_timings=timings
+    ).generate_upload_data()
+    assert set(timings.seconds) == {"plugins", "network", "discovery", "file_fixes"}
+
+
+@pytest.mark.parametrize("use_legacy_uploader", [False, True])
+def test_do_upload_logic_writes_dry_run_report(
+    mocker, tmp_path, upload_data, use_legacy_uploader
+):
+    mocker.patch("codecov_cli.services.upload.select_preparation_plugins")
+    mocker.patch("codecov_cli.services.upload.select_file_finder")
+    mocker.patch("codecov_cli.services.upload.select_network_finder")
+    mocker.patch.object(
+        UploadCollector, "generate_upload_data", return_value=upload_data
+    )
+    mocker.patch.object(UploadManifest, "get_uploaded_hashes", return_value=set())
+    mock_send_upload_data = mocker.patch.object(UploadSender, "send_upload_data")
+    mock_legacy_send_upload_data = mocker.patch.object(
+        LegacyUploadSender, "send_upload_data"
+    )
+    report_path = tmp_path / "report.json"
+    do_upload_logic(
+        {},
+        mocker.MagicMock(),
+        None,
+        report_type=ReportType.COVERAGE,
+        commit_sha="commit_sha",
+        report_code="report_code",
+        build_code=None,
+        build_url=None,
+        job_code=None,
+        env_vars=None,
+        flags=None,
+        gcov_args=None,
+        gcov_executable=None,
+        gcov_ignore=None,
+        gcov_include=None,
+        name=None,
+        network_filter=None,
+        network_prefix=None,
+        network_root_folder=None,
+        files_search_root_folder=None,
+        files_search_exclude_folders=None,
+        files_search_explicitly_listed_files=None,
+        plugin_names=[],
+        token="token",
+        branch="branch",
+        slug="slug",
+        swift_project=None,
+        pull_request_number=None,
+        git_service="github",
+        enterprise_url=None,
+        dry_run=True,
+        dry_run_report=report_path,
+        use_legacy_uploader=use_legacy_uploader,
+    )
+    assert mock_send_upload_data.call_count == 0
+    assert mock_legacy_send_upload_data.call_count == 0
+    report = json.loads(report_path.read_text())
+    assert report["files"][0]["raw_bytes"] == 1200
+    assert (report["payload_format"] == "legacy") == use_legacy_uploader
@@ -0,0 +1,161 @@
+from pathlib import Path
+
+import click
+import pytest
+from click.testing import CliRunner
+
+from codecov_cli.helpers.upload_type import ReportType
+from codecov_cli.services.upload import (
+    UploadCollector,
+    UploadSender,
+    do_multi_upload_logic,
+)
+from codecov_cli.services.upload.network_finder import NetworkFinder
+from codecov_cli.types import (
+    RequestError,
+    RequestResult,
+    UploadCollectionResultFile,
+    UploadSpec,
+)
+from tests.test_helpers import parse_outstreams_into_log_lines
+
+upload_args = dict(
+    report_type=ReportType.COVERAGE,
+    commit_sha="commit_sha",
+    report_code="report_code",
+    build_code=None,
+    build_url=None,
+    job_code=None,
+    env_vars=None,
+    flags=["default-flag"],
+    gcov_args=None,
+    gcov_executable=None,
+    gcov_ignore=None,
+    gcov_include=None,
+    name="default-name",
+    network_filter=None,
+    network_prefix=None,
+    network_root_folder=None,
+    files_search_root_folder=None,
+    files_search_exclude_folders=None,
+    files_search_explicitly_listed_files=[],
+    plugin_names=["gcov"],
+    token="token",
+    branch="branch",
+    slug="slug",
+    swift_project=None,
+    pull_request_number=None,
+    git_service="github",
+    enterprise_url=None,
+)
+
+upload_specs = [
+    UploadSpec(name="unit", flags=["unit"], files=[Path("unit.xml")]),
+    UploadSpec(name=None, flags=["e2e"], files=[]),
+]
+
+
+@pytest.fixture
+def mocked_upload(mocker, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    mock_plugin = mocker.MagicMock()
+    mock_select_preparation_plugins = mocker.patch(
+        "codecov_cli.services.upload.select_preparation_plugins",
+        side_effect=lambda config, names, plugin_config: [mock_plugin] * len(names),
+    )
+    mock_select_file_finder = mocker.patch(
+        "codecov_cli.services.upload.select_file_finder"
+    )
+    mock_select_file_finder.return_value.find_files.return_value = [
+        UploadCollectionResultFile(Path("coverage.xml"))
+    ]
+    mock_send_upload_data = mocker.patch.object(
+        UploadSender,
+        "send_upload_data",
+        return_value=RequestResult(
+            error=None, warnings=None, status_code=200, text="ok"
+        ),
+    )
+    mocker.patch(
+        "codecov_cli.services.upload.upload_manifest.hash_file",
+        side_effect=lambda file: str(file.path),
+    )
+    mocker.patch(
+        "codecov_cli.services.upload.skip_uploaded_files",
+        side_effect=lambda files, hashes: (files, {}, 0),
+    )
+    return dict(
+        plugin=mock_plugin,
+        select_preparation_plugins=mock_select_preparation_plugins,
+        select_file_finder=mock_select_file_finder,
+        send_upload_data=mock_send_upload_data,
+    )
+
+
+def test_do_multi_upload_logic(mocker, mocked_upload):
+    versioning_system = mocker.MagicMock()
+    versioning_system.list_relevant_files.return_value = ["a.c", "b.py"]
+    mock_produce_file_fixes = mocker.patch.object(
+        UploadCollector, "_produce_file_fixes", return_value=[]
+    )
+    with CliRunner().isolation() as outstreams:
+        results = do_multi_upload_logic(
+            {}, versioning_system, None, upload_specs, **upload_args
+        )
+
+    assert [result.error for result in results] == [None, None]
+    # Plugins, the network and file fixes are shared by both uploads
+    mocked_upload["plugin"].run_preparation.assert_called_once()
+    versioning_system.list_relevant_files.assert_called_once()
+    mock_produce_file_fixes.assert_called_once()
+
+    file_finder_calls = mocked_upload["select_file_finder"].call_args_list
+    assert sorted(call[0][2:4] for call in file_finder_calls) == sorted(
+        [([Path("unit.xml")], True), ([], False)]
+    )
+    sent = sorted(
+        (call[1]["name"], call[1]["flags"])
+        for call in mocked_upload["send_upload_data"].call_args_list
+    )
+    assert sent == [("default-name", ["e2e"]), ("unit", ["unit"])]
+
+    logs = parse_outstreams_into_log_lines(outstreams[0].getvalue())
+    assert ("info", "Starting 2 uploads") in logs
+    assert ("info", "Upload unit succeeded") in logs
+    assert ("info", "Upload e2e succeeded") in logs
+
+
+def test_do_multi_upload_logic_reports_failures(mocker, mocked_upload):
+    def send_upload_data(**kwargs):
+        if kwargs["flags"] == ["unit"]:
+            raise click.ClickException("Something broke")
+        return RequestResult(
+            error=RequestError(code="HTTP Error 500", params={}, description="err"),
+            warnings=[],
+            status_code=500,
+            text="err",
+        )
+
+    mocked_upload["send_upload_data"].side_effect = send_upload_data
+    with CliRunner().isolation() as outstreams:
+        with pytest.raises(SystemExit):
+            do_multi_upload_logic(
+                {},
+                mocker.MagicMock(),
+                None,
+                upload_specs,
+                **upload_args,
+                fail_on_error=True,
+            )
+    logs = parse_outstreams_into_log_lines(outstreams[0].getvalue())
+    assert ("error", "Upload unit failed: Something broke") in logs
+    assert ("error", "Upload e2e failed: err") in logs
+
+
+def test_network_finder_lists_files_once(mocker):
+    versioning_system = mocker.MagicMock()
+    versioning_system.list_relevant_files.return_value = ["src/a.py", "b.py"]
+    finder = NetworkFinder(versioning_system, False, "src", None, None)
+    assert finder.find_files() == ["src/a.py"]
+    assert finder.find_files(True) == ["src/a.py", "b.py"]
+    versioning_system.list_relevant_files.assert_called_once()
@@ -0,0 +1,220 @@
+import os
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from codecov_cli.helpers.upload_type import ReportType
+from codecov_cli.services.upload import UploadCollector, UploadSender, do_upload_logic
+from codecov_cli.services.upload.payload_splitter import split_upload_data
+from codecov_cli.types import (
+    RequestError,
+    RequestResult,
+    UploadCollectionResult,
+    UploadCollectionResultFile,
+    UploadCollectionResultFileFixer,
+)
+from tests.test_helpers import parse_outstreams_into_log_lines
+
+
+@pytest.fixture
+def report_files(tmp_path):
+    files = []
+    # Random content doesn't compress, so the encoded sizes are predictable
+    for filename, size in [("a.xml", 400), ("b.xml", 700), ("c.xml", 300)]:
+        path = tmp_path / filename
+        path.write_bytes(os.urandom(size))
+        files.append(UploadCollectionResultFile(path))
+    return files
+
+
+def file_sizes(files):
+    return {file: file.get_size() for file in files}
+
+
+def test_split_upload_data_fits_in_one_upload(report_files):
+    file_fixes = [UploadCollectionResultFileFixer(Path("a.py"), {1}, None, None)]
+    upload_data = UploadCollectionResult(["a.py"], report_files, file_fixes)
+    assert split_upload_data(upload_data, 10000, file_sizes) == [upload_data]
+
+
+def test_split_upload_data(report_files):
+    upload_data = UploadCollectionResult(["a.py"], report_files, [])
+    parts = split_upload_data(upload_data, 1000, file_sizes)
+    assert parts == [
+        UploadCollectionResult(["a.py"], [report_files[1]], []),
+        UploadCollectionResult(["a.py"], [report_files[0], report_files[2]], []),
+    ]
+
+
+def test_split_upload_data_file_fixes_only_where_needed(tmp_path):
+    files = []
+    for filename, content in [
+        ("coverage.xml", '<class filename="src/app.py"/><class filename="util.py"/>'),
+        ("lcov.info", "SF:/home/ci/repo/src/index.js\nend_of_record\n"),
+        ("jacoco.xml", '<sourcefile name="Main.java"></sourcefile>'),
+    ]:
+        (tmp_path / filename).write_text(content + " " * 500)
+        files.append(UploadCollectionResultFile(tmp_path / filename))
+    app, util, index, main, other, makefile = [
+        UploadCollectionResultFileFixer(Path(path), {1}, None, None)
+        for path in [
+            "src/app.py",
+            "util.py",
+            "src/index.js",
+            "src/main/java/Main.java",
+            "src/other.py",
+            "Makefile",
+        ]
+    ]
+    upload_data = UploadCollectionResult(
+        ["a.py"], files, [app, util, index, main, other, makefile]
+    )
+    parts = split_upload_data(upload_data, 700, file_sizes)
+    fixes_by_report = {part.files[0].path.name: part.file_fixes for part in parts}
+    assert fixes_by_report == {
+        "coverage.xml": [app, util, makefile],
+        "lcov.info": [index, makefile],
+        "jacoco.xml": [main, makefile],
+    }
+    assert all(part.network == ["a.py"] for part in parts)
+
+
+def test_split_upload_data_file_larger_than_budget(report_files):
+    parts = split_upload_data(
+        UploadCollectionResult([], report_files, []), 350, file_sizes
+    )
+    assert [part.files for part in parts] == [
+        [report_files[1]],
+        [report_files[0]],
+        [report_files[2]],
+    ]
+
+
+def test_split_upload_data_budget_accounts_for_network(report_files):
+    # The network takes about 1400 bytes of each upload
+    network = [f"file_{i}.py" for i in range(100)]
+    upload_data = UploadCollectionResult(network, report_files, [])
+    parts = split_upload_data(upload_data, 2200, file_sizes)
+    assert [part.files for part in parts] == [
+        [report_files[1]],
+        [report_files[0], report_files[2]],
+    ]
+    assert all(part.network == network for part in parts)
+
+
+def test_split_upload_data_no_room_next_to_network(report_files):
+    network = [f"file_{i}.py" for i in range(100)]
+    parts = split_upload_data(
+        UploadCollectionResult(network, report_files, []), 1000, file_sizes
+    )
+    assert all(part.network == network for part in parts)
+    assert sum(len(part.files) for part in parts) == 3
+    assert all(part.files for part in parts)
+
+
+def test_upload_sender_reuses_encoded_files(mocker, report_files):
+    sender = UploadSender()
+    upload_data = UploadCollectionResult([], report_files, [])
+    expected_payload = sender._generate_payload(upload_data, {})
+    encode = mocker.spy(sender, "_encode_content")
+
+    sizes = sender.get_encoded_sizes(report_files)
+    # base64 of the compressed content, slightly larger than the file
+    assert 4 * 700 // 3 < sizes[report_files[1]] < 4 * 750 // 3
+    assert encode.call_count == 3
+    assert sender._generate_payload(upload_data, {}) == expected_payload
+    assert encode.call_count == 3
+    # Files are only kept until they are sent
+    sender._generate_payload(upload_data, {})
+    assert encode.call_count == 6
+
+
+def test_upload_sender_inline_files_sizes(report_files):
+    sender = UploadSender(payload_format="gzip")
+    assert sender.get_encoded_sizes(report_files) == file_sizes(report_files)
+
+
+def test_do_upload_logic_splits_upload(mocker, tmp_path, monkeypatch, report_files):
+    monkeypatch.chdir(tmp_path)
+    mocker.patch("codecov_cli.services.upload.select_preparation_plugins")
+    mocker.patch("codecov_cli.services.upload.select_file_finder")
+    mocker.patch("codecov_cli.services.upload.select_network_finder")
+    mocker.patch.object(
+        UploadCollector,
+        "generate_upload_data",
+        side_effect=lambda *args: UploadCollectionResult(
+            ["a.py"], list(report_files), []
+        ),
+    )
+
+    def send_upload_data(upload_data, **kwargs):
+        if report_files[2] in upload_data.files:
+            return RequestResult(
+                error=RequestError(code="HTTP Error 500", params={}, description="err"),
+                warnings=[],
+                status_code=500,
+                text="err",
+            )
+        return RequestResult(error=None, warnings=None, status_code=200, text="ok")
+
+    mock_send_upload_data = mocker.patch.object(
+        UploadSender, "send_upload_data", side_effect=send_upload_data
+    )
+
+    def upload():
+        with CliRunner().isolation() as outstreams:
+            result = do_upload_logic(
+                {},
+                mocker.MagicMock(),
+                None,
+                report_type=ReportType.COVERAGE,
+                commit_sha="commit_sha",
+                report_code="report_code",
+                build_code=None,
+                build_url=None,
+                job_code=None,
+                env_vars=None,
+                flags=None,
+                gcov_args=None,
+                gcov_executable=None,
+                gcov_ignore=None,
+                gcov_include=None,
+                max_payload_size=1,
+                name=None,
+                network_filter=None,
+                network_prefix=None,
+                network_root_folder=None,
+                files_search_root_folder=None,
+                files_search_exclude_folders=None,
+                files_search_explicitly_listed_files=None,
+                plugin_names=[],
+                token="token",
+                branch="branch",
+                slug="slug",
+                swift_project=None,
+                pull_request_number=None,
+                git_service="github",
+                enterprise_url=None,
+                upload_manifest=tmp_path / "upload_manifest.json",
+            )
+        return result, parse_outstreams_into_log_lines(outstreams[0].getvalue())
+
+    mocker.patch(
+        "codecov_cli.services.upload.split_upload_data",
+        side_effect=lambda upload_data, max_size, get_encoded_sizes: [
+            UploadCollectionResult(upload_data.network, [file], [])
+            for file in upload_data.files
+        ],
+    )
+    result, logs = upload()
+    assert ("info", "Splitting upload into 3 parts of at most 1 MB") in logs
+    assert mock_send_upload_data.call_count == 3
+    assert result.error.code == "HTTP Error 500"
+
+    # Parts that were uploaded successfully are not sent again
+    mock_send_upload_data.reset_mock()
+    upload()
+    assert [
+        call[1]["upload_data"].files for call in mock_send_upload_data.call_args_list
+    ] == [[report_files[2]]]
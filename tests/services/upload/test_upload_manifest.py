@@ -0,0 +1,200 @@
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from codecov_cli.helpers.upload_type import ReportType
+from codecov_cli.services.upload import UploadCollector, UploadSender, do_upload_logic
+from codecov_cli.services.upload.upload_manifest import (
+    MAX_MANIFEST_ENTRIES,
+    UploadManifest,
+    hash_file,
+    skip_uploaded_files,
+)
+from codecov_cli.types import (
+    RequestError,
+    RequestResult,
+    UploadCollectionResult,
+    UploadCollectionResultFile,
+)
+from tests.test_helpers import parse_outstreams_into_log_lines
+
+
+@pytest.fixture
+def report_files(tmp_path):
+    files = []
+    for filename, content in [
+        ("a.xml", b"<coverage>a</coverage>"),
+        ("b.xml", b"<coverage>b</coverage>"),
+        ("copy_of_a.xml", b"<coverage>a</coverage>"),
+    ]:
+        path = tmp_path / filename
+        path.write_bytes(content)
+        files.append(UploadCollectionResultFile(path))
+    return files
+
+
+def test_manifest_round_trip(tmp_path):
+    manifest = UploadManifest(tmp_path / ".codecov" / "upload_manifest.json")
+    key = UploadManifest.get_key("sha", "default", "coverage", ["unit"])
+    assert manifest.get_uploaded_hashes(key) == set()
+
+    manifest.record_uploaded_hashes(key, ["hash1"])
+    manifest.record_uploaded_hashes(key, ["hash2"])
+    assert manifest.get_uploaded_hashes(key) == {"hash1", "hash2"}
+    other_key = UploadManifest.get_key("sha", "default", "coverage", ["e2e"])
+    assert manifest.get_uploaded_hashes(other_key) == set()
+
+
+def test_manifest_key_ignores_flag_order():
+    assert UploadManifest.get_key(
+        "sha", "default", "coverage", ["b", "a"]
+    ) == UploadManifest.get_key("sha", "default", "coverage", ["a", "b"])
+
+
+def test_manifest_keeps_most_recent_entries(tmp_path):
+    manifest = UploadManifest(tmp_path / "upload_manifest.json")
+    for i in range(MAX_MANIFEST_ENTRIES + 5):
+        manifest.record_uploaded_hashes(f"key{i}", [f"hash{i}"])
+    uploads = json.loads(manifest.path.read_text())["uploads"]
+    assert len(uploads) == MAX_MANIFEST_ENTRIES
+    assert "key0" not in uploads
+    assert f"key{MAX_MANIFEST_ENTRIES + 4}" in uploads
+
+
+def test_manifest_unreadable(tmp_path):
+    path = tmp_path / "upload_manifest.json"
+    path.write_text("not json")
+    assert UploadManifest(path).get_uploaded_hashes("key") == set()
+
+
+def test_skip_uploaded_files(report_files):
+    files, hashes, skipped_bytes = skip_uploaded_files(
+        report_files, {hash_file(report_files[1])}
+    )
+    assert files == [report_files[0]]
+    assert hashes == {report_files[0].get_filename(): hash_file(report_files[0])}
+    assert skipped_bytes == len(b"<coverage>b</coverage>") * 2
+
+
+class TestDoUploadLogicManifest(object):
+    @pytest.fixture
+    def upload(self, mocker, tmp_path, monkeypatch, report_files):
+        monkeypatch.chdir(tmp_path)
+        mocker.patch("codecov_cli.services.upload.select_preparation_plugins")
+        mocker.patch("codecov_cli.services.upload.select_file_finder")
+        mocker.patch("codecov_cli.services.upload.select_network_finder")
+        mocker.patch.object(
+            UploadCollector,
+            "generate_upload_data",
+            side_effect=lambda *args: UploadCollectionResult(
+                [], list(report_files), []
+            ),
+        )
+        mock_send_upload_data = mocker.patch.object(
+            UploadSender,
+            "send_upload_data",
+            return_value=RequestResult(
+                error=None, warnings=None, status_code=200, text="ok"
+            ),
+        )
+
+        def run(**kwargs):
+            params = dict(
+                report_type=ReportType.COVERAGE,
+                commit_sha="commit_sha",
+                report_code="report_code",
+                build_code=None,
+                build_url=None,
+                job_code=None,
+                env_vars=None,
+                flags=["unit"],
+                gcov_args=None,
+                gcov_executable=None,
+                gcov_ignore=None,
+                gcov_include=None,
+                name=None,
+                network_filter=None,
+                network_prefix=None,
+                network_root_folder=None,
+                files_search_root_folder=None,
+                files_search_exclude_folders=None,
+                files_search_explicitly_listed_files=None,
+                plugin_names=[],
+                token="token",
+                branch="branch",
+                slug="slug",
+                swift_project=None,
+                pull_request_number=None,
+                git_service="github",
+                enterprise_url=None,
+                upload_manifest=tmp_path / "upload_manifest.json",
+            )
+            params.update(kwargs)
+            with CliRunner().isolation() as outstreams:
+                result = do_upload_logic({}, mocker.MagicMock(), None, **params)
+            return result, parse_outstreams_into_log_lines(outstreams[0].getvalue())
+
+        run.mock_send_upload_data = mock_send_upload_data
+        return run
+
+    def test_duplicate_content_is_uploaded_once(self, upload, report_files):
+        _, logs = upload()
+        sent_files = upload.mock_send_upload_data.call_args[1]["upload_data"].files
+        assert sent_files == report_files[:2]
+        assert (
+            "info",
+            "Skipped 1 report file(s) (22 bytes) with content already uploaded for this commit and report code. Use --force to upload them anyway.",
+        ) in logs
+
+    def test_second_upload_is_skipped(self, upload, mocker):
+        upload()
+        before_send = mocker.MagicMock()
+        result, logs = upload(before_send=before_send)
+        assert upload.mock_send_upload_data.call_count == 1
+        assert result.text == (
+            "All report files were already uploaded. Nothing to upload."
+        )
+        assert (
+            "info",
+            "Skipped 3 report file(s) (66 bytes) with content already uploaded for this commit and report code. Use --force to upload them anyway.",
+        ) in logs
+        # Like any upload, the commit and report are created and the result logged
+        before_send.assert_called_once()
+        assert ("info", "Process Upload complete") in logs
+
+    def test_without_manifest_nothing_is_skipped(self, upload, report_files, tmp_path):
+        upload(upload_manifest=None)
+        upload(upload_manifest=None)
+        assert upload.mock_send_upload_data.call_count == 2
+        sent_files = upload.mock_send_upload_data.call_args[1]["upload_data"].files
+        assert sent_files == report_files
+        assert list(tmp_path.glob("**/*.json")) == []
+
+    def test_different_flags_are_not_skipped(self, upload, report_files):
+        upload()
+        upload(flags=["e2e"])
+        assert upload.mock_send_upload_data.call_count == 2
+
+    def test_force(self, upload, report_files):
+        upload()
+        upload(force=True)
+        assert upload.mock_send_upload_data.call_count == 2
+        sent_files = upload.mock_send_upload_data.call_args[1]["upload_data"].files
+        assert sent_files == report_files
+
+    def test_failed_upload_is_not_recorded(self, upload):
+        upload.mock_send_upload_data.return_value = RequestResult(
+            error=RequestError(code="HTTP Error 500", params={}, description="err"),
+            warnings=None,
+            status_code=500,
+            text="err",
+        )
+        upload()
+        upload()
+        assert upload.mock_send_upload_data.call_count == 2
+
+    def test_dry_run_is_not_recorded(self, upload):
+        upload(dry_run=True)
+        upload()
+        assert upload.mock_send_upload_data.call_count == 1
@@ -0,0 +1,241 @@
+import json
+from pathlib import Path
+
+import pytest
+import responses
+from click.testing import CliRunner
+
+from codecov_cli.helpers.request import configure_retry_policy
+from codecov_cli.helpers.retry import RetryPolicy
+from codecov_cli.helpers.upload_type import ReportType
+from codecov_cli.main import cli
+from codecov_cli.services.upload import UploadCollector, do_upload_logic
+from codecov_cli.services.upload.upload_sender import UploadSender
+from codecov_cli.services.upload.upload_spool import (
+    UploadSpool,
+    flush_spool_logic,
+    should_spool,
+)
+from codecov_cli.types import (
+    RequestError,
+    RequestResult,
+    UploadCollectionResult,
+    UploadCollectionResultFile,
+)
+
+INGEST_URL = "https://ingest.codecov.io/upload/github/org::::repo/commits/abc/reports/default/uploads"
+STORAGE_URL = "https://storage.codecov.io/bucket/upload.txt"
+
+
+@pytest.fixture(autouse=True)
+def no_retry_sleep(mocker):
+    mocker.patch("codecov_cli.helpers.request.sleep")
+    configure_retry_policy(RetryPolicy(max_attempts=2))
+    yield
+    configure_retry_policy(RetryPolicy())
+
+
+@pytest.fixture
+def spool(tmp_path):
+    return UploadSpool(tmp_path / "spool")
+
+
+def add_upload(spool, name="first", file_not_found=False):
+    return spool.add(
+        INGEST_URL,
+        {"name": name, "file_not_found": file_not_found},
+        [b'{"coverage_files": ', b"[]}"],
+    )
+
+
+def result(status_code, error=True):
+    return RequestResult(
+        error=RequestError(code="", params={}, description="") if error else None,
+        warnings=[],
+        status_code=status_code,
+        text="",
+    )
+
+
+def test_should_spool():
+    assert should_spool(result(0))
+    assert should_spool(result(503))
+    assert should_spool(result(429))
+    assert not should_spool(result(401))
+    assert not should_spool(result(200, error=False))
+
+
+def test_spool_add_list_remove(spool):
+    first = add_upload(spool, "first")
+    add_upload(spool, "second")
+    # Leftovers of an interrupted write aren't listed
+    (spool.path / "leftover.tmp").write_text("partial")
+
+    uploads = spool.list()
+    assert [upload.data["name"] for upload in uploads] == ["first", "second"]
+    assert uploads[0].metadata_path == first
+    assert uploads[0].url == INGEST_URL
+    assert b"".join(uploads[0].read_payload()) == b'{"coverage_files": []}'
+
+    spool.remove(uploads[0])
+    assert [upload.data["name"] for upload in spool.list()] == ["second"]
+    assert not uploads[0].payload_path.exists()
+
+
+@responses.activate
+def test_flush_spool_sends_and_removes_uploads(spool):
+    add_upload(spool, "first")
+    add_upload(spool, "second")
+    add_upload(spool, "rejected")
+    add_upload(spool, "no files", file_not_found=True)
+
+    def upload_request(request):
+        name = json.loads(request.body)["name"]
+        if name == "rejected":
+            return (400, {}, "Invalid")
+        assert request.headers["Authorization"] == "token abc"
+        return (200, {}, json.dumps({"raw_upload_location": STORAGE_URL}))
+
+    payloads = []
+
+    def storage_request(request):
+        assert request.headers["Content-Length"] == str(len(b"".join(request.body)))
+        payloads.append(b"".join(request.body))
+        return (200, {}, "")
+
+    responses.add_callback(responses.POST, INGEST_URL, callback=upload_request)
+    responses.add_callback(responses.PUT, STORAGE_URL, callback=storage_request)
+
+    results = flush_spool_logic(spool.path, "abc", concurrency=2)
+
+    assert [r.status_code for r in results] == [200, 200, 400, 200]
+    assert [upload.data["name"] for upload in spool.list()] == ["rejected"]
+    # Uploads without files only make the upload request
+    assert payloads == [b'{"coverage_files": []}'] * 2
+
+
+@responses.activate
+def test_flush_spool_stops_while_codecov_is_unavailable(spool):
+    for index in range(5):
+        add_upload(spool, f"upload {index}")
+    responses.post(INGEST_URL, status=503)
+
+    results = flush_spool_logic(spool.path, None, concurrency=1, batch_size=2)
+
+    assert len(results) == 2
+    assert len(spool.list()) == 5
+
+
+def test_flush_spool_fail_on_error(spool, mocker):
+    add_upload(spool)
+    mocker.patch(
+        "codecov_cli.services.upload.upload_spool.send_spooled_upload",
+        return_value=result(400),
+    )
+    with pytest.raises(SystemExit):
+        flush_spool_logic(spool.path, None, fail_on_error=True)
+
+
+def test_flush_spool_command(spool, mocker):
+    mock_flush = mocker.patch(
+        "codecov_cli.commands.flush_spool.flush_spool_logic", return_value=[]
+    )
+    result = CliRunner().invoke(
+        cli,
+        [
+            "flush-spool",
+            "--spool-dir",
+            str(spool.path),
+            "--concurrency",
+            "3",
+            "-t",
+            "abc",
+        ],
+        obj={},
+    )
+    assert result.exit_code == 0, result.output
+    mock_flush.assert_called_with(
+        spool.path, "abc", concurrency=3, batch_size=32, fail_on_error=False
+    )
+
+
+@responses.activate
+def test_do_upload_logic_spools_failed_upload(mocker, spool, tmp_path):
+    report = tmp_path / "coverage.xml"
+    report.write_text("<coverage/>")
+    mocker.patch("codecov_cli.services.upload.select_preparation_plugins")
+    mocker.patch("codecov_cli.services.upload.select_file_finder")
+    mocker.patch("codecov_cli.services.upload.select_network_finder")
+    mocker.patch.object(
+        UploadCollector,
+        "generate_upload_data",
+        return_value=UploadCollectionResult(
+            network=["coverage.xml"],
+            files=[UploadCollectionResultFile(report)],
+            file_fixes=[],
+        ),
+    )
+    mock_manifest = mocker.patch(
+        "codecov_cli.services.upload.UploadManifest.record_uploaded_hashes"
+    )
+    responses.post(INGEST_URL.replace("abc", "a" * 40), status=502)
+
+    res = do_upload_logic(
+        {},
+        mocker.MagicMock(),
+        None,
+        report_type=ReportType.COVERAGE,
+        commit_sha="a" * 40,
+        report_code="default",
+        build_code=None,
+        build_url=None,
+        job_code=None,
+        env_vars={},
+        flags=["unit"],
+        gcov_args=None,
+        gcov_executable=None,
+        gcov_ignore=None,
+        gcov_include=None,
+        name="name",
+        network_filter=None,
+        network_prefix=None,
+        network_root_folder=None,
+        files_search_root_folder=None,
+        files_search_exclude_folders=None,
+        files_search_explicitly_listed_files=None,
+        plugin_names=[],
+        token="secret-token",
+        branch=None,
+        slug="org/repo",
+        spool_dir=spool.path,
+        swift_project=None,
+        pull_request_number=None,
+        git_service="github",
+        enterprise_url=None,
+        payload_format="gzip",
+        force=True,
+        fail_on_error=True,
+    )
+
+    assert res.error is None
+    assert not mock_manifest.called
+    (upload,) = spool.list()
+    assert upload.url == INGEST_URL.replace("abc", "a" * 40)
+    assert upload.data["flags"] == ["unit"]
+    assert "payload_format" not in upload.data
+    assert "secret-token" not in upload.metadata_path.read_text()
+    payload = json.loads(b"".join(upload.read_payload()))
+    assert payload == json.loads(
+        UploadSender()._generate_payload(
+            UploadCollectionResult(
+                network=["coverage.xml"],
+                files=[UploadCollectionResultFile(report)],
+                file_fixes=[],
+            ),
+            {},
+        )
+    )
+
+
+def test_upload_spool_default_path():
+    assert UploadSpool().path == Path(".codecov") / "spool"
@@ -71,7 +71,7 @@ def test_upload_completion_200(mocker):
         "uploads_error": 0,
     }
     mocked_response = mocker.patch(
-        "codecov_cli.helpers.request.requests.post",
+        "codecov_cli.helpers.request.requests.Session.post",
         return_value=RequestResult(
             status_code=200, error=None, warnings=[], text=json.dumps(res)
         ),
@@ -103,7 +103,7 @@ def test_upload_completion_no_token(mocker):
         "uploads_error": 0,
     }
     mocked_response = mocker.patch(
-        "codecov_cli.helpers.request.requests.post",
+        "codecov_cli.helpers.request.requests.Session.post",
         return_value=RequestResult(
             status_code=200, error=None, warnings=[], text=json.dumps(res)
         ),
@@ -126,7 +126,7 @@ def test_upload_completion_no_token(mocker):
 
 def test_upload_completion_403(mocker):
     mocked_response = mocker.patch(
-        "codecov_cli.helpers.request.requests.post",
+        "codecov_cli.helpers.request.requests.Session.post",
         return_value=mocker.MagicMock(status_code=403, text="Permission denied"),
     )
     token = uuid.uuid4()
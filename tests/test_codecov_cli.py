@@ -8,6 +8,7 @@ def test_existing_commands():
         "create-report-results",
         "do-upload",
         "empty-upload",
+        "flush-spool",
         "get-report-results",
         "label-analysis",
         "pr-base-picking",
@@ -17,3 +18,20 @@ def test_existing_commands():
         "upload-coverage",
         "upload-process",
     ]
+
+
+def test_get_request_timeouts():
+    codecov_yaml = {"cli": {"timeouts": {"connect": 5, "read": 20, "total": 300}}}
+    timeouts = main._get_request_timeouts(
+        codecov_yaml, connect=2, read=None, write=None, total=None
+    )
+    assert (timeouts.connect, timeouts.read, timeouts.write, timeouts.total) == (
+        2,
+        20,
+        60,
+        300,
+    )
+    timeouts = main._get_request_timeouts(
+        None, connect=None, read=None, write=None, total=None
+    )
+    assert (timeouts.connect, timeouts.read, timeouts.total) == (10, 60, None)
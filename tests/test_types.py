@@ -1,3 +1,5 @@
+import hashlib
+
 from codecov_cli.types import UploadCollectionResultFile
 
 
@@ -26,3 +28,41 @@ class TestUploadCollectionResultFile(object):
         assert object() != UploadCollectionResultFile(p)
 
         assert UploadCollectionResultFile(p) == UploadCollectionResultFile(p)
+
+    def test_iter_content(self, tmp_path, mocker):
+        mocker.patch.object(UploadCollectionResultFile, "READ_BLOCK_SIZE", 4)
+        file = tmp_path / "a.txt"
+        file.write_bytes(b"0123456789")
+
+        assert list(UploadCollectionResultFile(file).iter_content()) == [
+            b"0123",
+            b"4567",
+            b"89",
+        ]
+
+    def test_open_view(self, tmp_path):
+        file = tmp_path / "a.txt"
+        file.write_bytes(b"first line\n")
+
+        with UploadCollectionResultFile(file).open_view() as content:
+            assert isinstance(content, memoryview)
+            assert content.readonly
+            assert content == b"first line\n"
+
+        empty_file = tmp_path / "empty.txt"
+        empty_file.write_bytes(b"")
+        with UploadCollectionResultFile(empty_file).open_view() as content:
+            assert content == b""
+
+    def test_size_and_hash_are_computed_once(self, tmp_path, mocker):
+        file = tmp_path / "a.txt"
+        file.write_bytes(b"content")
+        result_file = UploadCollectionResultFile(file)
+        open_view = mocker.spy(result_file, "open_view")
+
+        assert result_file.get_size() == 7
+        assert result_file.get_sha256() == hashlib.sha256(b"content").hexdigest()
+        file.write_bytes(b"changed content")
+        assert result_file.get_size() == 7
+        assert result_file.get_sha256() == hashlib.sha256(b"content").hexdigest()
+        assert open_view.call_count == 1